@@ -4,20 +4,54 @@
 
 #validate_config()
 
-from .config_helpers import Config
-
-config = Config()
-
-from .api import API, API2
-from .client_library import UserLibrary
-
-
-
 """
 Layout:
 -------
 api : main module for making calls
+async_api : asyncio version of api
 auth : module that handles signing requests (authentication)
-models : 
+models :
+
+Imports
+-------
+The config and the classes below are loaded on first access (PEP 562) so
+that "import mendeley" is fast and "from mendeley import API" doesn't load
+pandas or sqlalchemy (which are used by client_library).
+"""
 
-"""
\ No newline at end of file
+import importlib
+import threading
+
+#name => (module, attribute)
+_LAZY_ATTRIBUTES = {'API': ('.api', 'API'),
+                    'API2': ('.api', 'API2'),
+                    'AsyncAPI': ('.async_api', 'AsyncAPI'),
+                    'UserLibrary': ('.client_library', 'UserLibrary')}
+
+#Submodules that used to be imported with the package
+_LAZY_SUBMODULES = ('api', 'async_api', 'client_library', 'config_helpers')
+
+_lock = threading.RLock()
+
+def __getattr__(name):
+    with _lock:
+        if name in globals():
+            return globals()[name]
+        if name == 'config':
+            from .config_helpers import Config
+            value = Config()
+        elif name in _LAZY_ATTRIBUTES:
+            module_name, attribute = _LAZY_ATTRIBUTES[name]
+            module = importlib.import_module(module_name, __name__)
+            value = getattr(module, attribute)
+        elif name in _LAZY_SUBMODULES:
+            value = importlib.import_module('.' + name, __name__)
+        else:
+            raise AttributeError("module '%s' has no attribute '%s'"
+                                 % (__name__, name))
+        globals()[name] = value
+        return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) |
+                  set(_LAZY_SUBMODULES) | {'config'})
@@ -150,9 +150,14 @@ from typing import Optional, Union, List, Literal
 import sys
 import mimetypes
 from os.path import basename
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import json
 import urllib
+import threading
+import time
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 #Third party
 import requests
@@ -161,6 +166,16 @@ from requests import ConnectionError
 #Local Imports
 from . import auth
 from . import models
+from .transport import Transport
+from .retry import RetryPolicy
+from .http_cache import ResponseCache
+from .concurrency import SingleFlight, get_current_controller, is_prefetching
+from .telemetry import Telemetry, get_endpoint_name
+from . import tracing
+from .scheduler import RequestScheduler
+from .scheduler import priority as request_priority
+from . import paging
+from .paging import AdaptivePager
 from . import utils
 #from . import user_config
 from .utils import get_truncated_display_string as td
@@ -182,6 +197,120 @@ else:
 BASE_URL = "https://api.mendeley.com"
 STR_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
 
+#Page size used by Documents.get_sharded
+SHARD_PAGE_SIZE = 500
+
+#Timeout (connect, read) in seconds for each request
+DEFAULT_TIMEOUT = (10, 60)
+
+#Hedging is only used once an endpoint has this many latency samples
+HEDGE_MIN_SAMPLES = 20
+
+#Absolute time.monotonic() value, see deadline()
+_deadline = contextvars.ContextVar('mendeley_deadline', default=None)
+
+@contextmanager
+def deadline(seconds):
+    """
+    Requests made within the context (including retries and any time spent
+    waiting for a slot from the API's scheduler) must complete within 
+    'seconds', otherwise errors.DeadlineExceededError is raised.
+    Nested deadlines can only shorten the time available.
+    
+    The deadline also applies to requests made on behalf of the context by
+    other threads, e.g. prefetching of pages and AsyncAPI calls.
+    
+    Examples
+    --------
+    from mendeley import API
+    m = API()
+    with m.deadline(5):
+        d = m.catalog.get(doi='10.1002/bit.25159')
+    """
+    new = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        new = min(new, current)
+    token = _deadline.set(new)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+def get_time_remaining():
+    """
+    Returns the time (in seconds) until the current deadline, or None if
+    no deadline has been set.
+    """
+    value = _deadline.get()
+    if value is None:
+        return None
+    return value - time.monotonic()
+
+class JSONCodec(object):
+    """
+    Encoder/decoder used for request and response bodies.
+    
+    Use get_json_codec() to get a codec, by default the fastest installed
+    library is used.
+    
+    The codec isn't used for return_type='stream', which decodes the body
+    incrementally using the standard library (see mendeley.streaming).
+    
+    Attributes
+    ----------
+    name : str
+    loads : function
+        Takes bytes or str
+    dumps : function
+        Returns bytes or str
+    """
+
+    def __init__(self, name, loads, dumps):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return 'JSONCodec: %s' % self.name
+
+def _get_orjson_codec():
+    import orjson
+    return JSONCodec('orjson', orjson.loads, orjson.dumps)
+
+def _get_ujson_codec():
+    import ujson
+    return JSONCodec('ujson', ujson.loads, ujson.dumps)
+
+def _get_stdlib_codec():
+    return JSONCodec('json', json.loads, json.dumps)
+
+_JSON_CODECS = {'orjson': _get_orjson_codec,
+                'ujson': _get_ujson_codec,
+                'json': _get_stdlib_codec}
+
+def get_json_codec(name=None):
+    """
+    Parameters
+    ----------
+    name : {None,'orjson','ujson','json'}
+        If None, the first installed library in the order above is used.
+        'json' is the standard library.
+        
+    Returns
+    -------
+    JSONCodec
+    """
+    if name is not None:
+        return _JSON_CODECS[name]()
+
+    for name in ('orjson', 'ujson'):
+        try:
+            return _JSON_CODECS[name]()
+        except ImportError:
+            pass
+    return _get_stdlib_codec()
+
 # For each view, specify which object type should be returned
 catalog_fcns = {None: models.CatalogDocument,
                 'bib': models.BibCatalogDocument,
@@ -191,6 +320,7 @@ catalog_fcns = {None: models.CatalogDocument,
                 }
 
 document_fcns = {None: models.Document,
+                 'core': models.Document,
                  'bib': models.BibDocument,
                  'client': models.ClientDocument,
                  'tags': models.TagsDocument,
@@ -201,6 +331,60 @@ document_fcns = {None: models.Document,
                  'json': models.get_json_only
                  }
 
+#Views ordered by the size of the response, see get_view_for_fields()
+#
+#'core' is the server's default view (no view is sent)
+DOCUMENT_VIEW_ORDER = ('core', 'tags', 'client', 'bib', 'patent', 'all')
+CATALOG_VIEW_ORDER = (None, 'bib', 'client', 'stats', 'all')
+
+def get_view_for_fields(fields, fcns, view_order):
+    """
+    Returns the smallest view that includes all of the requested fields.
+
+    Parameters
+    ----------
+    fields : list of str
+        e.g. ['id','title','tags']
+    fcns : dict
+        document_fcns or catalog_fcns
+    view_order : list
+        DOCUMENT_VIEW_ORDER or CATALOG_VIEW_ORDER
+
+    Examples
+    --------
+    get_view_for_fields(['id','title'],document_fcns,DOCUMENT_VIEW_ORDER)
+    => 'core'
+    get_view_for_fields(['id','starred'],document_fcns,DOCUMENT_VIEW_ORDER)
+    => 'client'
+    get_view_for_fields(['doi'],document_fcns,DOCUMENT_VIEW_ORDER)
+    => 'core' (read from 'identifiers')
+    """
+    if isinstance(fields, str):
+        fields = [fields]
+    requested = set(fields)
+    for view in view_order:
+        model = fcns[view]
+        view_fields = getattr(model, 'view_fields', model.fields)()
+        #e.g. 'doi' => 'identifiers'
+        sources = getattr(model, 'field_sources', {})
+        if set(sources.get(x, x) for x in requested).issubset(view_fields):
+            return view
+
+    all_fields = set()
+    for view in view_order:
+        model = fcns[view]
+        all_fields.update(getattr(model, 'view_fields', model.fields)())
+        all_fields.update(getattr(model, 'field_sources', {}))
+    raise ValueError('Unrecognized field(s): %s' 
+                     % ', '.join(sorted(requested - all_fields)))
+
+def _resolve_view(view, fields, fcns, view_order):
+    if fields is None:
+        return view
+    if view is not None:
+        raise ValueError('Only one of view and fields may be given')
+    return get_view_for_fields(fields, fcns, view_order)
+
 def _print_error(*args, **kwargs):
     print(*args, file=sys.stderr, **kwargs) 
 
@@ -287,15 +471,10 @@ class API(object):
 
     verbose : bool
     default_return_type : str
+    thread_safe : bool
 
-    #TODO: These types are not correct ...
-    #_UserAuthorization
-    access_token : str
-    last_url : str
-    # TODO: This isn't correct
-    last_response : str
-    # TODO: This isn't correct
-    last_params : str
+    #None when replaying, see mendeley.cassette
+    access_token : Optional['auth.TokenManager']
 
     """
     
@@ -308,9 +487,35 @@ class API(object):
         'raw' - returns the response text without processing 
         'response' - returns the response object (requests library)
     verbose : bool (default False)
+    thread_safe : bool (default False)
+        See "Thread Safety" below.
+    transport : mendeley.transport.Transport
+        All requests are sent through this object.
+    s : requests.Session
+        The session of the transport.
+    retry_policy : mendeley.retry.RetryPolicy
+        Determines which failed requests are retried and how long to wait
+        between attempts. Retries are counted by the transport.
+    last_context : RequestContext
+        Information on the most recent request. The last_url, last_response,
+        last_params, etc. properties read from this value. Pages requested
+        ahead of time while iterating (see prefetch_depth) aren't included.
+        
+    Thread Safety
+    -------------
+    Each request builds its own RequestContext. Response objects (e.g. 
+    DocumentSet) keep a reference to the context they came from, so paging 
+    through results never depends on what other requests have been made 
+    with the same API.
+    
+    The only shared per call state is the "last" request information that 
+    is used by API.next() and API.prev(). With thread_safe=True this 
+    information is stored per thread, so a single API instance can be 
+    shared by a pool of threads:
         
-    last_response : 
-    last_params : 
+        m = API(thread_safe=True)
+        with ThreadPoolExecutor(8) as ex:
+            docs = list(ex.map(m.documents.get_by_id,doc_ids))
         
     """
 
@@ -318,7 +523,19 @@ class API(object):
                  user_name=None,
                  verbose=False,
                  force_reload_auth=False,
-                 default_return_type='object'):
+                 default_return_type='object',
+                 thread_safe=False,
+                 transport=None,
+                 retry_policy=None,
+                 cache=None,
+                 coalesce=True,
+                 prefetch_depth=1,
+                 json_codec=None,
+                 timeout=DEFAULT_TIMEOUT,
+                 hedge=False,
+                 hedge_percentile=95,
+                 scheduler=None,
+                 pager=None):
         """
         Parameters
         ----------
@@ -330,6 +547,56 @@ class API(object):
         force_reload_auth : bool (default False)
             If true, the authorization is recomputed even if it hasn't expired.
         default_return_type : {'object','json','raw','response'}
+        thread_safe : bool (default False)
+            If true, the last request information (last_context) is tracked
+            per thread.
+        transport : mendeley.transport.Transport (default None)
+            Specify this to control connection pooling. By default a 
+            Transport with default settings is created. See also 
+            mendeley.cassette for recording and offline replay.
+        retry_policy : mendeley.retry.RetryPolicy (default None)
+            By default throttled (429) and transient server errors are 
+            retried up to 5 times.
+        cache : bool or mendeley.http_cache.ResponseCache (default None)
+            If specified, responses from endpoints that rarely change 
+            (catalog, metadata, profiles, definitions) are cached on disk.
+            True creates a ResponseCache with default settings.
+        coalesce : bool (default True)
+            If true, identical GET requests that are in flight at the same 
+            time (from different threads) share a single request. Each 
+            caller still gets its own result object, although with 
+            return_type='response' the response instance is shared.
+        prefetch_depth : int (default 1)
+            When iterating over a multi-page result (e.g. limit=0), this 
+            is the # of pages that are requested in the background ahead of
+            the page being processed. Use 0 to disable prefetching.
+        json_codec : str or JSONCodec (default None)
+            Codec used to encode request bodies and decode responses. By
+            default orjson or ujson is used if installed, otherwise the 
+            standard library. See get_json_codec(). Streamed responses
+            (return_type='stream') are always decoded with the standard 
+            library.
+        timeout : float or (connect, read) tuple (default DEFAULT_TIMEOUT)
+            Timeout for each request, in seconds. Use API.deadline() to 
+            limit the time for an entire operation.
+        hedge : bool (default False)
+            If true, idempotent lookups (Catalog.get, Documents.get_by_id) 
+            send a second request when the first has taken longer than 
+            hedge_percentile of the recent latencies for the endpoint. The
+            first response received is used.
+        hedge_percentile : float (default 95)
+        scheduler : mendeley.scheduler.RequestScheduler (default None)
+            Can limit the # of requests in flight, serving interactive 
+            requests before background ones, see API.priority(). By default
+            there is no limit, so the concurrency is that of the caller 
+            (threads, AsyncAPI.max_concurrency or an AIMDController). 
+            Priorities only change the order of requests when a scheduler 
+            with a limit is passed in, e.g. 
+            RequestScheduler(max_concurrency=10). See mendeley.scheduler
+        pager : mendeley.paging.AdaptivePager or False (default None)
+            Sizes the pages requested for limit=0 (get all) requests. By 
+            default an AdaptivePager is created. If False, the largest page
+            size allowed by each endpoint is used.
         
         Improvements
         ------------
@@ -338,9 +605,59 @@ class API(object):
         """
 
         self.verbose=verbose
-
-        self.s = requests.Session()
-        if user_name == 'public':
+        self.thread_safe = thread_safe
+
+        if transport is None:
+            transport = Transport()
+        self.transport = transport
+        self.s = transport.session
+
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self.retry_policy = retry_policy
+
+        if cache is True:
+            cache = ResponseCache()
+        elif cache is False:
+            cache = None
+        self.cache = cache
+
+        self.coalesce = coalesce
+        self.prefetch_depth = prefetch_depth
+
+        if json_codec is None or isinstance(json_codec, str):
+            json_codec = get_json_codec(json_codec)
+        self.json_codec = json_codec
+
+        #Per endpoint request metrics
+        self.stats = Telemetry()
+
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self._hedge_executor = None
+        self._hedge_lock = threading.Lock()
+
+        if scheduler is None:
+            scheduler = RequestScheduler(max_concurrency=None)
+        self.scheduler = scheduler
+        self._single_flight = SingleFlight()
+
+        if pager is None:
+            pager = AdaptivePager()
+        elif pager is False:
+            pager = None
+        self.pager = pager
+
+        cassette = getattr(transport, 'cassette', None)
+        if transport.offline:
+            #Replaying recorded responses, no token is needed
+            token = None
+            if user_name is None and cassette is not None:
+                user_name = cassette.user_name
+            self.public_only = user_name == 'public'
+            self.user_name = user_name
+        elif user_name == 'public':
             self.public_only = True
             token = auth.retrieve_public_authorization(force_reload=force_reload_auth)
             self.user_name = 'public'
@@ -350,18 +667,30 @@ class API(object):
                                                      force_reload=force_reload_auth)
             self.user_name = token.user_name
 
+        if cassette is not None and cassette.user_name is None:
+            #Recording, see mendeley.cassette
+            cassette.user_name = self.user_name
+
         self.default_return_type = default_return_type
 
+        if token is not None:
+            #Shared by all instances for the user, renews the token in the
+            #background
+            token = auth.get_token_manager(token)
         self.access_token = token
-        self.last_url = None
-        self.last_response = None
-        self.last_params = None
-        self.last_response_params = None
-        self.last_object_fh = None
-        self.last_return_type = None
-        self.last_headers = None
 
+        if thread_safe:
+            self._last = threading.local()
+        else:
+            self._last = _LastRequest()
+
+        self._init_endpoints()
 
+    def _init_endpoints(self):
+        """
+        Creates the endpoint groups. These hold a reference back to this 
+        instance so a copy of the API needs its own set.
+        """
         #TODO: Eventually I'd like to trim this based on user vs public
         self.annotations = Annotations(self)
         self.catalog = Catalog(self)
@@ -374,56 +703,117 @@ class API(object):
         self.trash = Trash(self)
         
 
+    def deadline(self, seconds):
+        """
+        Context manager limiting the time available for the requests made 
+        within it. See mendeley.api.deadline
+        """
+        return deadline(seconds)
+
+    def priority(self, name):
+        """
+        Context manager setting the priority of the requests made within it.
+        
+        Parameters
+        ----------
+        name : {'interactive','background'}
+            See mendeley.scheduler
+        
+        This has no effect unless the API was created with a scheduler that
+        limits the # of requests in flight (see API.__init__).
+        """
+        return request_priority(name)
+
+    def _get_timeout(self, remaining):
+        if remaining is None:
+            return self.timeout
+        if self.timeout is None:
+            return remaining
+        elif isinstance(self.timeout, tuple):
+            return tuple(min(x, remaining) for x in self.timeout)
+        else:
+            return min(self.timeout, remaining)
+
     def convert_datetime_to_string(self,dt):
         #TODO: make format string a module variable
         return dt.strftime(STR_FORMAT)
 
+    @property
+    def last_context(self):
+        return getattr(self._last, 'context', None)
+
+    @last_context.setter
+    def last_context(self, value):
+        #The prefetch thread would otherwise change the value while the 
+        #caller is using it
+        if is_prefetching():
+            return
+        self._last.context = value
+
+    def _get_last(self, name):
+        ctx = self.last_context
+        if ctx is None:
+            return None
+        return getattr(ctx, name)
+
+    @property
+    def last_url(self):
+        return self._get_last('url')
+
+    @property
+    def last_response(self):
+        return self._get_last('response')
+
+    @property
+    def last_params(self):
+        return self._get_last('params')
+
+    @property
+    def last_response_params(self):
+        return self._get_last('response_params')
+
+    @property
+    def last_object_fh(self):
+        return self._get_last('object_fh')
+
+    @property
+    def last_return_type(self):
+        return self._get_last('return_type')
+
+    @property
+    def last_headers(self):
+        return self._get_last('headers')
+
     @property
     def has_first_link(self):
-        lr = self.last_response
-        return hasattr(lr,'links') and 'first' in lr.links
+        return self._get_last('has_first_link') is True
 
     @property
     def has_next_link(self):
-        lr = self.last_response
-        return hasattr(lr,'links') and 'next' in lr.links
+        return self._get_last('has_next_link') is True
 
     def next(self):
 
         if not self.has_next_link:
             raise Exception('Next page does not exist')
 
-        next_url = self.last_response.links['next']['url']
-        params = {'return_type':self.last_return_type}
-        return self.make_get_request(next_url,
-                                     self.last_object_fh,
-                                     params,
-                                     self.last_response_params,
-                                     self.last_headers)
+        return self.last_context.next()
 
     @property
     def has_prev_link(self):
-        lr = self.last_response
-        return hasattr(lr,'links') and 'prev' in lr.links
+        return self._get_last('has_prev_link') is True
 
     def prev(self):
 
         if not self.has_prev_link:
-            raise Exception('Next page does not exist')
+            raise Exception('Previous page does not exist')
 
-        prev_url = self.last_response.links['prev']['url']
-        params = {'return_type': self.last_return_type}
-        return self.make_get_request(prev_url,
-                                     self.last_object_fh,
-                                     params,
-                                     self.last_response_params,
-                                     self.last_headers)
+        return self.last_context.prev()
 
 
     @property
     def has_last_link(self):
-        lr = self.last_response
-        return hasattr(lr,'links') and 'last' in lr.links
+        return self._get_last('has_last_link') is True
 
     def __repr__(self):
         pv = [
@@ -432,6 +822,7 @@ class API(object):
             'last_params',td(self.last_params),
             'public_only', self.public_only, 
             'user_name', self.user_name,
+            'thread_safe', self.thread_safe,
             'has_first_link',self.has_first_link,
             'has_next_link',self.has_next_link,
             'has_prev_link', self.has_prev_link,
@@ -446,16 +837,266 @@ class API(object):
             'trash',cld(self.trash),
             '---','--- internal ---',
             'access_token',cld(self.access_token),
+            'transport',cld(self.transport),
+            'cache',cld(self.cache),
+            'json_codec',cld(self.json_codec),
+            'stats',cld(self.stats),
+            'scheduler',cld(self.scheduler),
+            'pager',cld(self.pager),
             ]
         return utils.property_values_to_string(pv)
 
+    def _send(self, method, url, safe=False, **kwargs):
+        """
+        All requests go through this method. The access token is used as the
+        auth so that it can be renewed (if necessary) prior to sending.
+        
+        Failed requests are retried according to self.retry_policy. 
+        
+        Parameters
+        ----------
+        safe : bool (default False)
+            Set to True if a POST request can be repeated without side
+            effects. Other methods are retried regardless of this value.
+        """
+
+        policy = self.retry_policy
+
+        #An upload can't be resent as the file has already been read
+        can_resend = kwargs.get('files') is None
+
+        endpoint = get_endpoint_name(method, url)
+        t0 = time.perf_counter()
+
+        attempt = 0
+        while True:
+            remaining = get_time_remaining()
+            if remaining is not None and remaining <= 0:
+                self._record_request(endpoint, url, t0, None, attempt, kwargs)
+                raise errors.DeadlineExceededError(
+                    'Deadline exceeded before sending %s %s' % (method, url))
+
+            resp = None
+            controller = get_current_controller()
+            try:
+                with self.scheduler.slot(timeout=remaining):
+                    #Time spent waiting for the slot counts against the deadline
+                    remaining = get_time_remaining()
+                    if remaining is not None and remaining <= 0:
+                        raise errors.DeadlineExceededError(
+                            'Deadline exceeded before sending %s %s' 
+                            % (method, url))
+                    t_attempt = time.perf_counter()
+                    resp = self.transport.request(method, url, 
+                                                  auth=self.access_token,
+                                                  timeout=self._get_timeout(remaining),
+                                                  **kwargs)
+            except errors.DeadlineExceededError:
+                self._record_request(endpoint, url, t0, None, attempt, kwargs)
+                raise
+            except (ConnectionError, requests.Timeout):
+                if controller is not None:
+                    controller.record_response(
+                        None, time.perf_counter() - t_attempt)
+                if not (can_resend and policy.can_retry(method, attempt, None, safe)):
+                    self._record_request(endpoint, url, t0, None, attempt, kwargs)
+                    raise
+            else:
+                if controller is not None:
+                    controller.record_response(
+                        resp.status_code, time.perf_counter() - t_attempt)
+                if resp.ok or not (can_resend and 
+                                   policy.can_retry(method, attempt, resp, safe)):
+                    self._record_request(endpoint, url, t0, resp, attempt, kwargs)
+                    return resp
+
+            delay = policy.get_delay(attempt, resp)
+            remaining = get_time_remaining()
+            if remaining is not None and delay >= remaining:
+                self._record_request(endpoint, url, t0, resp, attempt, kwargs)
+                raise errors.DeadlineExceededError(
+                    'Deadline exceeded while retrying %s %s' % (method, url))
+
+            self.transport.record_retry(url, resp)
+            if self.verbose:
+                if resp is None:
+                    reason = 'connection error'
+                else:
+                    reason = 'status %d' % resp.status_code
+                print('Retrying %s %s after %s, waiting %0.2f seconds' 
+                      % (method, url, reason, delay))
+            if resp is not None:
+                #Returns the connection to the pool (for stream=True the body
+                #hasn't been read)
+                resp.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def _record_request(self, endpoint, url, t0, resp, n_retries, kwargs):
+        """
+        Adds a finished request (including any retries) to self.stats and,
+        if enabled, the trace.
+        """
+        end = time.perf_counter()
+        latency = end - t0
+
+        data = kwargs.get('data')
+        bytes_out = len(data) if isinstance(data, (str, bytes)) else 0
+
+        if resp is None:
+            status_code = None
+            bytes_in = 0
+        else:
+            status_code = resp.status_code
+            length = resp.headers.get('Content-Length')
+            if length is not None:
+                bytes_in = int(length)
+            elif kwargs.get('stream'):
+                #Not read yet
+                bytes_in = 0
+            else:
+                bytes_in = len(resp.content)
+
+        self.stats.record_request(endpoint, status_code, latency, bytes_in,
+                                  bytes_out, n_retries)
+
+        tracing.record(endpoint, t0, end, 'http', url=url, 
+                       status_code=status_code, n_retries=n_retries, 
+                       bytes_in=bytes_in)
+
+    def _timed_handle_return(self, req, return_type, response_params, 
+                             object_fh, context):
+        """
+        handle_return() with the time taken added to self.stats
+        """
+        t0 = time.perf_counter()
+        result = self.handle_return(req, return_type, response_params, 
+                                    object_fh, context)
+        endpoint = get_endpoint_name(context.method, context.url)
+        self.stats.record_handle_return(endpoint, time.perf_counter() - t0)
+        return result
+
+    def _send_get(self, url, params, headers, hedge=False):
+        if hedge and self.hedge:
+            return self._hedged_get(url, params, headers)
+        return self._send('GET', url, params=params, headers=headers)
+
+    def _get_hedge_executor(self):
+        with self._hedge_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.transport.pool_maxsize,
+                    thread_name_prefix='mendeley-hedge')
+            return self._hedge_executor
+
+    def _hedged_get(self, url, params, headers):
+        """
+        Sends a GET request, and if it hasn't completed within the 
+        hedge_percentile latency of the endpoint, a second identical 
+        request. The first response received is returned; the other request
+        is left to complete in the background.
+        """
+        endpoint = get_endpoint_name('GET', url)
+        delay = self.stats.get_latency_percentile(endpoint, 
+                                                  self.hedge_percentile,
+                                                  HEDGE_MIN_SAMPLES)
+        if delay is None:
+            return self._send('GET', url, params=params, headers=headers)
+
+        executor = self._get_hedge_executor()
+        send = lambda: self._send('GET', url, params=params, headers=headers)
+
+        #The context carries the deadline to the pool threads
+        first = executor.submit(contextvars.copy_context().run, send)
+        done, pending = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        self.stats.record_hedge(endpoint)
+        if self.verbose:
+            print('Hedging GET %s after %0.3f seconds' % (url, delay))
+        second = executor.submit(contextvars.copy_context().run, send)
+
+        pending = [first, second]
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except Exception as e:
+                    error = e
+        raise error
+
+    def _cached_get(self, url, params, headers, hedge=False):
+        """
+        GET request that goes through self.cache.
+        
+        A fresh entry is returned without contacting the server. A stale
+        entry is revalidated when the server gave us an ETag or 
+        Last-Modified header, in which case a 304 response renews the entry.
+        """
+        cache = self.cache
+        key = cache.get_key(url, params, headers, self.user_name)
+        entry = cache.get(key)
+
+        if entry is not None and cache.is_fresh(entry):
+            cache.record_hit()
+            return entry.to_response()
+
+        send_headers = headers
+        if entry is not None and entry.can_revalidate:
+            send_headers = dict(headers) if headers else {}
+            send_headers.update(entry.get_validation_headers())
+
+        resp = self._send_get(url, params, send_headers, hedge)
+
+        if resp.status_code == 304 and entry is not None:
+            cache.record_revalidated()
+            cache.renew(entry, resp)
+            return entry.to_response()
+
+        cache.record_miss()
+        if resp.ok:
+            cache.store(key, resp)
+        return resp
+
+    def make_request(self, method, url, params=None, data=None, headers=None):
+        """
+        Sends a request without any processing of the response. This is 
+        for calls that don't return content (e.g. DELETE) or where the 
+        caller needs to map status codes to errors itself.
+        
+        Parameters
+        ----------
+        method : str
+            'GET', 'POST', 'PATCH', 'DELETE'
+        url : str
+        params : dict
+            Query parameters
+        data : 
+            Request body
+        headers : dict
+        
+        Returns
+        -------
+        requests.Response
+        """
+        ctx = RequestContext(self, method, url, params, None, None, 
+                             'response', headers)
+        ctx.response = self._send(method, url, params=params, data=data, 
+                                  headers=headers)
+        self.last_context = ctx
+        return ctx.response
+
     def make_post_request(self,
                           url,
                           object_fh,
                           params,
                           response_params=None,
                           headers=None,
-                          files=None):
+                          files=None,
+                          safe=False):
 
         """
         Parameters
@@ -466,6 +1107,9 @@ class API(object):
             Parameters that are passed to the response object
             TODO: What are these?????
         headers :
+        safe : bool (default False)
+            If true the request may be retried on transient server errors.
+            By default a POST is only retried if it was throttled (429).
 
 
         """
@@ -478,33 +1122,36 @@ class API(object):
             return_type = self.default_return_type
 
         if files is None:
-            params = json.dumps(params)
+            params = self.json_codec.dumps(params)
+
+        ctx = RequestContext(self, 'POST', url, params, response_params,
+                             object_fh, return_type, headers)
 
         #TODO: Why is this not like GET with a possible connection error?
-        response = self.s.post(url, data=params, auth=self.access_token,
-                               headers=headers, files=files)
+        response = self._send('POST', url, data=params, headers=headers, 
+                              files=files, safe=safe)
 
-        self.last_url = url
-        self.last_response = response
-        self.last_params = params
-        self.last_object_fh = object_fh
-        self.last_return_type = return_type
-        self.last_headers = headers
+        ctx.response = response
+        self.last_context = ctx
 
         if not response.ok:
             print(response.text)
             print('')
             raise errors.CallFailedException('Call failed with status: %d' 
-                                                % (response.status_code))
+                                                % (response.status_code),
+                                             status_code=response.status_code)
 
-        return self.handle_return(response, return_type, response_params, object_fh)
+        return self._timed_handle_return(response, return_type, 
+                                         response_params, object_fh, ctx)
 
     def make_get_request(self,
                          url,
                          object_fh,
                          params=None,
                          response_params=None,
-                         headers=None):
+                         headers=None,
+                         cache=False,
+                         hedge=False):
         """
         
         Make a GET request to the server and return the response.
@@ -518,17 +1165,24 @@ class API(object):
         params : dict (default {})
             Dictionary of parameters to place in the GET query. Values may be
             numbers or strings.
-        return_type : {'object','json','raw','response'}
+        return_type : {'object','json','raw','response','stream'}
             object - indicates that the result class object should be created.
                 This is the slowest option but provides the most functionality.
             json   - 
+            stream - objects are created one at a time as the response is 
+                downloaded, see mendeley.models.ResponseStream
             
             
         response_params : dict
             This gets passed to the object.
             
         headers :
-            
+        cache : bool (default False)
+            If true and the API was created with a cache, the response may
+            be served from (and is stored in) the on-disk cache.
+        hedge : bool (default False)
+            If true and the API was created with hedge=True, a slow request
+            is hedged with a second one. Only use this for lookups.
             
         See Also:
         ---------
@@ -552,23 +1206,44 @@ class API(object):
         #https://stackoverflow.com/questions/21823965/use-20-instead-of-for-space-in-python-query-parameters
         params = urllib.parse.urlencode(params, quote_via=urllib.parse.quote)
 
+        ctx = RequestContext(self, 'GET', url, params, response_params,
+                             object_fh, return_type, headers)
+
         # NOTE: We make authorization go through the access token. The request
         # will call the access_token prior to sending the request. Specifically
         # the __call__ method is called.
+        stream = return_type == 'stream'
+        if stream and not _is_paged(response_params):
+            #Checked before sending, see also handle_return()
+            raise ValueError(_STREAM_ERROR)
+        if stream:
+            #The body is read by the caller so the response can't be shared
+            send = lambda: self._send('GET', url, params=params, 
+                                      headers=headers, stream=True)
+        elif cache and self.cache is not None:
+            send = lambda: self._cached_get(url, params, headers, hedge)
+        else:
+            send = lambda: self._send_get(url, params, headers, hedge)
+
+        t0 = time.perf_counter()
         try:
-            resp = self.s.get(url, params=params, auth=self.access_token, 
-                              headers=headers)
+            if self.coalesce and not stream:
+                if headers:
+                    key = (url, params, tuple(sorted(headers.items())))
+                else:
+                    key = (url, params, None)
+                #A caller that joins another's request still keeps to 
+                #its own deadline
+                resp = self._single_flight.do(key, send, 
+                                              get_time_remaining())
+            else:
+                resp = send()
         except ConnectionError:
             raise Exception('Failed to connect to the server, this usually'
                             'happens if there is no internet connection')
 
-        self.last_url = url
-        self.last_response = resp
-        self.last_params = params
-        self.last_response_params = response_params
-        self.last_object_fh = object_fh
-        self.last_return_type = return_type
-        self.last_headers = headers
+        ctx.response = resp
+        self.last_context = ctx
         
         if not resp.ok:
             _print_error("----------------   Error Details   ----------------")
@@ -578,12 +1253,50 @@ class API(object):
             _print_error(resp.text)
             _print_error("------------------------------------")            
            
-            raise Exception('Call failed with status: %d, see above for details' % (resp.status_code))
+            raise errors.CallFailedException(
+                'Call failed with status: %d, see above for details' 
+                % (resp.status_code), status_code=resp.status_code)
+
+        if response_params is not None and 'page_key' in response_params \
+                and not stream:
+            self._record_page(response_params, resp, time.perf_counter() - t0)
+
+        return self._timed_handle_return(resp, 
+                                         return_type, 
+                                         response_params, 
+                                         object_fh,
+                                         ctx)
+
+    def _record_page(self, response_params, resp, latency):
+        """
+        Passes the size and latency of a full page of a limit=0 request to
+        self.pager. The last page is skipped as it is usually partial.
+        """
+        if self.pager is None or 'next' not in resp.links:
+            return
+        endpoint, view = response_params['page_key']
+        self.pager.record_page(endpoint, view, response_params['page_limit'],
+                               len(resp.content), latency)
+
+    def get_next_page_url(self, url, response_params):
+        """
+        Returns the url of the next page of a request. For limit=0 (get all)
+        requests the page size is updated from self.pager, in which case
+        response_params['page_limit'] is updated as well.
 
-        return self.handle_return(resp, 
-                                  return_type, 
-                                  response_params, 
-                                  object_fh)
+        Parameters
+        ----------
+        url : str
+            The 'next' link of the current page.
+        response_params : dict
+            Copy of the response params for the next page.
+        """
+        if self.pager is None or 'page_key' not in response_params:
+            return url
+        endpoint, view = response_params['page_key']
+        limit = self.pager.get_limit(endpoint, view)
+        response_params['page_limit'] = limit
+        return paging.set_url_limit(url, limit)
 
     def make_patch_request(self, url, object_fh, params, response_params=None, headers=None, files=None):
         #
@@ -595,47 +1308,66 @@ class API(object):
             return_type = self.default_return_type
 
         if files is None:
-            params = json.dumps(params)
+            params = self.json_codec.dumps(params)
+
+        ctx = RequestContext(self, 'PATCH', url, params, response_params,
+                             object_fh, return_type, headers)
 
-        resp = self.s.patch(url, data=params, auth=self.access_token,
-                            headers=headers, files=files)
+        resp = self._send('PATCH', url, data=params, headers=headers, 
+                          files=files)
 
-        self.last_url = url
-        self.last_response = resp
-        self.last_params = params
-        self.last_object_fh = object_fh
-        self.last_return_type = return_type
-        self.last_headers = headers
+        ctx.response = resp
+        self.last_context = ctx
 
         if not resp.ok:
             # if r.status_code != good_status:
             print(resp.text)
             print('')
             # TODO: This should be improved
-            raise Exception('Call failed with status: %d' % (resp.status_code))
+            raise errors.CallFailedException('Call failed with status: %d' 
+                                             % (resp.status_code),
+                                             status_code=resp.status_code)
 
-        return self.handle_return(resp, return_type, response_params, object_fh)
+        return self._timed_handle_return(resp, return_type, 
+                                         response_params, object_fh, ctx)
 
-    def handle_return(self, req, return_type, response_params, object_fh):
+    def handle_return(self, req, return_type, response_params, object_fh,
+                      context=None):
         """
         This should only occur after the calling function has verified
         that no error was returned from the server.
+        
+        Parameters
+        ----------
+        context : RequestContext
+            If response_params are given, a copy of them is passed to the
+            object with the context stored under the 'context' key.
         """
         
         if return_type == 'object':
             if response_params is None:
-                return object_fh(req.json(), self)
+                return object_fh(self.json_codec.loads(req.content), self)
             else:
-                return object_fh(req.json(), self, response_params)
+                response_params = dict(response_params)
+                response_params['context'] = context
+                return object_fh(self.json_codec.loads(req.content), self, 
+                                 response_params)
         elif return_type == 'json':
-            return req.json()
+            return self.json_codec.loads(req.content)
         elif return_type == 'raw':
             return req.text
         elif return_type == 'response':
             return req
         elif return_type == 'ids':
-            temp = req.json()
+            temp = self.json_codec.loads(req.content)
             return [x['id'] for x in temp]
+        elif return_type == 'stream':
+            if not _is_paged(response_params):
+                req.close()
+                raise ValueError(_STREAM_ERROR)
+            response_params = dict(response_params)
+            response_params['context'] = context
+            return models.ResponseStream(req, self, response_params)
         else:
             print('-----------------------')
             print(return_type)
@@ -644,6 +1376,117 @@ class API(object):
 
 
 
+class _LastRequest(object):
+    """
+    Holder for API.last_context when not in thread safe mode. In thread 
+    safe mode a threading.local is used instead.
+    """
+    def __init__(self):
+        self.context = None
+
+class RequestContext(object):
+    """
+    Information about a single request: what was asked for and the
+    response that came back. Each request gets its own instance so that
+    paging (following the 'next' and 'prev' links) only depends on the 
+    request it is continuing from.
+    
+    Attributes
+    ----------
+    api : API
+    method : str
+        'GET', 'POST' or 'PATCH'
+    url : str
+    params : 
+        The query string (GET) or body (POST,PATCH) that was sent.
+    response_params : dict or None
+    object_fh : 
+        Function handle used to build the response object.
+    return_type : str
+    headers : dict or None
+    response : requests.Response
+    """
+
+    def __init__(self, api, method, url, params, response_params, object_fh,
+                 return_type, headers):
+        self.api = api
+        self.method = method
+        self.url = url
+        self.params = params
+        if response_params is not None and 'context' in response_params:
+            #Don't hold onto the context of the previous page
+            response_params = dict(response_params)
+            del response_params['context']
+        self.response_params = response_params
+        self.object_fh = object_fh
+        self.return_type = return_type
+        self.headers = headers
+        self.response = None
+
+    @property
+    def links(self):
+        lr = self.response
+        if hasattr(lr,'links'):
+            return lr.links
+        else:
+            return {}
+
+    @property
+    def total_count(self):
+        """
+        The value of the 'Mendeley-Count' header, None if not present.
+        """
+        try:
+            return self.response.headers['Mendeley-Count']
+        except (AttributeError, KeyError):
+            return None
+
+    @property
+    def has_first_link(self):
+        return 'first' in self.links
+
+    @property
+    def has_next_link(self):
+        return 'next' in self.links
+
+    @property
+    def has_prev_link(self):
+        return 'prev' in self.links
+
+    @property
+    def has_last_link(self):
+        return 'last' in self.links
+
+    def _follow(self, rel):
+        url = self.links[rel]['url']
+        params = {'return_type': self.return_type}
+        return self.api.make_get_request(url,
+                                         self.object_fh,
+                                         params,
+                                         self.response_params,
+                                         self.headers)
+
+    def next(self):
+        if not self.has_next_link:
+            raise Exception('Next page does not exist')
+        return self._follow('next')
+
+    def prev(self):
+        if not self.has_prev_link:
+            raise Exception('Previous page does not exist')
+        return self._follow('prev')
+
+    def __repr__(self):
+        pv = [
+            'method', self.method,
+            'url', self.url,
+            'params', td(str(self.params)),
+            'return_type', self.return_type,
+            'response', self.response,
+            'links', list(self.links.keys()),
+            'total_count', self.total_count]
+        return utils.property_values_to_string(pv)
+
 
 class Annotations(object):
     
@@ -697,10 +1540,11 @@ class Annotations(object):
             d['group_id'] = group_id
         if include_trashed and include_trashed is not None:
             d['include_trashed'] = include_trashed
-        if limit and limit is not None:
+        if limit is not None:
             if limit == 0:
-                #Largest allowable value
-                d['limit'] = 200
+                #Largest allowable value, annotations aren't paged so the
+                #adaptive page size isn't used
+                d['limit'] = paging.get_max_limit('/annotations')
             else:
                 d['limit'] = limit
         if modified_since and modified_since is not None:
@@ -718,12 +1562,12 @@ class Annotations(object):
         """
         https://api.mendeley.com/apidocs/docs#!/annotations/createAnnotation
         """
-        params = {'body': annotation_body}
         headers = {'Content-Type': 'application/vnd.mendeley-annotation.1+json'}
 
-        resp = requests.post(self.url, params=params, headers=headers, auth=self.parent.access_token)
-        if not resp.ok:
-            raise ConnectionError(resp.status_code)
+        return self.parent.make_post_request(self.url, 
+                                             models.Annotation,
+                                             annotation_body, 
+                                             headers=headers)
 
 
     def delete(self, **kwargs):
@@ -765,7 +1609,8 @@ class Catalog(object):
                 scopus: Optional[str]=None,
                 sgr: Optional[str]=None,
                 url: Optional[str]=None,
-                view: Optional[str]=None):
+                view: Optional[str]=None,
+                fields: Optional[List[str]]=None):
 
         """
                 
@@ -799,6 +1644,9 @@ class Catalog(object):
              - stats
              - client - this option doesn't make much sense
              - all
+        fields : list of str
+            Instead of a view, the fields that are needed. The smallest view
+            that includes them is requested, see get_view_for_fields()
 
         Examples
         --------
@@ -846,6 +1694,8 @@ class Catalog(object):
             d['sgr'] = sgr        
         if url and url is not None:
             d['url'] = url
+
+        view = _resolve_view(view, fields, catalog_fcns, CATALOG_VIEW_ORDER)
         if view and view is not None:
             d['view'] = view   
         
@@ -865,7 +1715,9 @@ class Catalog(object):
                                      models.DocumentSet.create, 
                                      d, 
                                      response_params,
-                                     headers=headers)
+                                     headers=headers,
+                                     cache=True,
+                                     hedge=True)
     
         #if unwrap_single:
         #    pass
@@ -894,7 +1746,8 @@ class Definitions(object):
 
         url = BASE_URL + '/identifier_types'
         
-        return self.parent.make_get_request(url, models.identifier_types)
+        return self.parent.make_get_request(url, models.identifier_types,
+                                            cache=True)
 
 
 
@@ -914,7 +1767,8 @@ class Definitions(object):
         """
         url = BASE_URL + '/subject_areas'
 
-        return self.parent.make_get_request(url, models.subject_areas, kwargs)
+        return self.parent.make_get_request(url, models.subject_areas, kwargs,
+                                            cache=True)
 
     def document_types(self, **kwargs):
         """
@@ -929,7 +1783,8 @@ class Definitions(object):
         """
         url = BASE_URL + '/document_types'
 
-        return self.parent.make_get_request(url, models.document_types, kwargs)
+        return self.parent.make_get_request(url, models.document_types, kwargs,
+                                            cache=True)
 
     def __repr__(self):
         pv = [
@@ -975,7 +1830,8 @@ class Documents(object):
             sort: Optional[str]=None,
             starred: Optional[bool]=None,
             tag: Union[List[str],str,None] = None,
-            view: Optional[str] = None):
+            view: Optional[str] = None,
+            fields: Optional[List[str]] = None):
         """
         https://api.mendeley.com/apidocs#!/documents/getDocuments
 
@@ -1011,7 +1867,12 @@ class Documents(object):
             - 'tags' : returns user's tags
             - 'patent'
             - 'all'
+            - 'core' : the server's default view
             - 'ids' : only get ids
+        fields : list of str
+            Instead of a view, the fields that are needed. The smallest view
+            that includes them is requested, e.g. ['id','title'] uses the 
+            'core' view rather than 'all'. See get_view_for_fields()
         sort : string
             Field to sort on. Avaiable options:
             - 'created'
@@ -1026,6 +1887,7 @@ class Documents(object):
             - 'raw'
             - 'response'
             - 'ids'
+            - 'stream' : iterate over documents as they are downloaded
         verbose
         
 
@@ -1067,14 +1929,10 @@ class Documents(object):
             d['group_id'] = group_id
         if include_trashed and include_trashed is not None:
             d['include_trashed'] = include_trashed
-        if limit and limit is not None:
-            if limit == 0:
-                #0 is code for get all
-                #we'll max out our per request size
-                #then merge below
-                d['limit'] = 500
-            else:
-                d['limit'] = limit
+        if limit:
+            #0 is code for get all, the page size is set below and the
+            #pages are merged
+            d['limit'] = limit
         if modified_since and modified_since is not None:
             d['modified_since'] = modified_since
             convert_datetime_to_string(d, 'modified_since')
@@ -1089,6 +1947,8 @@ class Documents(object):
         if tag and tag is not None:
             d['tag'] = tag
 
+        view = _resolve_view(view, fields, document_fcns, DOCUMENT_VIEW_ORDER)
+
         response_doc_fcn = document_fcns[view]
         response_view = view
 
@@ -1096,7 +1956,7 @@ class Documents(object):
             # If no view specified, set default to 'all'
             d['view'] = 'all'
             response_view = 'all'
-        elif view == 'ids':
+        elif view in ('ids', 'core'):
             #No view, default of None is ok
             #i.e. no assignment made to d[]
             pass
@@ -1111,6 +1971,10 @@ class Documents(object):
             'page_id':0
             }
 
+        if limit == 0:
+            _set_page_limit(self.parent, d, response_params, '/documents', 
+                            response_view)
+
         verbose = _process_verbose(self.parent,d,response_params)
         
         if verbose:
@@ -1124,12 +1988,160 @@ class Documents(object):
                                               d, 
                                               response_params)
 
-        if limit == 0:
-            #TODO: Test this when the return type is not an object ...
+        if limit == 0 and isinstance(result, models.DocumentSet):
             result.get_all_docs()       
         
         return result
 
+    def get_sharded(self,
+                    n_shards: int = 4,
+                    verbose: Optional[bool] = None,
+                    authored: Optional[bool] = None,
+                    folder_id: Optional[str] = None,
+                    group_id: Optional[str] = None,
+                    include_trashed: Optional[bool] = None,
+                    modified_since: DST = None,
+                    profile_id: Optional[str] = None,
+                    starred: Optional[bool] = None,
+                    tag: Union[List[str],str,None] = None,
+                    view: Optional[str] = None):
+        """
+        Retrieves all documents, splitting the library into n_shards time 
+        windows (based on last_modified) that are downloaded concurrently.
+        
+        The next links of a single listing can only be followed one after 
+        another, so for a large library this is much faster than 
+        get(limit=0). It is meant for initial syncs.
+        
+        Shard boundaries are chosen so that each shard holds about the same
+        # of documents, using the Mendeley-Count of 'modified_since' 
+        queries. Each shard is listed with sort='last_modified' and stops 
+        once it reaches the start of the next shard. Documents that show up 
+        in two shards (boundary overlap, or modified during the download) 
+        are only returned once.
+        
+        Parameters
+        ----------
+        n_shards : int (default 4)
+            # of concurrent listings. This is reduced for small libraries.
+        view :
+            See get(). 'ids' is not supported as the timestamps are needed.
+            
+        See get() for the other parameters.
+        
+        Returns
+        -------
+        list
+            Documents sorted by last_modified.
+            
+        Examples
+        --------
+        from mendeley import API
+        m = API(thread_safe=True)
+        docs = m.documents.get_sharded(n_shards=8)
+        """
+
+        if view == 'ids':
+            raise ValueError("view='ids' is not supported for sharded fetching")
+
+        if verbose is None:
+            verbose = self.parent.verbose
+
+        common = {'authored': authored,
+                  'folder_id': folder_id,
+                  'group_id': group_id,
+                  'include_trashed': include_trashed,
+                  'profile_id': profile_id,
+                  'starred': starred,
+                  'tag': tag,
+                  'sort': 'last_modified',
+                  'order': 'asc'}
+
+        def get_count(since):
+            resp = self.get(limit=1, view='ids', modified_since=since,
+                            return_type='response', **common)
+            count = resp.headers.get('Mendeley-Count')
+            return None if count is None else int(count)
+
+        first = self.get(limit=1, view=view, modified_since=modified_since, 
+                         return_type='object', **common)
+        if len(first.docs) == 0:
+            return []
+
+        total = int(first.total_count)
+        start_time = _parse_time(first.json[0]['last_modified'])
+        end_time = datetime.now(timezone.utc).replace(tzinfo=None)
+
+        #Shards smaller than a page aren't worth it
+        n_shards = max(min(n_shards, -(-total // SHARD_PAGE_SIZE)), 1)
+
+        if get_count(start_time) is None:
+            #Without counts we can't balance the shards
+            n_shards = 1
+
+        def find_boundary(target):
+            #Bisect on time for the point after which 'target' docs remain
+            lo = start_time
+            hi = end_time
+            tolerance = max(total // (20 * n_shards), 1)
+            for i in range(25):
+                mid = lo + (hi - lo) / 2
+                count = get_count(mid)
+                if abs(count - target) <= tolerance:
+                    break
+                if count > target:
+                    lo = mid
+                else:
+                    hi = mid
+            return mid
+
+        def get_shard(start, stop):
+            docs = []
+            page = self.get(limit=SHARD_PAGE_SIZE, view=view,
+                            modified_since=start, return_type='object', 
+                            **common)
+            while page:
+                for doc_json, doc in zip(page.json, page.docs):
+                    if stop is not None and \
+                            _parse_time(doc_json['last_modified']) >= stop:
+                        return docs
+                    docs.append((doc_json['id'], doc_json['last_modified'], doc))
+                page = page.next_page()
+            return docs
+
+        with ThreadPoolExecutor(max_workers=n_shards) as ex:
+            def map_in_context(fcn, *args):
+                #Each call gets a copy of this thread's context so that an
+                #API.deadline() applies
+                contexts = [contextvars.copy_context() for x in args[0]]
+                return ex.map(lambda c, *a: c.run(fcn, *a), contexts, *args)
+
+            targets = [total - i * total // n_shards for i in range(1, n_shards)]
+            boundaries = sorted(set(map_in_context(find_boundary, targets)))
+
+            if verbose:
+                print('Retrieving %d documents in %d shards, boundaries: %s' 
+                      % (total, len(boundaries) + 1, boundaries))
+
+            #The first shard uses the caller's start. Other shards start 
+            #slightly early in case 'modified_since' is exclusive, the 
+            #overlap is removed below.
+            starts = [modified_since] + \
+                [x - timedelta(seconds=1) for x in boundaries]
+            stops = boundaries + [None]
+            shards = list(map_in_context(get_shard, starts, stops))
+
+        #A document modified during the download may be in two shards,
+        #keep the most recent version
+        docs_by_id = {}
+        for shard in shards:
+            for doc_id, last_modified, doc in shard:
+                old = docs_by_id.get(doc_id)
+                if old is None or old[0] <= last_modified:
+                    docs_by_id[doc_id] = (last_modified, doc)
+
+        return [x[1] for x in sorted(docs_by_id.values(), key=lambda x: x[0])]
+
     def get_by_id(self,
                    id: str,
                    return_type: Optional[str] = None,
@@ -1178,7 +2190,7 @@ class Documents(object):
             'limit': 1}
 
         return self.parent.make_get_request(url, models.DocumentSet.create, 
-                                            d, response_params)
+                                            d, response_params, hedge=True)
 
     def get_deleted(self,
             limit: Optional[int] = 20,
@@ -1200,15 +2212,10 @@ class Documents(object):
         d = dict()
         if return_type and return_type is not None:
             d['return_type'] = return_type
-        if limit and limit is not None:
-            if limit == 0:
-                #0 is code for get all
-                #we'll max out our per request size
-                #then merge below
-                d['limit'] = 500
-            else:
-                d['limit'] = limit
-
+        if limit:
+            #0 is code for get all, the page size is set below and the
+            #pages are merged
+            d['limit'] = limit
 
         if since and since is not None:
             d['deleted_since'] = since
@@ -1227,6 +2234,10 @@ class Documents(object):
             'page_id': 0
         }
 
+        if limit == 0:
+            _set_page_limit(self.parent, d, response_params, '/documents', 
+                            response_view)
+
         verbose = _process_verbose(self.parent, d, response_params)
         if verbose:
             if limit == 0:
@@ -1241,8 +2252,7 @@ class Documents(object):
         result = self.parent.make_get_request(url, models.DocumentSet.create,
                                               d, response_params)
 
-        if limit == 0:
-            # TODO: Test this when the return type is not an object ...
+        if limit == 0 and isinstance(result, models.DocumentSet):
             result.get_all_docs()
 
         return result
@@ -1327,7 +2337,7 @@ class Documents(object):
         headers = dict()
         headers['Content-Type'] = 'application/vnd.mendeley-document.1+json'
 
-        resp =  self.parent.s.post(url, headers=headers, auth = self.parent.access_token)
+        self.parent.make_request('POST', url, headers=headers)
         return
     
     
@@ -1441,8 +2451,7 @@ class Documents(object):
   
         result = self.parent.make_get_request(url, models.DocumentSet.create, d, response_params)
 
-        if limit == 0:
-            #TODO: Test this when the return type is not an object ...
+        if limit == 0 and isinstance(result, models.DocumentSet):
             result.get_all_docs()       
         
         return result
@@ -1507,14 +2516,10 @@ class Files(object):
             d['group_id'] = group_id
         if include_trashed and include_trashed is not None:
             d['include_trashed'] = include_trashed            
-        if limit and limit is not None:
-            if limit == 0:
-                #0 is code for get all
-                #we'll max out our per request size
-                #then merge below
-                d['limit'] = 500
-            else:
-                d['limit'] = limit
+        if limit:
+            #0 is code for get all, the page size is set below and the
+            #pages are merged
+            d['limit'] = limit
                 
         response_params = {
             'fcn': models.File,
@@ -1522,6 +2527,9 @@ class Files(object):
             'page_id': 0
             }
 
+        if limit == 0:
+            _set_page_limit(self.parent, d, response_params, '/files')
+
         verbose = _process_verbose(self.parent,d,response_params)
         
         if verbose:
@@ -1532,6 +2540,9 @@ class Files(object):
                                               d, 
                                               response_params)
 
+        if limit == 0 and isinstance(result, models.FileSet):
+            result.get_all_docs()
+
         return result
     
     def get_file_bytes(self,file_id):
@@ -1548,10 +2559,9 @@ class Files(object):
         # Next need to make another API request using the file ID in order
         # to retrieve the file content and download it.
         new_url = self.url + '/' + file_id
-        new_params = {'file_id': file_id}
-        resp = requests.get(new_url, 
-                            params=new_params, 
-                            auth=self.parent.access_token)
+        new_params = {'file_id': file_id,
+                      'return_type': 'response'}
+        resp = self.parent.make_get_request(new_url, None, new_params)
 
         file_content = resp.content
         
@@ -1600,7 +2610,8 @@ class Files(object):
         headers['Content-Disposition'] = 'attachment; filename=%s' % filename
         headers['Link'] = '<' + BASE_URL + '/documents/' + doc_id + '>; rel="document"'
 
-        API.make_post_request(API(), self.url, object_fh, params, headers=headers, files=file)
+        return self.parent.make_post_request(self.url, object_fh, params, 
+                                             headers=headers, files=file)
 
     def link_file_from_url(self, file, params, file_url):
         """
@@ -1635,12 +2646,13 @@ class Files(object):
         headers['Content-Disposition'] = 'attachment; filename=%s' % filename
         headers['Link'] = '<' + BASE_URL + '/documents/' + doc_id + '>; rel="document"'
 
-        API.make_post_request(API(), self.url, object_fh, params, headers=headers, files=file)
+        return self.parent.make_post_request(self.url, object_fh, params, 
+                                             headers=headers, files=file)
 
     def delete(self, file_id):
         url = self.url + '/' + file_id
         params = {'file_id': file_id}
-        resp = requests.delete(url, params=params, auth=self.parent.access_token)
+        resp = self.parent.make_request('DELETE', url, params=params)
 
         if not resp.ok:
             if resp.status_code == 404:
@@ -1905,7 +2917,8 @@ class MetaData(object):
                                                   models.json_only, 
                                                   d, 
                                                   response_params,
-                                                  headers=headers)  
+                                                  headers=headers,
+                                                  cache=True)  
         except:
             result = None
             
@@ -1988,7 +3001,8 @@ class Profiles(object):
         result = self.parent.make_get_request(self.url, 
                                               models.Profile, 
                                               d, 
-                                              response_params)
+                                              response_params,
+                                              cache=True)
         
         return result
             
@@ -2009,7 +3023,8 @@ class Profiles(object):
         url = self.url + '/me'
         result = self.parent.make_get_request(url, 
                                               models.Profile, 
-                                              d)
+                                              d,
+                                              cache=True)
         
         return result
     
@@ -2035,7 +3050,9 @@ class Trash(object):
                 sort: Optional[str]=None,
                 starred: Optional[bool]=None,
                 tag: Union[List[str], str, None] = None,
-                view: Optional[str] = None):
+                view: Optional[str] = None,
+                verbose: Optional[bool] = None,
+                fields: Optional[List[str]] = None):
         """       
         
         Online Documentation
@@ -2064,6 +3081,10 @@ class Trash(object):
             - 'tags' : returns user's tags
             - 'patent'
             - 'all'
+            - 'core'
+            - 'ids'
+        fields : list of str
+            Instead of a view, the fields that are needed, see Documents.get
         sort : string
             Field to sort on. Avaiable options:
             - 'created'
@@ -2073,21 +3094,11 @@ class Trash(object):
 
         url = BASE_URL + '/trash'
 
-        #----------------------------------------------
-        #----------------------------------------------
-        #JAH: At this point ...
-        #----------------------------------------------
-        #----------------------------------------------
-
-        #Accept : header
-        #x folder_id
-        #x group_id
-        #x limit
-        #x modified_since
-
         d = dict()
         if return_type and return_type is not None:
             d['return_type'] = return_type
+        if verbose and verbose is not None:
+            d['verbose'] = verbose
         if authored and authored is not None:
             d['authored'] = authored
         if deleted_since and deleted_since is not None:
@@ -2099,41 +3110,42 @@ class Trash(object):
             d['group_id'] = group_id
         if include_trashed and include_trashed is not None:
             d['include_trashed'] = include_trashed
-        if limit and limit is not None:
-            if limit == 0:
-                # 0 is code for get all
-                # we'll max out our per request size
-                # then merge below
-                limit = 500
+        if limit:
+            #0 is code for get all, the page size is set below and the
+            #pages are merged
             d['limit'] = limit
+        if modified_since and modified_since is not None:
+            d['modified_since'] = modified_since
+            convert_datetime_to_string(d, 'modified_since')
+        if order and order is not None:
+            d['order'] = order
+        if profile_id and profile_id is not None:
+            d['profile_id'] = profile_id
+        if sort and sort is not None:
+            d['sort'] = sort
+        if starred and starred is not None:
+            d['starred'] = starred
+        if tag and tag is not None:
+            d['tag'] = tag
 
-
-
-
-        if 'id' in kwargs:
-            id = kwargs.pop('id')
-            url += '/%s/' % id
-            
-            
         #JAH TODO: This is duplicated with Documents.get
         #Ideally we would call out to a similar function
-        view = kwargs.get('view')
+        view = _resolve_view(view, fields, document_fcns, DOCUMENT_VIEW_ORDER)
+
         rp_view = view
         rp_doc_fcn = document_fcns[view]
             
-        if view == "ids":
+        if view in ('ids', 'core'):
             #Default view of None seems to be the shortest
             #All we want is the ids, so send as little as possible
-            del kwargs["view"]
-        elif 'deleted_since' in kwargs:
+            pass
+        elif view is not None:
+            d['view'] = view
+
+        if deleted_since and deleted_since is not None:
             #Modify returned object
             rp_view = 'deleted'
-    
-
-
-        limit = kwargs.get('limit', 20)
-        if limit == 0:
-            kwargs['limit'] = 500            
+            rp_doc_fcn = document_fcns[rp_view]
             
         #Most of these are reference only, except for fcn
         response_params = {
@@ -2142,17 +3154,20 @@ class Trash(object):
         'limit': limit, 
         'page_id':0}   
 
-        verbose = _process_verbose(self.parent,kwargs,response_params)
+        if limit == 0:
+            _set_page_limit(self.parent, d, response_params, '/trash', rp_view)
+
+        verbose = _process_verbose(self.parent,d,response_params)
 
         if verbose:
             if limit == 0:
-                print("Requesting all trash documents from Mendeley with params: %s" % (kwargs))    
+                print("Requesting all trash documents from Mendeley with params: %s" % (d))    
             else:
-                print("Requesting up to %d trash documents from Mendeley with params: %s" % (limit, kwargs))
+                print("Requesting up to %d trash documents from Mendeley with params: %s" % (limit, d))
   
-        result = self.parent.make_get_request(url, models.DocumentSet.create, kwargs, response_params)           
+        result = self.parent.make_get_request(url, models.DocumentSet.create, d, response_params)           
            
-        if limit == 0:
+        if limit == 0 and isinstance(result, models.DocumentSet):
             result.get_all_docs()       
         
         return result    
@@ -2164,10 +3179,49 @@ class Trash(object):
         pass
 
 
+def _parse_time(value):
+    """
+    Parses timestamps returned by Mendeley, e.g. '2015-02-12T11:28:03.000Z'
+    """
+    return datetime.strptime(value, STR_FORMAT)
+
 def convert_datetime_to_string(d, key):
     if key in d and isinstance(d[key], datetime):
         d[key] = d[key].strftime("%Y-%m-%dT%H:%M:%S.%fZ")
         
+_STREAM_ERROR = ("return_type 'stream' is only supported for paged list "
+                 "endpoints")
+
+def _is_paged(response_params):
+    """
+    Whether the response is a page of a list, which is required for 
+    return_type='stream'.
+    """
+    return response_params is not None and 'page_id' in response_params
+
+def _set_page_limit(api, params, response_params, endpoint, view=None):
+    """
+    Sets the page size of a limit=0 (get all) request. The pages that 
+    follow are sized by API.get_next_page_url()
+
+    Parameters
+    ----------
+    api : API
+    params : dict
+        Query parameters, 'limit' is set.
+    response_params : dict
+    endpoint : str
+        e.g. '/documents', see mendeley.paging.MAX_LIMITS
+    view : str
+    """
+    if api.pager is None:
+        limit = paging.get_max_limit(endpoint)
+    else:
+        limit = api.pager.get_limit(endpoint, view)
+    params['limit'] = limit
+    response_params['page_key'] = (endpoint, view)
+    response_params['page_limit'] = limit
+
 def _process_verbose(api,kwargs,response_params):
     
     """
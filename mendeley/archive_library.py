@@ -21,6 +21,7 @@ from PyQt5.QtWidgets import *
 # Local imports
 from . import client_library
 from . import api
+from .scheduler import BACKGROUND
 
 
 class Archivist:
@@ -55,9 +56,19 @@ class Archivist:
 
         self.archive_list = []
         self.volume_number = 1
-        self.retry_counter = 0
 
     def archive(self, root_path=None):
+        """
+        The requests are made at background priority, so interactive 
+        requests made with the same API are served first. This only applies
+        if the API was created with a bounded scheduler, e.g.
+        API(scheduler=RequestScheduler(max_concurrency=10)); by default 
+        there is no limit and requests aren't reordered.
+        """
+        with self.m.priority(BACKGROUND):
+            self._archive(root_path)
+
+    def _archive(self, root_path):
         # Setup
         # -----
 
@@ -136,15 +147,11 @@ class Archivist:
                 doc_id = doc.get('id')
 
                 # First get the content and name of the attached pdf
+                # Throttling and transient server errors are retried by the
+                # API, so an error here is logged rather than restarting
+                # the archive
                 try:
                     file_content, file_name = self.m.files.get_file_content_from_doc_id(doc_id=doc_id)
-                except PermissionError:
-                    self.retry_counter += 1
-                    if self.retry_counter <= 5:
-                        # If a server error was encountered, retry (maximum of 5 times)
-                        self.archive(root_path=self.root_path)
-                    else:
-                        raise ConnectionError('PermissionError encountered and 5 archival retries failed.')
                 except Exception as exc:
                     file_content = ''
                     file_name = 'none' + str(count)
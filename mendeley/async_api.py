@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+"""
+asyncio counterpart to mendeley.api.API
+
+The endpoint groups mirror the ones on API (documents, files, annotations,
+catalog, trash, folders, metadata, profiles) but every method is a coroutine.
+The underlying calls are still made with the blocking API; they are run on a
+thread pool and the number of calls in flight is capped by max_concurrency.
+
+General Usage
+-------------
+import asyncio
+from mendeley import AsyncAPI
+
+async def main(dois):
+    async with AsyncAPI(max_concurrency=20) as m:
+        tasks = [m.catalog.get(doi=doi) for doi in dois]
+        return await asyncio.gather(*tasks)
+
+results = asyncio.run(main(['10.1002/bit.25159','10.1002/biot.201400046']))
+
+A DocumentSet (or FileSet) returned by a call belongs to the blocking API, so
+iterating over it requests the following pages with blocking calls that 
+stall the event loop. Use AsyncAPI.iter_docs() instead:
+
+async with AsyncAPI() as m:
+    docs = await m.documents.get(limit=0)
+    async for doc in m.iter_docs(docs):
+        print(doc.title)
+
+See Also
+--------
+mendeley.api.API
+"""
+
+#Standard Library
+import asyncio
+import functools
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+#Local Imports
+from .api import API
+from .transport import Transport
+from . import utils
+from .utils import get_list_class_display as cld
+
+#Names of the endpoint groups on API that get an async version
+ENDPOINT_NAMES = ('annotations', 'catalog', 'definitions', 'documents',
+                  'files', 'folders', 'metadata', 'profiles', 'trash')
+
+class AsyncAPI(object):
+
+    """
+    Attributes
+    ----------
+    api : API
+        The blocking API that is used to make the requests.
+    max_concurrency : int
+        Maximum # of requests that may be in flight at once.
+    """
+
+    def __init__(self,
+                 api=None,
+                 max_concurrency=10,
+                 **kwargs):
+        """
+        Parameters
+        ----------
+        api : API (default None)
+            If not passed in a thread safe API is created using kwargs. 
+            Unless a transport is passed in, its connection pool holds 
+            max_concurrency connections.
+        max_concurrency : int (default 10)
+            Maximum # of requests that may be in flight at once. If the API
+            has a scheduler with a lower max_concurrency, that is the limit
+            instead.
+        kwargs :
+            Passed to API() when api is not specified.
+
+        Examples
+        --------
+        m = AsyncAPI()
+        m = AsyncAPI(user_name='public',max_concurrency=50)
+        m = AsyncAPI(API(verbose=True))
+        """
+
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+
+        if api is None:
+            kwargs.setdefault('thread_safe', True)
+            if 'transport' not in kwargs:
+                kwargs['transport'] = Transport(pool_maxsize=max_concurrency)
+            api = API(**kwargs)
+
+        self.api = api
+        self.max_concurrency = max_concurrency
+
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix='mendeley')
+        #Created on first use so that it belongs to the running loop
+        self._semaphore = None
+
+        for name in ENDPOINT_NAMES:
+            setattr(self, name, _AsyncEndpoint(self, name))
+
+    def _run_method(self, endpoint_name, method_name, args, kwargs):
+        method = getattr(getattr(self.api, endpoint_name), method_name)
+        return method(*args, **kwargs)
+
+    async def run(self, fcn, *args, **kwargs):
+        """
+        Runs a blocking function on the pool, subject to the concurrency
+        limit. This is used by the endpoint groups but is also available for
+        running any other blocking code that uses the API.
+
+        Examples
+        --------
+        content = await m.run(m.api.files.get_file_bytes,file_id)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        loop = asyncio.get_running_loop()
+        #Copy the context so that an API.deadline() applies to the call
+        context = contextvars.copy_context()
+        call = functools.partial(context.run, fcn, *args, **kwargs)
+        async with self._semaphore:
+            return await loop.run_in_executor(self._executor, call)
+
+    async def iter_docs(self, page):
+        """
+        Iterates over the documents of a DocumentSet (or FileSet) and all
+        following pages. The following pages are requested using run(), 
+        rather than with blocking calls as when iterating over the set.
+
+        Parameters
+        ----------
+        page : DocumentSet or FileSet
+        """
+        while page is not None:
+            for doc in page.docs:
+                yield doc
+            page = await self.run(page.next_page)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+    async def aclose(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.close)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
+
+    def __repr__(self):
+        pv = [
+            'api', cld(self.api),
+            'max_concurrency', self.max_concurrency,
+            '---', '--- method props ---']
+        for name in ENDPOINT_NAMES:
+            pv.extend([name, cld(getattr(self, name))])
+        return utils.property_values_to_string(pv)
+
+class _AsyncEndpoint(object):
+
+    """
+    Async version of an endpoint group, e.g. AsyncAPI.documents
+
+    Method lookups are forwarded to the corresponding group on API and
+    wrapped so that calling them returns a coroutine.
+    """
+
+    def __init__(self, parent, name):
+        self.parent = parent
+        self.name = name
+
+        #The endpoint group of the blocking API, methods are looked up in 
+        #__getattr__ (so invalid names only fail when they are accessed)
+        self._methods = getattr(parent.api, name)
+
+    def __getattr__(self, method_name):
+
+        if method_name.startswith('_'):
+            raise AttributeError(method_name)
+
+        #Raises AttributeError for unknown methods
+        method = getattr(self._methods, method_name)
+        if not callable(method):
+            return method
+
+        parent = self.parent
+        name = self.name
+
+        @functools.wraps(method)
+        async def async_method(*args, **kwargs):
+            return await parent.run(parent._run_method, name, method_name,
+                                    args, kwargs)
+
+        return async_method
+
+    def __dir__(self):
+        return [x for x in dir(self._methods) if not x.startswith('_')]
+
+    def __repr__(self):
+        pv = ['name', self.name,
+              '-------methods-------', '-------------------']
+        for x in self.__dir__():
+            if callable(getattr(self._methods, x)):
+                pv.extend([x, 'async ' + x])
+        return utils.property_values_to_string(pv)
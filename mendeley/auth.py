@@ -33,7 +33,9 @@ import random
 import pickle
 import os
 import sys
+import time
 import datetime
+import threading
 
 
 #Third Party
@@ -45,13 +47,17 @@ import pytz #This seems to be a 3rd party library but is installed on
 #Local imports
 from . import utils
 from .utils import get_truncated_display_string as td
-#from .utils import get_list_class_display as cld
+from .utils import get_list_class_display as cld
 
 #TODO: Why don't we use config_helpers?
 from . import config
 from . import errors
+from . import token_store
 
 
+#Timeout (connect, read) in seconds for authorization requests
+AUTH_TIMEOUT = (10, 30)
+
 #Error definitions
 #-------------------------------------
 def _print_error(*args, **kwargs):
@@ -105,10 +111,173 @@ def retrieve_user_authorization(user_name=None,
     else:
         return _UserAuthorization(user_name, user_info, session)
         
+def get_token_manager(authorization, background=True):
+    """
+    Returns the TokenManager shared by all API instances of a user.
+    
+    Parameters
+    ----------
+    authorization : _UserAuthorization or _PublicAuthorization
+    background : bool (default True)
+        Passed to TokenManager if a new manager is created.
+    """
+    with _managers_lock:
+        manager = _managers.get(authorization.user_name)
+        if manager is None:
+            manager = TokenManager(authorization, background=background)
+            _managers[authorization.user_name] = manager
+        elif authorization is not manager.authorization and \
+                authorization.expires > manager.authorization.expires:
+            #e.g. force_reload=True
+            manager.set_authorization(authorization)
+        return manager
+        
 """
 -------------------------------------------------------------------------------
 """
 
+_managers = {}
+_managers_lock = threading.Lock()
+
+class TokenManager(AuthBase):
+    
+    """
+    Adds the access token to requests, see API.access_token
+    
+    The token is renewed in a background thread shortly before it expires
+    so that requests don't wait on a renewal. If a request finds the token 
+    about to expire (e.g. after the computer was asleep) it renews it 
+    itself. Only one renewal runs at a time, other threads wait for it and 
+    then use the new token.
+    
+    Attributes such as user_name and expires are those of the wrapped 
+    authorization.
+    
+    Attributes
+    ----------
+    authorization : _UserAuthorization or _PublicAuthorization
+    background_margin : datetime.timedelta
+        How long before expiration the background renewal is made.
+    n_renewals : int
+    """
+    
+    #Wait before retrying a failed background renewal, in seconds
+    RETRY_DELAY = 30
+    
+    #Longest wait of the background thread before it rechecks the time. 
+    #Its waits don't advance while the computer is asleep.
+    MAX_WAIT = 60
+    
+    def __init__(self, authorization, background=True,
+                 background_margin=datetime.timedelta(minutes=5)):
+        """
+        Parameters
+        ----------
+        authorization : _UserAuthorization or _PublicAuthorization
+        background : bool (default True)
+            If False, tokens are only renewed when a request is made.
+        background_margin : datetime.timedelta (default 5 minutes)
+        """
+        self.authorization = authorization
+        self.background_margin = background_margin
+        self.n_renewals = 0
+        
+        self._renew_lock = threading.Lock()
+        self._changed = threading.Event()
+        self._set_header()
+        
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(target=self._run,
+                                            name='mendeley-token-renewal',
+                                            daemon=True)
+            self._thread.start()
+            
+    def _get_seconds_left(self):
+        expires = self.authorization.expires
+        return (expires - datetime.datetime.now(pytz.utc)).total_seconds()
+        
+    def _set_header(self):
+        auth = self.authorization
+        #A wall clock timestamp so that each request only needs a cheap 
+        #time check. time.monotonic() can't be used as it doesn't advance
+        #while the computer is asleep, when the token keeps expiring.
+        self._renew_at = (auth.expires - auth.RENEW_TIME).timestamp()
+        self._header = 'bearer ' + auth.access_token
+            
+    def __call__(self, r):
+        if time.time() >= self._renew_at:
+            self.renew(self._header)
+        r.headers['Authorization'] = self._header
+        return r
+        
+    def renew(self, stale_header=None):
+        """
+        Renews the token. 
+        
+        Parameters
+        ----------
+        stale_header : str (default None)
+            The header that the caller found to be expiring. If another 
+            thread has renewed the token in the meantime, nothing is done.
+        """
+        with self._renew_lock:
+            if stale_header is not None and stale_header != self._header:
+                return
+            self.authorization.renew_token()
+            self.n_renewals += 1
+            self._set_header()
+        self._changed.set()
+        
+    def set_authorization(self, authorization):
+        with self._renew_lock:
+            self.authorization = authorization
+            self._set_header()
+        self._changed.set()
+            
+    def _run(self):
+        delay = None
+        while True:
+            if delay is None:
+                delay = self._get_seconds_left() - \
+                    self.background_margin.total_seconds()
+                if delay <= 0 and self.n_renewals > 0:
+                    #The token lasts less than the margin, avoid renewing 
+                    #it continuously
+                    delay = self.RETRY_DELAY
+            wait = min(delay, self.MAX_WAIT)
+            if wait > 0 and self._changed.wait(wait):
+                #New token, recompute the delay
+                self._changed.clear()
+                delay = None
+                continue
+            if delay > wait:
+                #Recheck, the computer may have been asleep
+                delay = None
+                continue
+            try:
+                self.renew(self._header)
+                delay = None
+            except Exception as e:
+                _print_error('Background token renewal failed for %s: %s' 
+                             % (self.authorization.user_name, e))
+                delay = self.RETRY_DELAY
+            self._changed.clear()
+                
+    def __getattr__(self, name):
+        #Only called for attributes not found on the manager
+        if name == 'authorization':
+            raise AttributeError(name)
+        return getattr(self.authorization, name)
+        
+    def __repr__(self):
+        pv = ['user_name', self.authorization.user_name,
+              'expires', str(self.authorization.expires),
+              'background', self._thread is not None,
+              'n_renewals', self.n_renewals,
+              'authorization', cld(self.authorization)]
+        return utils.property_values_to_string(pv)
+
 class _Authorization(AuthBase):
     
     """
@@ -131,7 +300,7 @@ class _Authorization(AuthBase):
     """
     Abstract Methods
     ----------------
-    renew_token
+    _renew_token
     
     """
     #The amount of time prior to token expiration that a request should be
@@ -145,6 +314,9 @@ class _Authorization(AuthBase):
     RENEW_TIME = datetime.timedelta(minutes=1) 
     
     AUTH_URL = 'https://api.mendeley.com/oauth/token'   
+    
+    #Attributes saved to disk, in addition to 'expires'
+    _SAVED_FIELDS = ('user_name', 'access_token', 'token_type')
    
     @staticmethod
     def get_save_base_path(create_folder_if_no_exist=False):
@@ -184,6 +356,27 @@ class _Authorization(AuthBase):
         if datetime.datetime.now(pytz.utc) + self.RENEW_TIME > self.expires:
             self.renew_token()
             
+    def renew_token(self):
+        """
+        Renews the access token, unless another process has already done so.
+        
+        The renewal is made while holding a lock on the token file that is
+        shared with other processes. If the token on disk is newer than 
+        this one and isn't about to expire, it is used instead of making a
+        request. This avoids processes invalidating each other's refresh
+        tokens.
+        """
+        file_path = self.get_token_path(self.user_name, True)
+        with token_store.get_lock(file_path):
+            data = token_store.load(file_path)
+            if data is not None:
+                expires = datetime.datetime.fromisoformat(data['expires'])
+                now = datetime.datetime.now(pytz.utc)
+                if expires > self.expires and now + self.RENEW_TIME < expires:
+                    self.init_from_dict(data)
+                    return
+            self._renew_token()
+            
     def __call__(self,r):
         
         """
@@ -229,6 +422,55 @@ class _Authorization(AuthBase):
         final_save_path  = os.path.join(save_folder_path,save_name)
         
         return final_save_path
+    
+    @classmethod
+    def get_token_path(cls, user_name, create_folder_if_no_exist=False):
+        """
+        Path of the JSON token file. Tokens used to be pickled to the path 
+        given by get_file_path(), these are converted when loaded.
+        """
+        save_name = utils.user_name_to_file_name(user_name) + '.json'
+        save_folder_path = cls.get_save_base_path(create_folder_if_no_exist)
+        return os.path.join(save_folder_path, save_name)
+    
+    @classmethod
+    def token_file_exists(cls, user_name):
+        """
+        A JSON token file that can't be read (e.g. a truncated file) counts
+        as missing so that a new token is requested.
+        """
+        data = token_store.load(cls.get_token_path(user_name))
+        return data is not None or os.path.isfile(cls.get_file_path(user_name))
+    
+    def to_dict(self):
+        d = {x: getattr(self, x) for x in self._SAVED_FIELDS}
+        d['expires'] = self.expires.isoformat()
+        return d
+    
+    def init_from_dict(self, d):
+        for x in self._SAVED_FIELDS:
+            setattr(self, x, d[x])
+        self.expires = datetime.datetime.fromisoformat(d['expires'])
+        
+    @classmethod
+    def load_from_disk(cls, user_name):
+        """
+        Returns the saved token, or None if there isn't one.
+        """
+        data = token_store.load(cls.get_token_path(user_name))
+        if data is not None:
+            self = cls.__new__(cls)
+            self.init_from_dict(data)
+            return self
+        
+        #Older, pickled tokens
+        load_path = cls.get_file_path(user_name)
+        if not os.path.isfile(load_path):
+            return None
+        with open(load_path,'rb') as f:
+            self = pickle.load(f)
+        self.save()
+        return self
         
     def populate_session(self,session=None):
         if session is None:
@@ -239,11 +481,12 @@ class _Authorization(AuthBase):
     def save(self):
         
         """
-        Saves the class instance to disk.
+        Saves the token to disk, see mendeley.token_store
         """
-        save_path = self.get_file_path(self.user_name, create_folder_if_no_exist=True)
-        with open(save_path, "wb") as f:
-            pickle.dump(self,f)
+        save_path = self.get_token_path(self.user_name, 
+                                        create_folder_if_no_exist=True)
+        with token_store.get_lock(save_path):
+            token_store.save(save_path, self.to_dict())
 
 class _PublicAuthorization(_Authorization):
     
@@ -280,7 +523,7 @@ class _PublicAuthorization(_Authorization):
             'client_id'     : config.Oauth2Credentials.client_id,
             }   
   
-        r = requests.post(URL,data=payload)
+        r = requests.post(URL,data=payload,timeout=AUTH_TIMEOUT)
         
         if r.status_code != requests.codes.ok:
             raise Exception('Request failed, TODO: Make error more explicit')
@@ -299,7 +542,7 @@ class _PublicAuthorization(_Authorization):
               'token_expired',self.token_expired]
         return utils.property_values_to_string(pv)
                 
-    def renew_token(self):
+    def _renew_token(self):
         temp_json = self.create_initial_token()
         self.init_json_attributes(temp_json)
         self.save()
@@ -309,8 +552,7 @@ class _PublicAuthorization(_Authorization):
         """
         For public use 'public'
         """
-        load_path = cls.get_file_path('public')
-        return os.path.isfile(load_path)
+        return cls.token_file_exists('public')
         
     @classmethod
     def load(cls,session=None):
@@ -319,13 +561,10 @@ class _PublicAuthorization(_Authorization):
         
         """
    
-        load_path = cls.get_file_path('public')
+        self = cls.load_from_disk('public')
         
-        if not os.path.isfile(load_path):
+        if self is None:
             raise Exception('Requested token does not exist')
-                       
-        with open(load_path,'rb') as f:
-            self = pickle.load(f)
          
         self.populate_session(session)     
           
@@ -353,6 +592,7 @@ class _UserAuthorization(_Authorization):
     user_name : string
     access_token : string
         The actual access token. This might be renamed ...
+    refresh_token : string
     token_type : str
         I'm not really sure what this is for. It is currently sent in response
         to a request for an access token but I'm not using it. Currently the 
@@ -360,6 +600,8 @@ class _UserAuthorization(_Authorization):
         
     """  
 
+    _SAVED_FIELDS = ('version', 'user_name', 'access_token', 'token_type', 
+                     'refresh_token')
     
     def __init__(self, user_name=None, user_info=None, session = None):
         """
@@ -451,8 +693,7 @@ class _UserAuthorization(_Authorization):
         """
         
         user_info = cls.resolve_user_info(user_name,user_info)
-        load_path = cls.get_file_path(user_info.user_name)
-        return os.path.isfile(load_path)
+        return cls.token_file_exists(user_info.user_name)
       
     @classmethod
     def resolve_user_info(cls,user_name,user_info):
@@ -471,7 +712,7 @@ class _UserAuthorization(_Authorization):
             
         return user_info
       
-    def renew_token(self):     
+    def _renew_token(self):     
         """
         Renews the access token so that requests can be made for user data.      
       
@@ -488,7 +729,8 @@ class _UserAuthorization(_Authorization):
                      "redirect_uri" : config.Oauth2Credentials.redirect_url}
        
         #TODO: We should replace this with the session object            
-        r = requests.post(self.AUTH_URL, auth=client_auth, data=post_data)
+        r = requests.post(self.AUTH_URL, auth=client_auth, data=post_data,
+                          timeout=AUTH_TIMEOUT)
       
         #Observed errors:
         #----------------------------------
@@ -532,7 +774,7 @@ class _UserAuthorization(_Authorization):
             
             if (self.from_disk):
                 _print_error("Credentials loaded from:\n%s" % 
-                             self.get_file_path(self.user_name))
+                             self.get_token_path(self.user_name))
                 _print_error("------------------------------------------------")
                 _print_error(r.text)
                 _print_error("------------------------------------")
@@ -560,22 +802,17 @@ class _UserAuthorization(_Authorization):
             defined in the config file.
         """
         
-        #TODO: This should eventually have version lookup
-        #https://docs.python.org/2/library/pickle.html#pickling-and-unpickling-normal-class-instances
-        #would involve using __setstate__
+        #TODO: This should eventually have version lookup, the saved 
+        #'version' is available for this
         
         user_info = cls.resolve_user_info(user_name,user_info)        
         
-        load_path = cls.get_file_path(user_info.user_name)
+        self = cls.load_from_disk(user_info.user_name)
 
         #Handle potentially missing file
         #-------------------------------
-        if not os.path.isfile(load_path):
+        if self is None:
             raise Exception('Requested token does not exist')
-                       
-        with open(load_path,'rb') as f:
-            #TODO: Try to do this then specify where we are loading from if this fails
-            self = pickle.load(f)
         
         self.from_disk = True
         
@@ -740,7 +977,7 @@ class UserTokenRetriever(object):
             'scope'         : 'all',
             'state'         : rand_state}
         
-        r = self.session.get(URL, params=payload)
+        r = self.session.get(URL, params=payload, timeout=AUTH_TIMEOUT)
         
         #r = self.session.get(URL, params=payload,
         #                     proxies={"http": "http://127.0.0.1:8888", "https":"http:127.0.0.1:8888"},verify=False)
@@ -775,6 +1012,7 @@ class UserTokenRetriever(object):
         pdb.set_trace()
         
         r2 = self.session.post(URL2,data=payload2,allow_redirects=True,
+                               timeout=AUTH_TIMEOUT,
                                headers={'DNT':'1','User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:71.0) Gecko/20100101 Firefox/71.0',
                                         'referer': r.url,'Origin':'https://id.elsevier.com','Host':'id.elsevier.com'})
         
@@ -797,7 +1035,8 @@ class UserTokenRetriever(object):
         payload3 = {
             'password' : self.user_info.password,
             'action' : 'signin'}
-        r3 = self.session.post(r2.url,data=payload3,allow_redirects=True)  
+        r3 = self.session.post(r2.url,data=payload3,allow_redirects=True,
+                               timeout=AUTH_TIMEOUT)  
         
         import pdb
         pdb.set_trace()
@@ -810,7 +1049,8 @@ class UserTokenRetriever(object):
             'state'         : rand_state,
             'authorized'    : 'true'}
         
-        r4 = self.session.post(r3.url,data=payload4,allow_redirects=True)  
+        r4 = self.session.post(r3.url,data=payload4,allow_redirects=True,
+                               timeout=AUTH_TIMEOUT)  
         
         
         
@@ -882,7 +1122,8 @@ class UserTokenRetriever(object):
         password = config.Oauth2Credentials.client_secret
         r = self.session.post(access_token_url,
                               data=payload,
-                              auth=HTTPBasicAuth(username,password))
+                              auth=HTTPBasicAuth(username,password),
+                              timeout=AUTH_TIMEOUT)
     
         if r.status_code != requests.codes.ok:
             raise Exception('Error requesting initial access token')    
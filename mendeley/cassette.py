@@ -0,0 +1,332 @@
+# -*- coding: utf-8 -*-
+"""
+Recording of requests and offline replay.
+
+A RecordingTransport sends requests as usual and saves each request and
+its response (status, headers - including 'Link' and 'Mendeley-Count' -
+body and latency) to a cassette file. A ReplayTransport serves the
+responses from that file without a network connection, optionally sleeping
+for the recorded (or scaled) latency. This makes timing work on e.g. Sync
+or DocumentSet paging repeatable.
+
+When replaying, the API doesn't load or renew an access token.
+
+Identical requests are replayed in the order they were recorded (the last
+response is reused once they run out). The page size of limit=0 requests
+depends on timing (see mendeley.paging), so when a request has no exact
+match, the 'limit' query parameter is ignored.
+
+The API's response cache should be off (the default) while recording and
+replaying, otherwise conditional requests depend on the cache contents.
+
+General Usage
+-------------
+from mendeley import API
+from mendeley import cassette
+
+#Recording
+with cassette.record('sync.json') as t:
+    m = API(transport=t)
+    docs = m.documents.get(limit=0)
+
+#Replaying, with the recorded latencies
+t = cassette.replay('sync.json',latency_scale=1)
+m = API(transport=t)
+docs = m.documents.get(limit=0)
+"""
+
+#Standard Library
+import os
+import json
+import time
+import base64
+import threading
+from datetime import timedelta
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode, quote
+
+#Third party
+import requests
+from requests.structures import CaseInsensitiveDict
+
+#Local Imports
+from . import utils
+from . import errors
+from .transport import Transport
+
+CASSETTE_VERSION = 1
+
+#Not saved as the body is saved decoded
+_DROPPED_HEADERS = ('content-encoding', 'content-length', 'transfer-encoding')
+
+def get_request_url(method, url, params=None):
+    """
+    Returns the url with the query parameters included, as sent.
+    """
+    return requests.Request(method, url, params=params).prepare().url
+
+def _strip_limit(url):
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+             if k != 'limit']
+    return urlunsplit(parts._replace(query=urlencode(query, quote_via=quote)))
+
+def _encode_body(content):
+    try:
+        return content.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        return base64.b64encode(content).decode('ascii'), 'base64'
+
+def _decode_body(text, encoding):
+    if encoding == 'base64':
+        return base64.b64decode(text)
+    return text.encode('utf-8')
+
+class Cassette(object):
+
+    """
+    Recorded requests and responses.
+
+    Attributes
+    ----------
+    file_path : str
+    user_name : str or None
+        User of the API that made the recording.
+    interactions : list of dict
+    """
+
+    def __init__(self, file_path, user_name=None, interactions=None):
+        self.file_path = file_path
+        self.user_name = user_name
+        self.interactions = [] if interactions is None else interactions
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, file_path):
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+        if data.get('version') != CASSETTE_VERSION:
+            raise ValueError('Unsupported cassette version: %s'
+                             % data.get('version'))
+        return cls(file_path, data.get('user_name'), data['interactions'])
+
+    def save(self):
+        with self._lock:
+            data = {'version': CASSETTE_VERSION,
+                    'user_name': self.user_name,
+                    'interactions': list(self.interactions)}
+        temp_path = self.file_path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.file_path)
+
+    def add(self, method, url, response, elapsed, request_body=None):
+        """
+        Parameters
+        ----------
+        method : str
+        url : str
+            Including the query string.
+        response : requests.Response
+            The body must have been read.
+        elapsed : float
+            Seconds from sending the request until the body was read.
+        request_body : str or bytes or None
+        """
+        body, body_encoding = _encode_body(response.content)
+        if isinstance(request_body, bytes):
+            request_body = _encode_body(request_body)[0]
+        elif not isinstance(request_body, str):
+            request_body = None
+
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in _DROPPED_HEADERS}
+
+        interaction = {'method': method,
+                       'url': url,
+                       'request_body': request_body,
+                       'status_code': response.status_code,
+                       'reason': response.reason,
+                       'headers': headers,
+                       'body': body,
+                       'body_encoding': body_encoding,
+                       'elapsed': elapsed}
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def __len__(self):
+        return len(self.interactions)
+
+    def __repr__(self):
+        pv = ['file_path', self.file_path,
+              'user_name', self.user_name,
+              'n_interactions', len(self.interactions)]
+        return utils.property_values_to_string(pv)
+
+class RecordingTransport(Transport):
+
+    """
+    Transport that saves all requests and responses to a cassette. The
+    cassette is written by save(), close() or when used as a context
+    manager.
+
+    Attributes
+    ----------
+    cassette : Cassette
+    """
+
+    def __init__(self, file_path, **kwargs):
+        """
+        Parameters
+        ----------
+        file_path : str
+        kwargs :
+            Passed to mendeley.transport.Transport
+        """
+        super(RecordingTransport, self).__init__(**kwargs)
+        self.cassette = Cassette(file_path)
+
+    def request(self, method, url, **kwargs):
+        t0 = time.perf_counter()
+        response = super(RecordingTransport, self).request(method, url,
+                                                           **kwargs)
+        #Reading the body here (even when streaming) keeps the response
+        #usable, the content is kept by the response
+        response.content
+        elapsed = time.perf_counter() - t0
+
+        full_url = get_request_url(method, url, kwargs.get('params'))
+        self.cassette.add(method, full_url, response, elapsed,
+                          kwargs.get('data'))
+        return response
+
+    def save(self):
+        self.cassette.save()
+
+    def close(self):
+        self.save()
+        super(RecordingTransport, self).close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+class ReplayTransport(Transport):
+
+    """
+    Transport that serves responses from a cassette, without making any
+    requests.
+
+    Attributes
+    ----------
+    cassette : Cassette
+    latency_scale : float or None
+        If not None, each response is delayed by its recorded latency times
+        this value.
+    n_replayed : int
+    """
+
+    #Tells the API not to load an access token
+    offline = True
+
+    def __init__(self, cassette, latency_scale=None, **kwargs):
+        """
+        Parameters
+        ----------
+        cassette : str or Cassette
+            File path of a cassette, or a loaded cassette.
+        latency_scale : float (default None)
+            e.g. 1 for the recorded latencies, 0.5 for half of them.
+        kwargs :
+            Passed to mendeley.transport.Transport
+        """
+        super(ReplayTransport, self).__init__(**kwargs)
+        if isinstance(cassette, str):
+            cassette = Cassette.load(cassette)
+        self.cassette = cassette
+        self.latency_scale = latency_scale
+        self.n_replayed = 0
+
+        self._replay_lock = threading.Lock()
+        self._queues = {}
+        self._loose_queues = {}
+        self._used = set()
+        self._last = {}
+        for i, x in enumerate(cassette.interactions):
+            key = (x['method'], x['url'])
+            loose_key = (x['method'], _strip_limit(x['url']))
+            self._queues.setdefault(key, []).append(i)
+            self._loose_queues.setdefault(loose_key, []).append(i)
+
+    def _pop(self, queue):
+        while queue:
+            index = queue.pop(0)
+            if index not in self._used:
+                self._used.add(index)
+                return index
+        return None
+
+    def _next_interaction(self, method, url):
+        key = (method, url)
+        loose_key = (method, _strip_limit(url))
+        with self._replay_lock:
+            index = self._pop(self._queues.get(key))
+            if index is None:
+                index = self._pop(self._loose_queues.get(loose_key))
+            if index is None:
+                #Reuse the last response
+                index = self._last.get(key, self._last.get(loose_key))
+                if index is None:
+                    raise errors.CassetteMissError(
+                        'No recorded response for %s %s' % (method, url))
+            self._last[key] = index
+            self._last[loose_key] = index
+            self.n_replayed += 1
+            return self.cassette.interactions[index]
+
+    def request(self, method, url, **kwargs):
+        full_url = get_request_url(method, url, kwargs.get('params'))
+
+        with self._lock:
+            host = urlsplit(url).netloc
+            self.n_requests += 1
+            self.n_requests_by_host[host] = \
+                self.n_requests_by_host.get(host, 0) + 1
+
+        x = self._next_interaction(method, full_url)
+
+        if self.latency_scale:
+            time.sleep(x['elapsed'] * self.latency_scale)
+
+        response = requests.Response()
+        response.status_code = x['status_code']
+        response.reason = x.get('reason')
+        response.headers = CaseInsensitiveDict(x['headers'])
+        response._content = _decode_body(x['body'], x['body_encoding'])
+        response.encoding = requests.utils.get_encoding_from_headers(
+            response.headers)
+        response.url = full_url
+        response.request = requests.Request(method, full_url).prepare()
+        response.elapsed = timedelta(seconds=x['elapsed'])
+        return response
+
+    def __repr__(self):
+        pv = ['cassette', self.cassette.file_path,
+              'n_interactions', len(self.cassette),
+              'latency_scale', self.latency_scale,
+              'n_replayed', self.n_replayed]
+        return utils.property_values_to_string(pv)
+
+def record(file_path, **kwargs):
+    """
+    Returns a RecordingTransport for API(transport=...)
+    """
+    return RecordingTransport(file_path, **kwargs)
+
+def replay(file_path, latency_scale=None, **kwargs):
+    """
+    Returns a ReplayTransport for API(transport=...)
+    """
+    return ReplayTransport(file_path, latency_scale, **kwargs)
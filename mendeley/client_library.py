@@ -53,12 +53,14 @@ from sqlalchemy import desc
 
 # Local imports
 from .api import API
+from .scheduler import BACKGROUND
 from .db_tables import DB, Document
 
 from . import errors
 from . import models
 from . import utils
 from . import config
+from . import tracing
 from .utils import display_class, quotes
 
 
@@ -178,6 +180,11 @@ class UserLibrary:
         ----------
         verbose : bool (default, inherit from class value, self.verbose)
         
+        The requests are made at background priority. If the API was created
+        with a bounded scheduler (see mendeley.scheduler) interactive 
+        requests made with the same API are served first, otherwise the 
+        priority has no effect.
+        
         TODO:
         ? How do we know if something has been restored from the trash?
         """
@@ -185,7 +192,10 @@ class UserLibrary:
         if verbose is None:
             verbose = self.verbose
 
-        self.sync_result = Sync(self.api, self.db, verbose=verbose)
+        #With a bounded scheduler, interactive requests made with the same 
+        #API (e.g. from a GUI thread) are served first
+        with self.api.priority(BACKGROUND):
+            self.sync_result = Sync(self.api, self.db, verbose=verbose)
 
     # def archive(self):
     #     archivist = archive_library.Archivist(library=self, api=self.api)
@@ -546,69 +556,76 @@ class Sync(object):
         #deleted_since
 
 
-        session = db.get_session()
-
-        #=> I want to get the times
-        #wtf = session.query(db.)
-
-        import pdb
-        pdb.set_trace()
-
-        #----------------------------------------------------------------------
-        #TODO: Does our code support an empty database?
-        last_modified = session.query(db.Document.last_modified).order_by(desc('last_modified')).first()
-        last_modified = last_modified[0]
-
-
-        new_docs = api.documents.get(modified_since=last_modified,limit=100,return_type='json')
-        result = db.add_documents(new_docs,session=session,drop_time=last_modified)
-        if result.n_different > 0:
-            self.verbose_print(result.get_summary_string())
-        else:
-            self.verbose_print("No new documents found in sync")
+        with tracing.span('sync', 'sync'):
+            session = db.get_session()
 
-        count = 0
-        while api.has_next_link:
-            count += 100
-            #TODO: Fix this to occur after we get the new ones
-            print("Requesting more docs starting at {}".format(count))
-            docs_to_add = api.next()
-            r2 = db.add_documents(docs_to_add,session=session,drop_time=last_modified)
-            self.verbose_print(r2.get_summary_string())
-            result.merge(r2)
+            #=> I want to get the times
+            #wtf = session.query(db.)
 
-        self.add_result = result
+            import pdb
+            pdb.set_trace()
 
-        session.commit()
+            with tracing.span('sync.fetch_modified', 'sync') as s:
+                #----------------------------------------------------------------------
+                #TODO: Does our code support an empty database?
+                last_modified = session.query(db.Document.last_modified).order_by(desc('last_modified')).first()
+                last_modified = last_modified[0]
 
 
-        #Deleted docs
-        #----------------------------------------------------------------------
-        deleted_docs = api.documents.get_deleted(return_type='json')
-
-        #Handling updated docs - sync to server
-        #----------------------------------------------------------------------
-        #Note, conflicts have already been handled at this point ...
-        dirty_docs = session.query(db.Document).filter_by(is_dirty=True).all() # type: List[Document]
-        if dirty_docs:
-            self.verbose_print()
-            for doc in dirty_docs:
-                if doc.is_trashed:
-                    pass
-                elif doc.is_deleted:
-                    pass
+                new_docs = api.documents.get(modified_since=last_modified,limit=100,return_type='json')
+                result = db.add_documents(new_docs,session=session,drop_time=last_modified)
+                if result.n_different > 0:
+                    self.verbose_print(result.get_summary_string())
                 else:
-                    #Update
-                    temp = doc.as_dict()
-                    r = api.documents.update(temp['id'], temp)
-                    doc.commit(_is_dirty=False)
+                    self.verbose_print("No new documents found in sync")
+
+                count = 0
+                while api.has_next_link:
+                    count += 100
+                    #TODO: Fix this to occur after we get the new ones
+                    print("Requesting more docs starting at {}".format(count))
+                    docs_to_add = api.next()
+                    r2 = db.add_documents(docs_to_add,session=session,drop_time=last_modified)
+                    self.verbose_print(r2.get_summary_string())
+                    result.merge(r2)
+
+                self.add_result = result
+
+                session.commit()
+                s.set(n_different=result.n_different)
+
+
+            #Deleted docs
+            #----------------------------------------------------------------------
+            with tracing.span('sync.fetch_deleted', 'sync') as s:
+                deleted_docs = api.documents.get_deleted(return_type='json')
+                s.set(n_deleted=len(deleted_docs))
+
+            #Handling updated docs - sync to server
+            #----------------------------------------------------------------------
+            #Note, conflicts have already been handled at this point ...
+            with tracing.span('sync.push_dirty', 'sync') as s:
+                dirty_docs = session.query(db.Document).filter_by(is_dirty=True).all() # type: List[Document]
+                if dirty_docs:
+                    self.verbose_print()
+                    for doc in dirty_docs:
+                        if doc.is_trashed:
+                            pass
+                        elif doc.is_deleted:
+                            pass
+                        else:
+                            #Update
+                            temp = doc.as_dict()
+                            r = api.documents.update(temp['id'], temp)
+                            doc.commit(_is_dirty=False)
+                s.set(n_dirty=len(dirty_docs))
 
 
-        #Look for deleted docs
+            #Look for deleted docs
 
-        #Look for trash
+            #Look for trash
 
-        session.close()
+            session.close()
 
         #     #What if in trash?
         #     #What if deleted????
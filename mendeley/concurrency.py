@@ -0,0 +1,443 @@
+# -*- coding: utf-8 -*-
+"""
+Helpers for making requests from multiple threads.
+
+SingleFlight
+------------
+Used by mendeley.api.API.make_get_request so that identical GET requests
+that are in flight at the same time share a single round-trip.
+
+iter_pages
+----------
+Used when iterating over a DocumentSet or FileSet so that the next page is
+requested while the current one is being processed.
+
+AIMDController
+--------------
+Runs a bulk operation (e.g. catalog lookups, file downloads, document
+updates) with a concurrency limit that adapts to how the server is coping.
+
+    from mendeley import API
+    from mendeley.concurrency import AIMDController
+
+    m = API(thread_safe=True)
+    c = AIMDController()
+    docs = c.map(m.catalog.get,doi_list,return_exceptions=True)
+"""
+
+#Standard Library
+import time
+import queue
+import threading
+import contextvars
+
+#Local Imports
+from . import utils
+from . import errors
+
+
+class _Call(object):
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+
+    """
+    Concurrent calls with the same key share the result of the first call.
+    
+    Only calls that overlap in time are merged, nothing is remembered once
+    the first call finishes.
+    
+    Attributes
+    ----------
+    n_calls : int
+        # of calls that were executed.
+    n_shared : int
+        # of calls that waited on, and used the result of, another call.
+        
+    Examples
+    --------
+    sf = SingleFlight()
+    
+    #From many threads
+    resp = sf.do(url,lambda: requests.get(url))
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.n_calls = 0
+        self.n_shared = 0
+
+    def do(self, key, fcn, timeout=None):
+        """
+        Parameters
+        ----------
+        key : hashable
+        fcn : callable
+            Called with no inputs if no call with the same key is in flight.
+        timeout : float (default None)
+            Maximum time (in seconds) to wait for a call with the same key 
+            that is already in flight, e.g. the time left until the 
+            caller's deadline. None to wait until it finishes.
+            
+        Returns
+        -------
+        The result of fcn(). If fcn() raises an exception, the same exception
+        is raised in every caller that was waiting on it.
+        
+        Raises
+        ------
+        mendeley.errors.DeadlineExceededError
+            If the timeout ran out while waiting.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self.n_calls += 1
+                is_leader = True
+            else:
+                self.n_shared += 1
+                is_leader = False
+
+        if not is_leader:
+            if timeout is not None:
+                if not call.done.wait(max(timeout, 0)):
+                    raise errors.DeadlineExceededError(
+                        'Deadline exceeded while waiting for an identical '
+                        'request that is in flight')
+            else:
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fcn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    @property
+    def n_in_flight(self):
+        return len(self._calls)
+
+    def __repr__(self):
+        pv = ['n_in_flight', self.n_in_flight,
+              'n_calls', self.n_calls,
+              'n_shared', self.n_shared]
+        return utils.property_values_to_string(pv)
+
+
+#Returned by the prefetch thread once there are no more pages
+_END = object()
+
+#Set in the thread that requests pages ahead, see iter_pages()
+_prefetching = contextvars.ContextVar('mendeley_prefetching', default=False)
+
+def is_prefetching():
+    """
+    Returns True when called from a page request made ahead of time by 
+    iter_pages(). Such requests don't change the API's last_context.
+    """
+    return _prefetching.get()
+
+def iter_pages(first_page, depth=1):
+    """
+    Yields first_page followed by the pages obtained by repeatedly calling
+    next_page(), until next_page() returns None.
+    
+    Parameters
+    ----------
+    first_page : object with a next_page() method
+        e.g. mendeley.models.DocumentSet
+    depth : int (default 1)
+        Maximum # of pages that are requested ahead of the page that is 
+        currently being processed. If 0, each page is only requested once 
+        the previous one has been processed.
+    """
+
+    if depth < 1:
+        yield first_page
+        page = first_page.next_page()
+        while page:
+            yield page
+            page = page.next_page()
+        return
+
+    pages = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def put(value):
+        #Periodically check if the consumer has gone away
+        while not stop.is_set():
+            try:
+                pages.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def fetch():
+        page = first_page
+        try:
+            while True:
+                page = page.next_page()
+                if not page:
+                    put(_END)
+                    return
+                if not put(page):
+                    return
+        except BaseException as e:
+            put(e)
+
+    def run():
+        _prefetching.set(True)
+        fetch()
+
+    #Runs in a copy of the context so that an API.deadline() applies
+    thread = threading.Thread(target=contextvars.copy_context().run,
+                              args=(run,), name='mendeley-prefetch',
+                              daemon=True)
+    thread.start()
+
+    try:
+        yield first_page
+        while True:
+            value = pages.get()
+            if value is _END:
+                return
+            elif isinstance(value, BaseException):
+                raise value
+            yield value
+    finally:
+        stop.set()
+
+
+#Set while running a call from AIMDController.map(), see API._send
+_controller = contextvars.ContextVar('mendeley_controller', default=None)
+
+def get_current_controller():
+    """
+    Returns the AIMDController of the bulk operation that the current code
+    is running in, or None.
+    """
+    return _controller.get()
+
+class AIMDController(object):
+
+    """
+    Adaptive concurrency limit for bulk operations (additive increase,
+    multiplicative decrease).
+
+    The window (# of calls allowed in flight) grows by about 'increase' for
+    each window's worth of healthy responses. It is multiplied by
+    'decrease' when a response is throttled (429), a server error (5xx),
+    a connection failure, or much slower than the typical latency. Only one
+    decrease is applied per 'cooldown' so that a burst of failures from
+    requests that were already in flight counts once.
+
+    Responses are reported by mendeley.api.API for every attempt (including
+    ones that are retried) while running under map().
+
+    The window can only be reached if the API's scheduler allows as many 
+    requests in flight, which the default (no limit) does. See 
+    mendeley.scheduler
+
+    Attributes
+    ----------
+    window : float
+        Current concurrency limit, int(window) calls may be in flight.
+    min_window : int
+    max_window : int
+    baseline_latency : float or None
+        Moving average of healthy response latencies, in seconds.
+    n_increases : int
+    n_decreases : int
+
+    Examples
+    --------
+    from mendeley import API
+    from mendeley.concurrency import AIMDController
+
+    m = API(thread_safe=True)
+    c = AIMDController(initial_window=4,max_window=32)
+    docs = c.map(m.catalog.get,doi_list)
+
+    #Monitor from another thread
+    print(c.window)
+    """
+
+    def __init__(self,
+                 initial_window=4,
+                 min_window=1,
+                 max_window=32,
+                 increase=1,
+                 decrease=0.5,
+                 latency_factor=4,
+                 cooldown=1.0,
+                 throttle_statuses=(429, 500, 502, 503, 504)):
+        """
+        Parameters
+        ----------
+        initial_window : int (default 4)
+        min_window : int (default 1)
+        max_window : int (default 32)
+        increase : float (default 1)
+            Increase of the window per window of healthy responses.
+        decrease : float (default 0.5)
+            Factor applied to the window on congestion.
+        latency_factor : float (default 4)
+            A response taking longer than latency_factor times the baseline
+            latency counts as congestion.
+        cooldown : float (default 1.0)
+            Minimum time in seconds between decreases.
+        throttle_statuses : tuple
+        """
+        self.window = float(initial_window)
+        self.min_window = min_window
+        self.max_window = max_window
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.throttle_statuses = frozenset(throttle_statuses)
+
+        self.baseline_latency = None
+        self.n_increases = 0
+        self.n_decreases = 0
+        self._last_decrease = None
+
+        self._cond = threading.Condition()
+        self.n_active = 0
+
+    @property
+    def limit(self):
+        return max(int(self.window), self.min_window)
+
+    def record_response(self, status_code, latency):
+        """
+        Parameters
+        ----------
+        status_code : int or None
+            None if the request failed to connect or timed out
+        latency : float
+            Seconds
+        """
+        with self._cond:
+            congested = status_code is None or \
+                status_code in self.throttle_statuses
+            if not congested and self.baseline_latency is not None:
+                congested = latency > self.latency_factor * self.baseline_latency
+
+            if congested:
+                now = time.monotonic()
+                if self._last_decrease is None or \
+                        now - self._last_decrease >= self.cooldown:
+                    self._last_decrease = now
+                    self.window = max(self.window * self.decrease,
+                                      self.min_window)
+                    self.n_decreases += 1
+            else:
+                if self.baseline_latency is None:
+                    self.baseline_latency = latency
+                else:
+                    self.baseline_latency = 0.9 * self.baseline_latency + \
+                        0.1 * latency
+                if self.window < self.max_window:
+                    self.window = min(self.window + self.increase / self.window,
+                                      self.max_window)
+                    self.n_increases += 1
+                    self._cond.notify_all()
+
+    def acquire(self):
+        with self._cond:
+            while self.n_active >= self.limit:
+                self._cond.wait()
+            self.n_active += 1
+
+    def release(self):
+        with self._cond:
+            self.n_active -= 1
+            self._cond.notify_all()
+
+    def _run_one(self, fcn, item):
+        self.acquire()
+        try:
+            token = _controller.set(self)
+            try:
+                return fcn(item)
+            finally:
+                _controller.reset(token)
+        finally:
+            self.release()
+
+    def map(self, fcn, items, return_exceptions=False):
+        """
+        Calls fcn(item) for each item, with the # of concurrent calls
+        limited by the window.
+
+        Parameters
+        ----------
+        fcn : callable
+            Should make its requests using an API instance (created with
+            thread_safe=True if last_* values are used).
+        items : iterable
+        return_exceptions : bool (default False)
+            If true, exceptions are returned in place of results, otherwise
+            the first exception (in item order) is raised once all calls
+            have finished.
+
+        Returns
+        -------
+        list
+            Results in the order of items.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        n_workers = min(self.max_window, len(items))
+        with ThreadPoolExecutor(max_workers=n_workers,
+                                thread_name_prefix='mendeley-bulk') as ex:
+            #Each call gets a copy of this thread's context, e.g. so that
+            #API.deadline() and API.priority() apply
+            futures = [ex.submit(contextvars.copy_context().run,
+                                 self._run_one, fcn, x) for x in items]
+
+        results = []
+        for future in futures:
+            error = future.exception()
+            if error is None:
+                results.append(future.result())
+            elif return_exceptions:
+                results.append(error)
+            else:
+                raise error
+        return results
+
+    def __repr__(self):
+        pv = ['window', utils.float_or_none_to_string(self.window),
+              'limit', self.limit,
+              'min_window', self.min_window,
+              'max_window', self.max_window,
+              'n_active', self.n_active,
+              'baseline_latency',
+              utils.float_or_none_to_string(self.baseline_latency),
+              'n_increases', self.n_increases,
+              'n_decreases', self.n_decreases]
+        return utils.property_values_to_string(pv)
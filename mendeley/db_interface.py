@@ -22,7 +22,7 @@ from sqlalchemy.types import Integer, Text, String, DateTime
 
 # Local imports
 from . import utils
-from .optional import MissingModule
+from .optional import db
 
 #Optional Imports
 #------------------------------------
@@ -39,7 +39,12 @@ from . import errors
 
 #Public Interface
 #------------------------------------------------
-db_available = type(db) is not MissingModule
+def __getattr__(name):
+    #db_available is computed on access so that importing this module 
+    #doesn't import the library database code
+    if name == 'db_available':
+        return db.is_available
+    raise AttributeError("module '%s' has no attribute '%s'" % (__name__, name))
 
 class DBSessionInterface(object):
 
@@ -60,7 +65,7 @@ class DBSessionInterface(object):
 
 
                 
-        if db_available:
+        if db.is_available:
             self.s = db.DB_Session(user_name, root_path)
         else:
             raise Exception('Library database code is not available')
@@ -73,7 +78,7 @@ class DBSessionInterface(object):
 
     def load_db_session(user_name):
         #1 Determine save path ...
-        if db_available:
+        if db.is_available:
             #TODO: Implement this ...
             return None
         else:
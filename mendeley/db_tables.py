@@ -50,6 +50,7 @@ from sqlalchemy.orm.relationships import RelationshipProperty
 #-------------------
 from . import config
 from . import utils
+from . import tracing
 from .utils import get_truncated_display_string as td
 from .utils import get_list_class_display as cld
 from .utils import display_class
@@ -129,6 +130,16 @@ class DB():
 
     def add_documents(self,data,session=None,on_conflict='error',drop_time=None)->AddDocsSummary:
         """
+        See _add_documents, this wraps the call in a tracing span.
+        """
+        n_docs = len(data) if data else 0
+        with tracing.span('db.add_documents', 'db', n_docs=n_docs) as s:
+            r = self._add_documents(data, session, on_conflict, drop_time)
+            s.set(n_new=len(r.new), n_modified=len(r.modified))
+            return r
+
+    def _add_documents(self,data,session=None,on_conflict='error',drop_time=None)->AddDocsSummary:
+        """
 
         Parameters
         ----------
@@ -21,6 +21,30 @@ class UnsupportedEntryTypeError(Exception):
 
 #------------------- API -------------------------------
 class CallFailedException(Exception):
+    """
+    Raised when the server returns an error status. Throttling and transient
+    server errors are only raised after the API has run out of retries.
+    
+    Attributes
+    ----------
+    status_code : int or None
+    """
+    def __init__(self, *args, status_code=None):
+        super(CallFailedException, self).__init__(*args)
+        self.status_code = status_code
+
+class DeadlineExceededError(TimeoutError):
+    """
+    Raised when a request can't be completed before the deadline set using
+    API.deadline()
+    """
+    pass
+
+class CassetteMissError(KeyError):
+    """
+    Raised when replaying (see mendeley.cassette) and a request was not 
+    recorded.
+    """
     pass
 
 # ----------------- User Library Errors ----------------
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+On-disk cache for GET responses that rarely change (catalog lookups,
+metadata lookups, profiles and the definitions).
+
+The cache is opt-in:
+
+    from mendeley import API
+    m = API(cache=True)
+
+    #or with custom settings
+    from mendeley.http_cache import ResponseCache
+    m = API(cache=ResponseCache(ttl=7*24*3600,max_size=500*1024*1024))
+
+Entries are stored under:
+    config.get_save_root(['http_cache'])
+
+Each entry is keyed by the user, url, query parameters and 'Accept' header.
+Fresh entries (younger than the ttl) are returned without contacting the
+server. Stale entries are revalidated using 'If-None-Match' and/or
+'If-Modified-Since' when the server provided an 'ETag' or 'Last-Modified'
+header. A 304 response renews the entry without transferring the body.
+
+Once the cache grows beyond max_size (or max_entries) the least recently
+used entries are deleted.
+"""
+
+#Standard Library
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+
+#Third party
+import requests
+from requests.structures import CaseInsensitiveDict
+
+#Local Imports
+from . import config
+from . import utils
+
+#These don't apply to the stored body, which has already been decoded
+_DROPPED_HEADERS = ('content-encoding', 'transfer-encoding', 'content-length')
+
+class CacheEntry(object):
+
+    """
+    Attributes
+    ----------
+    key : str
+    url : str
+    status_code : int
+    headers : dict
+    stored_at : float
+        Time (from time.time()) at which the entry was stored or last
+        revalidated.
+    body : bytes
+    """
+
+    def __init__(self, key, url, status_code, headers, stored_at, body):
+        self.key = key
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.stored_at = stored_at
+        self.body = body
+
+    @property
+    def age(self):
+        return time.time() - self.stored_at
+
+    @property
+    def etag(self):
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self):
+        return self.headers.get('Last-Modified')
+
+    @property
+    def can_revalidate(self):
+        return self.etag is not None or self.last_modified is not None
+
+    def get_validation_headers(self):
+        """
+        Returns the conditional headers to send when revalidating.
+        """
+        headers = {}
+        if self.etag is not None:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified is not None:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def to_response(self):
+        """
+        Returns a requests.Response built from the entry.
+        """
+        r = requests.Response()
+        r.status_code = self.status_code
+        r.headers = CaseInsensitiveDict(self.headers)
+        r._content = self.body
+        r.url = self.url
+        r.encoding = requests.utils.get_encoding_from_headers(r.headers)
+        r.reason = 'OK'
+        return r
+
+    def __repr__(self):
+        pv = ['key', self.key,
+              'url', self.url,
+              'status_code', self.status_code,
+              'age', utils.float_or_none_to_string(self.age),
+              'etag', self.etag,
+              'last_modified', self.last_modified,
+              'body', '<%d bytes>' % len(self.body)]
+        return utils.property_values_to_string(pv)
+
+class ResponseCache(object):
+
+    """
+    Attributes
+    ----------
+    root_path : str
+    ttl : float
+        Time in seconds for which an entry is used without revalidation.
+    max_size : int
+        Size in bytes of the stored bodies above which entries are evicted.
+    max_entries : int or None
+    n_hits : int
+        # of requests answered from a fresh entry.
+    n_revalidated : int
+        # of stale entries renewed by a 304 response.
+    n_misses : int
+        # of requests that needed the full response from the server.
+    """
+
+    def __init__(self,
+                 root_path=None,
+                 ttl=24*3600,
+                 max_size=200*1024*1024,
+                 max_entries=None):
+        """
+        Parameters
+        ----------
+        root_path : str (default None)
+            Defaults to config.get_save_root(['http_cache'])
+        ttl : float (default 1 day)
+        max_size : int (default 200 MB)
+        max_entries : int (default None)
+        """
+
+        if root_path is None:
+            root_path = config.get_save_root(['http_cache'], True)
+        elif not os.path.exists(root_path):
+            os.makedirs(root_path)
+
+        self.root_path = root_path
+        self.ttl = ttl
+        self.max_size = max_size
+        self.max_entries = max_entries
+
+        self.n_hits = 0
+        self.n_revalidated = 0
+        self.n_misses = 0
+
+        self._lock = threading.Lock()
+        self._sizes = self._scan_sizes()
+
+    @staticmethod
+    def get_key(url, params=None, headers=None, user_name=None):
+        """
+        Parameters
+        ----------
+        url : str
+        params : str or dict
+            Query string or the dictionary of query parameters
+        headers : dict
+        user_name : str
+            Responses of user specific endpoints (e.g. /profiles/v2/me)
+            differ between users.
+        """
+        if isinstance(params, dict):
+            params = sorted(params.items())
+
+        accept = None
+        if headers is not None:
+            accept = CaseInsensitiveDict(headers).get('Accept')
+
+        key_source = '%s|%s|%s|%s' % (user_name, url, params, accept)
+        return hashlib.sha1(key_source.encode('utf-8')).hexdigest()
+
+    def _get_paths(self, key):
+        meta_path = os.path.join(self.root_path, key + '.json')
+        body_path = os.path.join(self.root_path, key + '.body')
+        return meta_path, body_path
+
+    def _scan_sizes(self):
+        sizes = {}
+        for name in os.listdir(self.root_path):
+            if name.endswith('.body'):
+                path = os.path.join(self.root_path, name)
+                try:
+                    sizes[name[:-5]] = os.path.getsize(path)
+                except OSError:
+                    pass
+        return sizes
+
+    @property
+    def size(self):
+        """
+        Total size in bytes of the stored bodies.
+        """
+        return sum(self._sizes.values())
+
+    @property
+    def n_entries(self):
+        return len(self._sizes)
+
+    def get(self, key):
+        """
+        Returns
+        -------
+        CacheEntry or None
+        """
+        meta_path, body_path = self._get_paths(key)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        #The body modification time is used for LRU eviction
+        try:
+            os.utime(body_path, None)
+        except OSError:
+            pass
+
+        return CacheEntry(key, meta['url'], meta['status_code'],
+                          meta['headers'], meta['stored_at'], body)
+
+    #The cache is shared by the threads of an API (prefetching, hedging,
+    #AsyncAPI), so the counters are updated while holding the lock
+    def record_hit(self):
+        with self._lock:
+            self.n_hits += 1
+
+    def record_revalidated(self):
+        with self._lock:
+            self.n_revalidated += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.n_misses += 1
+
+    def is_fresh(self, entry, ttl=None):
+        if ttl is None:
+            ttl = self.ttl
+        return entry.age < ttl
+
+    def store(self, key, response):
+        """
+        Stores a successful response.
+
+        Parameters
+        ----------
+        key : str
+        response : requests.Response
+        """
+        headers = {k: v for k, v in response.headers.items()
+                   if k.lower() not in _DROPPED_HEADERS}
+        meta = {'url': response.url,
+                'status_code': response.status_code,
+                'headers': headers,
+                'stored_at': time.time()}
+        body = response.content
+
+        meta_path, body_path = self._get_paths(key)
+        _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+        with self._lock:
+            self._sizes[key] = len(body)
+
+        self._evict_if_necessary()
+
+    def renew(self, entry, response):
+        """
+        Marks an entry as fresh following a 304 response. Updated
+        validators in the 304 response replace the stored ones.
+        """
+        for name in ('ETag', 'Last-Modified', 'Cache-Control', 'Expires'):
+            if name in response.headers:
+                entry.headers[name] = response.headers[name]
+        entry.stored_at = time.time()
+
+        meta = {'url': entry.url,
+                'status_code': entry.status_code,
+                'headers': entry.headers,
+                'stored_at': entry.stored_at}
+        meta_path, _ = self._get_paths(entry.key)
+        _atomic_write(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def delete(self, key):
+        for path in self._get_paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        with self._lock:
+            self._sizes.pop(key, None)
+
+    def clear(self):
+        for key in list(self._sizes.keys()):
+            self.delete(key)
+
+    def _evict_if_necessary(self):
+
+        too_many = self.max_entries is not None and self.n_entries > self.max_entries
+        if self.size <= self.max_size and not too_many:
+            return
+
+        with self._lock:
+            keys = list(self._sizes.keys())
+
+        def get_last_used(key):
+            try:
+                return os.path.getmtime(self._get_paths(key)[1])
+            except OSError:
+                return 0
+
+        #Evict to below 90% so that we don't evict on every store
+        target_size = 0.9 * self.max_size
+        if self.max_entries is None:
+            target_entries = None
+        else:
+            target_entries = max(int(0.9 * self.max_entries), 1)
+
+        for key in sorted(keys, key=get_last_used):
+            size_ok = self.size <= target_size
+            entries_ok = target_entries is None or self.n_entries <= target_entries
+            if size_ok and entries_ok:
+                break
+            self.delete(key)
+
+    def __repr__(self):
+        pv = ['root_path', self.root_path,
+              'ttl', self.ttl,
+              'max_size', self.max_size,
+              'max_entries', self.max_entries,
+              'size', self.size,
+              'n_entries', self.n_entries,
+              '---', '--- counters ---',
+              'n_hits', self.n_hits,
+              'n_revalidated', self.n_revalidated,
+              'n_misses', self.n_misses]
+        return utils.property_values_to_string(pv)
+
+def _atomic_write(path, data):
+    """
+    Writes to a temporary file and then replaces the target so that readers
+    never see a partially written file.
+    """
+    folder = os.path.dirname(path)
+    fd, temp_path = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
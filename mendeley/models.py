@@ -16,6 +16,8 @@ mendeley.api => contains the code that makes requests for these models
 """
 
 #Standard Imports
+import threading
+from collections.abc import Sequence
 from typing import Optional, Union, TypeVar, List
 from typing import TYPE_CHECKING
 
@@ -29,6 +31,8 @@ if TYPE_CHECKING:
 from .utils import get_truncated_display_string as td
 from .utils import get_list_class_display as cld
 from .optional import rr, pub_objects
+from .concurrency import iter_pages
+from .streaming import iter_json_array, CHUNK_SIZE
 from . import utils
 
 """
@@ -65,17 +69,81 @@ class WTF2(object):
 def json_only(json,m,response_params):
     return json
 
-class ResponseObject(object):
+class _JsonField(object):
+    """
+    Descriptor that reads a field from the JSON of a ResponseObject. These
+    are added to each class by _compile_fields().
+    """
+
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, obj, cls=None):
+        if obj is None:
+            return self
+        name = self.name
+        value = obj._json.get(name)
+        #We don't call object construction methods on None values
+        if value is None:
+            return None
+        method_fh = obj.object_fields.get(name)
+        if method_fh is None:
+            return value
+        
+        #Converted values are kept until the json is replaced
+        converted = obj._converted
+        if converted is None:
+            converted = obj._converted = {}
+        elif name in converted:
+            return converted[name]
+        value = converted[name] = method_fh(value)
+        return value
+
+def _compile_fields(cls):
+    """
+    Adds a _JsonField for each field of the class (unless a method or 
+    other attribute has the same name) and stores the field names as a 
+    frozenset in cls._field_set.
+    
+    This is done on the first attribute lookup that fails, as fields() 
+    can't be called while the class is being created (it calls super() 
+    with the class name).
+    """
+    field_set = frozenset(cls.fields())
+    for name in field_set:
+        if not any(name in x.__dict__ for x in cls.__mro__):
+            setattr(cls, name, _JsonField(name))
+    cls._field_set = field_set
+    return field_set
+
+class _ResponseObjectType(type):
+    """
+    Gives each ResponseObject class __slots__ (empty unless the class 
+    defines them) so that instances don't have a __dict__.
+    """
+    def __new__(mcs, name, bases, namespace):
+        namespace.setdefault('__slots__', ())
+        return super(_ResponseObjectType, mcs).__new__(mcs, name, bases,
+                                                       namespace)
+
+class ResponseObject(object, metaclass=_ResponseObjectType):
     # I made this a property so that the user could change this processing
     # if they wanted. For example, this would allow the user to return authors
     # as just the raw json (from a document) rather than creating a list of
     # Persons
     object_fields = {}
 
+    #Instance attributes need to be listed in __slots__ by each class
+    #_converted : dict or None, values of object_fields, see json
+    __slots__ = ('_json', '_converted')
+
     def __init__(self, json):
         """
         This class stores the raw JSON in case an attribute from this instance
-        is requested. The attribute is accessed via the __getattr__ method.
+        is requested. The attribute is read by a _JsonField descriptor that
+        is added to the class for each name in fields().
 
         This design was chosen instead of one which tranfers each JSON object
         key into an attribute. This design decision means that we don't spend
@@ -83,8 +151,24 @@ class ResponseObject(object):
         
         Note that the request methods should also support returning the raw JSON.
         """
+        if isinstance(json, list):
+            json = json[0] if len(json) > 0 else {}
         self.json = json
 
+    @property
+    def json(self):
+        """
+        Values of object_fields (e.g. Document.authors) are converted on 
+        first access and then reused. Replacing the json clears them. Note 
+        that changing the json in place doesn't.
+        """
+        return self._json
+
+    @json.setter
+    def json(self, value):
+        self._json = value
+        self._converted = None
+
     def __getattr__(self, name):
 
         """
@@ -93,29 +177,16 @@ class ResponseObject(object):
         forcing each class to define the fields that are valid we ensure that
         spelling errors don't return none:
         e.g. document.yeear <= instead of document.year
+        
+        Once the fields of the class have been compiled this is only called
+        for names that aren't fields.
         """
-        if name in self.fields():
-            if isinstance(self.json, list):
-                if len(self.json) > 0:
-                    self.json = self.json[0]
-                else:
-                    self.json = {}
-            value = self.json.get(name)
-            
-            #We don't call object construction methods on None values
-            if value is None:
-                return None
-            elif name in self.object_fields:
-                #Here we return the value after passing it to a method
-                #fh => function handle
-                #
-                #Only the value is explicitly passed in
-                #Any other information needs to be explicitly bound
-                #to the method
-                method_fh = self.object_fields[name]
-                return method_fh(value)
-            else:
-                return value
+        cls = type(self)
+        field_set = cls.__dict__.get('_field_set')
+        if field_set is None:
+            field_set = _compile_fields(cls)
+        if name in field_set:
+            return _JsonField(name).__get__(self, cls)
         else:
             raise AttributeError("'%s' object has no attribute '%s'" % (self.__class__.__name__, name))
 
@@ -141,13 +212,6 @@ class DocumentIdentifiers(ResponseObject):
     def fields(cls):
         return ['pmid', 'issn', 'doi', 'isbn', 'arxiv']
 
-    def _null(self):
-        self.pmid = None
-        self.issn = None
-        self.doi = None
-        self.isbn = None
-        self.arxiv = None
-
     def __repr__(self):
         pv = ['pmid', self.pmid, 'doi', self.doi, 'issn', self.issn,
               'isbn', self.isbn, 'arxiv', self.arxiv]
@@ -162,10 +226,6 @@ class Person(ResponseObject):
     def fields(cls):
         return ['first_name', 'last_name']
 
-    def _null(self):
-        self.first_name = None
-        self.last_name = None
-
     def initialize_array(json):
         return [Person(x) for x in json]
 
@@ -225,6 +285,10 @@ class Annotation(ResponseObject):
 
     object_fields = {}
 
+    __slots__ = ('api',)
+
+    default_return_type = 'object'
+
     def __init__(self, json, m):
         """
         Parameters
@@ -234,20 +298,7 @@ class Annotation(ResponseObject):
 
         """
         super(Annotation, self).__init__(json)
-        self.document_id = self.__getattr__('document_id')
         self.api = m
-        self.default_return_type = 'object'
-
-    def _null(self):
-        """
-        TODO: Ask on SO about this, is there an alternative approach?
-        It does expose tab completion in Spyder ...
-        """
-        self.id = None  #
-        self.type = None  #
-        self.created = None  #
-        self.profile_id = None  #
-        self.last_modified = None  #
 
     @classmethod
     def fields(cls):
@@ -433,10 +484,12 @@ class Profile(ResponseObject):
     
 
     
+    __slots__ = ('api',)
+
     def __init__(self,json,m:'API'):
         
+        super(Profile, self).__init__(json)
         self.api = m
-        self.json = json
         
     @classmethod
     def fields(cls):
@@ -585,9 +638,157 @@ class AnnotationSet(object):
     
     #TODO: Initialize next set
 
+class LazySequence(Sequence):
+    """
+    The objects of a page (e.g. DocumentSet.docs). Each object is built 
+    from its JSON (using fcn) the first time it is accessed, by index, 
+    slice or iteration, and is then kept in place of the JSON.
+    
+    Attributes
+    ----------
+    fcn : 
+        Function handle that builds an object, called as fcn(json,m)
+    api : mendeley.api.API
+    n_built : int
+        # of objects that have been built.
+    """
+
+    def __init__(self, json, fcn, m):
+        """
+        Parameters
+        ----------
+        json : list
+        fcn :
+        m : mendeley.api.API
+        """
+        self._items = list(json)
+        self._built = bytearray(len(self._items))
+        self._lock = threading.Lock()
+        self.fcn = fcn
+        self.api = m
+
+    def _build(self, index):
+        if not self._built[index]:
+            with self._lock:
+                if not self._built[index]:
+                    self._items[index] = self.fcn(self._items[index], self.api)
+                    self._built[index] = 1
+        return self._items[index]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._build(i) for i in 
+                    range(*index.indices(len(self._items)))]
+        n = len(self._items)
+        if index < 0:
+            index += n
+        if index < 0 or index >= n:
+            raise IndexError('LazySequence index out of range')
+        return self._build(index)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        for i in range(len(self._items)):
+            yield self._build(i)
+
+    #Concatenation gives a list, as docs used to be a list
+    def __add__(self, other):
+        if isinstance(other, (list, LazySequence)):
+            return list(self) + list(other)
+        return NotImplemented
+
+    def __radd__(self, other):
+        if isinstance(other, list):
+            return other + list(self)
+        return NotImplemented
+
+    def extend(self, other):
+        """
+        Appends the items of another LazySequence (built or not) or a list
+        of built objects.
+        """
+        if isinstance(other, LazySequence):
+            with other._lock:
+                items = list(other._items)
+                built = bytes(other._built)
+        else:
+            items = list(other)
+            built = b'\x01' * len(items)
+        with self._lock:
+            self._items.extend(items)
+            self._built.extend(built)
+
+    def iter_json(self):
+        """
+        Yields the json of each item without building the objects. Built 
+        items are expected to have a json attribute (e.g. Document) or to 
+        be the json itself.
+        """
+        for i in range(len(self._items)):
+            item = self._items[i]
+            if self._built[i]:
+                item = getattr(item, 'json', item)
+            yield item
+
+    @property
+    def n_built(self):
+        return self._built.count(1)
+
+    def __repr__(self):
+        return u'<LazySequence> len(%d), %d built' % (len(self._items), 
+                                                      self.n_built)
+
+#Flattened from 'identifiers' by DocumentSet.to_columns()
+IDENTIFIER_COLUMNS = ('doi', 'pmid', 'arxiv', 'issn', 'isbn')
+
+#Converted to datetime64 by DocumentSet.to_columns()
+TIME_COLUMNS = ('created', 'last_modified')
+
+def _to_datetime64(values):
+    """
+    e.g. ['2015-02-12T11:28:03.000Z', None] => datetime64[ms] array with NaT
+    """
+    import numpy as np
+    #numpy doesn't accept the time zone, times are UTC
+    values = ['NaT' if x is None else x.rstrip('Z') for x in values]
+    return np.array(values, dtype='datetime64[ms]')
+
+def _to_array(values):
+    """
+    Integers, floats and booleans give numeric arrays (float with NaN 
+    if values are missing), anything else an object array.
+    """
+    import numpy as np
+    types = set(type(x) for x in values)
+    has_none = type(None) in types
+    types.discard(type(None))
+    if types and types <= {int, float}:
+        if has_none or float in types:
+            return np.array([np.nan if x is None else x for x in values], 
+                            dtype=float)
+        return np.array(values, dtype=np.int64)
+    elif types == {bool} and not has_none:
+        return np.array(values, dtype=bool)
+    
+    #Assigning one at a time as lists (e.g. authors) would otherwise be 
+    #made into extra dimensions
+    array = np.empty(len(values), dtype=object)
+    for i, x in enumerate(values):
+        array[i] = x
+    return array
+
 class DocumentSet(object):
     """
     Responsible for managing a set of documents.
+    
+    Attributes
+    ----------
+    docs : LazySequence
+        The documents are built from json when they are first accessed.
+    json : list or None
+        None after drop_json()
     """
 
     view : Optional[str]
@@ -602,12 +803,14 @@ class DocumentSet(object):
             'fcn' - function handle to the type of document to create
             'view' - type of document info to return
             'limit' - maximum # of documents to expect
+            'context' - mendeley.api.RequestContext of the request that
+                        returned this page
         
         """
-        self.links = m.last_response.links
-        try:
-            self.total_count = m.last_response.headers['Mendeley-Count']
-        except:
+        self.context = params.pop('context')
+        self.links = self.context.links
+        self.total_count = self.context.total_count
+        if self.total_count is None:
            self.total_count = len(json) 
         self.api = m
         self.response_params = params
@@ -617,10 +820,7 @@ class DocumentSet(object):
             
         self.json = json
 
-        fcn = params['fcn']
-
-        # TODO: Figure out how to support lazy loading
-        self.docs = [fcn(x, m) for x in json]
+        self.docs = LazySequence(json, params['fcn'], m)
         self.view = params['view']
 
     # TODO: These will need to call some common function
@@ -629,15 +829,14 @@ class DocumentSet(object):
 
     def __iter__(self):
         """
-        
+        Iterates over the documents of this and all following pages. The 
+        following pages are requested in the background, see 
+        mendeley.api.API.prefetch_depth
         """
-        page = self
-        while page:
+        for page in iter_pages(self, self.api.prefetch_depth):
             for single_doc in page.docs:
                 yield single_doc
 
-            page = page.next_page()
-
     @classmethod
     def create(cls, json, m, params):
         """
@@ -666,10 +865,147 @@ class DocumentSet(object):
     # to Page in mendeley.pagination
 
     def get_all_docs(self):
+        """
+        Requests the remaining pages and places all documents in docs. The
+        documents are only built when accessed.
+        """
         #TODO: Make sure we are on first page, if not go there
-        docs = [x for x in self]
+        docs = LazySequence([], self.docs.fcn, self.api)
+        for page in iter_pages(self, self.api.prefetch_depth):
+            docs.extend(page.docs)
         self.docs = docs
 
+    def drop_json(self):
+        """
+        Releases the json of this page. Documents that have not been built
+        yet keep their json (in docs) so they can still be accessed. This 
+        mostly saves memory for views where the object doesn't hold onto 
+        the json, e.g. view='ids'.
+        """
+        self.json = None
+
+    def to_columns(self, fields, all_pages=False):
+        """
+        Returns one numpy array per field, built from the json of the 
+        documents without creating Document objects.
+        
+        Parameters
+        ----------
+        fields : str or list of str
+            Fields of the documents and/or identifiers (see 
+            IDENTIFIER_COLUMNS), which are read from 'identifiers'. 
+        all_pages : bool (default False)
+            If True, the following pages are requested (as when iterating)
+            and are discarded once read. By default only the documents held
+            by this set are used, which is all of them after get_all_docs() 
+            (e.g. limit=0).
+        
+        Returns
+        -------
+        dict
+            field => array. 'created' and 'last_modified' are datetime64 
+            (UTC, NaT if missing). Other fields are numeric if all values 
+            are numbers, otherwise object arrays with None if missing.
+        
+        Example
+        -------
+        docs = m.documents.get(limit=0)
+        columns = docs.to_columns(['id','year','doi','created'])
+        """
+        if isinstance(fields, str):
+            fields = [fields]
+        fields = list(dict.fromkeys(fields))
+        
+        fcn = self.docs.fcn
+        if isinstance(fcn, type) and issubclass(fcn, ResponseObject):
+            valid = set(fcn.fields()) | set(IDENTIFIER_COLUMNS)
+            bad_fields = [x for x in fields if x not in valid]
+            if bad_fields:
+                raise ValueError('Unrecognized field(s): %s' 
+                                 % ', '.join(bad_fields))
+        
+        id_fields = [x for x in fields if x in IDENTIFIER_COLUMNS]
+        other_fields = [x for x in fields if x not in IDENTIFIER_COLUMNS]
+        columns = {x: [] for x in fields}
+        
+        if all_pages:
+            pages = iter_pages(self, self.api.prefetch_depth)
+        else:
+            pages = [self]
+        
+        for page in pages:
+            for json in page.docs.iter_json():
+                if not isinstance(json, dict):
+                    raise TypeError('Columns require the json of the documents,'
+                                    ' not %s' % json.__class__.__name__)
+                for name in other_fields:
+                    columns[name].append(json.get(name))
+                if id_fields:
+                    identifiers = json.get('identifiers') or {}
+                    for name in id_fields:
+                        value = identifiers.get(name)
+                        if value is None:
+                            value = json.get(name)
+                        columns[name].append(value)
+        
+        for name in fields:
+            if name in TIME_COLUMNS:
+                columns[name] = _to_datetime64(columns[name])
+            else:
+                columns[name] = _to_array(columns[name])
+        return columns
+
+    def to_dataframe(self, fields, all_pages=False):
+        """
+        Returns a pandas DataFrame with one column per field.
+        
+        See Also
+        --------
+        to_columns
+        """
+        import pandas as pd
+        if isinstance(fields, str):
+            fields = [fields]
+        return pd.DataFrame(self.to_columns(fields, all_pages), 
+                            columns=list(fields))
+
+    def materialize(self, fields):
+        """
+        Reads the fields of all documents held by this set (only this page
+        unless get_all_docs() has been called). Fields with object values 
+        (authors, identifiers) are converted and kept by each document so 
+        that later reads don't convert them again.
+        
+        Parameters
+        ----------
+        fields : str or list of str
+        
+        Returns
+        -------
+        DocumentSet (self)
+        
+        Example
+        -------
+        docs = m.documents.get(limit=0)
+        docs.get_all_docs()
+        docs.materialize(['authors','identifiers'])
+        """
+        if isinstance(fields, str):
+            fields = [fields]
+        docs = [x for x in self.docs if isinstance(x, ResponseObject)]
+        if len(docs) == 0:
+            return self
+        
+        valid = set(type(docs[0]).fields())
+        bad_fields = [x for x in fields if x not in valid]
+        if bad_fields:
+            raise ValueError('Unrecognized field(s): %s' % ', '.join(bad_fields))
+        
+        for doc in docs:
+            for name in fields:
+                getattr(doc, name)
+        return self
+
     def first_page(self):
         #TODO: Implement this function
         pass
@@ -685,11 +1021,14 @@ class DocumentSet(object):
         else:
             page_id = self.page_id + 1
             if self.verbose:
-                ('Requesting more documents from Mendeley (page #%d)' % page_id)
+                print('Requesting more documents from Mendeley (page #%d)' % page_id)
                 
-            self.response_params['page_id'] = page_id
-            next_url = self.links['next']['url']
-            return self.api.make_get_request(next_url, DocumentSet, None, self.response_params)
+            #Copy so that this page keeps its own page_id
+            params = dict(self.response_params)
+            params['page_id'] = page_id
+            next_url = self.api.get_next_page_url(self.links['next']['url'], 
+                                                  params)
+            return self.api.make_get_request(next_url, DocumentSet, None, params)
 
     def previous_page(self):
         pass
@@ -725,13 +1064,82 @@ class DocumentSet(object):
         return utils.property_values_to_string(pv)
 
 
+class ResponseStream(object):
+    """
+    Returned for return_type='stream'. Iterating yields one object at a 
+    time, decoded from the response body as it is downloaded. Following 
+    pages are requested as needed.
+    
+    Unlike DocumentSet, neither the json of a page nor its objects are 
+    held, so memory use is bounded by a single object.
+    
+    Note that a stream can only be iterated over once.
+    
+    See Also
+    --------
+    mendeley.streaming
+    """
+
+    def __init__(self, response, m:'API', params):
+        """
+        Parameters
+        ----------
+        response : requests.Response
+            Response requested with stream=True
+        m : mendeley.api.API
+        params : dict
+            'fcn' - function handle to the type of object to create
+            'context' - mendeley.api.RequestContext
+        """
+        self.context = params.pop('context')
+        self.links = self.context.links
+        self.total_count = self.context.total_count
+        self.response = response
+        self.api = m
+        self.response_params = params
+        self.verbose = params.get('verbose', False)
+        self.page_id = params['page_id']
+        self.fcn = params['fcn']
+
+    def __iter__(self):
+        page = self
+        while page is not None:
+            response = page.response
+            try:
+                chunks = response.iter_content(CHUNK_SIZE)
+                encoding = response.encoding or 'utf-8'
+                for value in iter_json_array(chunks, encoding):
+                    yield page.fcn(value, page.api)
+            finally:
+                response.close()
+            page = page.next_page()
+
+    def next_page(self):
+        if 'next' not in self.links:
+            return None
+
+        page_id = self.page_id + 1
+        if self.verbose:
+            print('Requesting more documents from Mendeley (page #%d)' % page_id)
+
+        params = dict(self.response_params)
+        params['page_id'] = page_id
+        next_url = self.api.get_next_page_url(self.links['next']['url'], params)
+        return self.api.make_get_request(next_url, ResponseStream, 
+                                         {'return_type': 'stream'}, params)
+
+    def __repr__(self):
+        pv = ['links', cld(self.links),
+              'total_count', self.total_count,
+              'fcn', self.fcn,
+              'page_id', self.page_id,
+              'api', cld(self.api)]
+        return utils.property_values_to_string(pv)
+
 class DeletedDocument(ResponseObject):
     def __init__(self, json, m):
         super(DeletedDocument, self).__init__(json)
 
-    def _null(self):
-        self.id = None
-
     @classmethod
     def fields(cls):
         return ['id']
@@ -751,9 +1159,12 @@ class FileSet(object):
             'fcn' - function handle to the type of document to create
             'view' - type of document info to return
             'limit' - maximum # of documents to expect
+            'context' - mendeley.api.RequestContext of the request that
+                        returned this page
         
         """
-        self.links = m.last_response.links
+        self.context = params.pop('context')
+        self.links = self.context.links
         
         self.api = m
         self.response_params = params
@@ -761,17 +1172,57 @@ class FileSet(object):
         self.page_id = params['page_id']
         self.json = json
 
-        fcn = params['fcn']
-
-        # TODO: Figure out how to support lazy loading
-        self.docs = [fcn(x, m) for x in json]
+        self.docs = LazySequence(json, params['fcn'], m)
         
-        try:
-            self.total_count = m.last_response.headers['Mendeley-Count']
-        except:
+        self.total_count = self.context.total_count
+        if self.total_count is None:
             self.total_count = len(self.docs)
         
         #self.view = params['view']
+
+    def __iter__(self):
+        """
+        Iterates over the files of this and all following pages.
+        
+        See Also
+        --------
+        DocumentSet.__iter__
+        """
+        for page in iter_pages(self, self.api.prefetch_depth):
+            for single_file in page.docs:
+                yield single_file
+
+    def get_all_docs(self):
+        """
+        See DocumentSet.get_all_docs
+        """
+        docs = LazySequence([], self.docs.fcn, self.api)
+        for page in iter_pages(self, self.api.prefetch_depth):
+            docs.extend(page.docs)
+        self.docs = docs
+
+    def drop_json(self):
+        """
+        See DocumentSet.drop_json
+        """
+        self.json = None
+
+    def next_page(self):
+        """
+        If the next page does not exist then None is returned.
+        """
+        if 'next' not in self.links:
+            return None
+        else:
+            page_id = self.page_id + 1
+            if self.verbose:
+                print('Requesting more file info from Mendeley (page #%d)' % page_id)
+
+            params = dict(self.response_params)
+            params['page_id'] = page_id
+            next_url = self.api.get_next_page_url(self.links['next']['url'], 
+                                                  params)
+            return self.api.make_get_request(next_url, FileSet, None, params)
         
     def __repr__(self,pv_only=False):
         pv = ['links', cld(self.links),
@@ -810,6 +1261,8 @@ class File(ResponseObject):
     
     """
 
+    __slots__ = ('api',)
+
     def __init__(self, json, m):
         """
         Parameters
@@ -957,6 +1410,9 @@ class Document(ResponseObject):
     Includes a call to a method in API that adds a file
     to this document. So the user can end up with this
     object for a given document and uniquely add a file.
+    
+    Attributes can't be assigned (the class has __slots__), use 
+    m.documents.update(doc.id,{'city':'...'}) to change a document.
 
     """
 
@@ -964,6 +1420,18 @@ class Document(ResponseObject):
         'authors': Person.initialize_array,
         'identifiers': DocumentIdentifiers}
 
+    #Fields that can be read (as None) but that the server doesn't return 
+    #for this view, see view_fields()
+    _not_in_view = ('tags', 'notes', 'doi')
+
+    #Names that are read from another field, used to pick the view for 
+    #fields=... (see mendeley.api.get_view_for_fields)
+    field_sources = dict.fromkeys(IDENTIFIER_COLUMNS, 'identifiers')
+
+    __slots__ = ('api',)
+
+    default_return_type = 'object'
+
     def __init__(self, json, m):
         """
         Parameters
@@ -973,33 +1441,28 @@ class Document(ResponseObject):
 
         """
         super(Document, self).__init__(json)
-        self.doc_id = self.__getattr__('id')
         self.api = m
-        if self.doc_id is None:
+        if self.json.get('id') is None:
             raise KeyError('No doc_id found in models/Document/__init__')
-        self.doc_location = 'https://api.mendeley.com/documents/' + self.doc_id
-        self.default_return_type = 'object'
-
-    def _null(self):
-        """
-        TODO: Ask on SO about this, is there an alternative approach?
-        It does expose tab completion in Spyder ...
-        """
-        self.source = None  #
-        self.year = None  #
-        self.identifiers = None
-        self.id = None  #
-        self.type = None  #
-        self.created = None  #
-        self.profile_id = None  #
-        self.last_modified = None  #
-        self.title = None  #
-        self.authors = None  #
-        self.keywords = None
-        self.abstract = None  #
-        self.tags = None
-        self.notes = None
-        self.doi = self.__getattr__('doi')
+
+    @property
+    def doc_id(self):
+        return self.json['id']
+
+    @property
+    def doc_location(self):
+        return 'https://api.mendeley.com/documents/' + self.doc_id
+
+    @property
+    def doi(self):
+        """
+        The DOI from 'identifiers' (the server doesn't return a 'doi' field
+        for documents)
+        """
+        doi = self.json.get('doi')
+        if doi is None:
+            doi = (self.json.get('identifiers') or {}).get('doi')
+        return doi
 
     @classmethod
     def fields(cls):
@@ -1019,6 +1482,15 @@ class Document(ResponseObject):
                 'doi',
                 'notes']
 
+    @classmethod
+    def view_fields(cls):
+        """
+        The fields returned by the server for the view of this class. This
+        is used to pick the view for a request, see 
+        mendeley.api.get_view_for_fields()
+        """
+        return [x for x in cls.fields() if x not in cls._not_in_view]
+
     @classmethod
     def create(cls, json, m, params):
         """
@@ -1165,12 +1637,6 @@ class BibDocument(Document):
         # s2 = set(Document.fields())
         # s1.difference_update(s2)
 
-    def _null(self):
-        self.issue = None  #
-        self.pages = None  #
-        self.volume = None  #
-        self.websites = None  #
-
     @classmethod
     def fields(cls):
         return super(BibDocument, cls).fields() + \
@@ -1204,14 +1670,6 @@ class ClientDocument(Document):
     def __init__(self, json, m):
         super(ClientDocument, self).__init__(json, m)
 
-    def _null(self):
-        self.authored = None  #
-        self.confirmed = None  #
-        self.file_attached = None  #
-        self.hidden = None  #
-        self.read = None  #
-        self.starred = None  #
-
     @classmethod
     def fields(cls):
         return (super(ClientDocument, cls).fields() +
@@ -1234,12 +1692,11 @@ class TagsDocument(Document):
         The user contributed strings
     """
 
+    _not_in_view = ('notes', 'doi')
+
     def __init__(self, json, m):
         super(TagsDocument, self).__init__(json, m)
 
-    def _null(self):
-        self.tags = None  #
-
     @classmethod
     def fields(cls):
         return (super(TagsDocument, cls).fields() + ['tags'])
@@ -1250,12 +1707,25 @@ class TagsDocument(Document):
 
 
 
+class PatentDocument(Document):
+
+    @classmethod
+    def fields(cls):
+        return (super(PatentDocument, cls).fields() +
+                ['source_type', 'patent_owner', 'patent_application_number',
+                 'patent_legal_status'])
+
+
 class AllDocument(Document):
-    pass
 
+    _not_in_view = ('doi',)
 
-class PatentDocument(Document):
-    pass
+    @classmethod
+    def fields(cls):
+        names = (BibDocument.fields() + ClientDocument.fields() + 
+                 PatentDocument.fields())
+        #Remove duplicates, keeping the order
+        return list(dict.fromkeys(names))
 
 
 # %% Catalog Documents
@@ -1296,6 +1766,11 @@ class CatalogDocument(object):
         self.abstract = json.get('abstract')
         self.link = json['link']
 
+    @classmethod
+    def fields(cls):
+        return ['title', 'type', 'year', 'source', 'id', 'abstract', 'link',
+                'authors', 'identifiers', 'keywords']
+
     def __repr__(self):
         return u'' + \
                '   title: %s\n' % td(self.title) + \
@@ -1314,6 +1789,11 @@ class BibCatalogDocument(CatalogDocument):
         self.pages = json['pages']
         self.volume = json['volume']
 
+    @classmethod
+    def fields(cls):
+        return super(BibCatalogDocument, cls).fields() + \
+               ['issue', 'pages', 'volume']
+
     def __repr__(self):
         return super(BibCatalogDocument, self).__repr__() + \
                '   issue: %s\n' % self.issue + \
@@ -1333,17 +1813,34 @@ class StatsCatalogDocument(CatalogDocument):
         self.reader_count_by_country = json['reader_count_by_country']
         self.reader_count_by_discipline = json['reader_count_by_subdiscipline']
 
+    @classmethod
+    def fields(cls):
+        return super(StatsCatalogDocument, cls).fields() + \
+               ['group_count', 'reader_count', 
+                'reader_count_by_academic_status', 'reader_count_by_country',
+                'reader_count_by_subdiscipline']
+
 
 class ClientCatalogDocument(CatalogDocument):
     def __init__(self, json, m):
         super(ClientCatalogDocument, self).__init__(json, m)
         # file_attached: false
 
+    @classmethod
+    def fields(cls):
+        return super(ClientCatalogDocument, cls).fields() + ['file_attached']
+
 
 class AllCatalogDocument(CatalogDocument):
     def __init__(self, json, m):
-        super(AllCatalogDocument, self).__init__()
+        super(AllCatalogDocument, self).__init__(json, m)
         # TODO: Not yet implemented
         pass
 
+    @classmethod
+    def fields(cls):
+        names = (BibCatalogDocument.fields() + ClientCatalogDocument.fields() +
+                 StatsCatalogDocument.fields())
+        return list(dict.fromkeys(names))
+
 
@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 """
 Handles importing of optional packages/modules. These imports
-are accomplished normally unless they are missing. In that case
-a MissingModule is imported that throws an error when you try and use it.
+are deferred until first use (see LazyImport) so that importing mendeley
+doesn't pay for them. If a module is missing an error is thrown when you
+try and use it, as with MissingModule.
 
 TODO: document all optional imports
 
@@ -14,6 +15,9 @@ ST_Library_db (db)
 pub_objects
 """
 
+import importlib
+import threading
+
 from .errors import OptionalLibraryError
 
 class MissingModule(object):
@@ -32,42 +36,91 @@ class MissingModule(object):
         #=> I think getattribute is more comprehensive
         raise OptionalLibraryError(self.msg)
 
+class LazyImport(object):
+    """
+    Stands in for an optional module (or an attribute of it) and imports it
+    on first use.
+    
+    Parameters
+    ----------
+    module_name : str
+    msg : str
+        Error message if the module is missing.
+    attribute : str (default None)
+        e.g. a class from the module
+    """
+    
+    def __init__(self, module_name, msg, attribute=None):
+        self._module_name = module_name
+        self._msg = msg
+        self._attribute = attribute
+        self._value = None
+        self._lock = threading.Lock()
+        
+    def _load(self):
+        value = self._value
+        if value is None:
+            with self._lock:
+                if self._value is None:
+                    try:
+                        value = importlib.import_module(self._module_name)
+                        if self._attribute is not None:
+                            #Same as "from module import attribute"
+                            try:
+                                value = getattr(value, self._attribute)
+                            except AttributeError:
+                                value = importlib.import_module(
+                                    self._module_name + '.' + self._attribute)
+                    except ImportError:
+                        value = MissingModule(self._msg)
+                    self._value = value
+                value = self._value
+        return value
+        
+    @property
+    def is_available(self):
+        return not isinstance(self._load(), MissingModule)
+        
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+        
+    def __call__(self, *args, **kwargs):
+        value = self._load()
+        if isinstance(value, MissingModule):
+            raise OptionalLibraryError(self._msg)
+        return value(*args, **kwargs)
+        
+    #isinstance() and issubclass() with a lazily imported class, e.g.
+    #isinstance(info, PaperInfo). Nothing is an instance of a missing class.
+    def __instancecheck__(self, obj):
+        value = self._load()
+        if isinstance(value, MissingModule):
+            return False
+        return isinstance(obj, value)
+        
+    def __subclasscheck__(self, cls):
+        value = self._load()
+        if isinstance(value, MissingModule):
+            return False
+        return issubclass(cls, value)
+        
+    def __repr__(self):
+        return 'LazyImport: %s' % self._module_name
+
 #Optional import handling
 #http://stackoverflow.com/a/563060/764365
-try:
-    import reference_resolver as rr
-except ImportError:
-    rr = MissingModule('The method called requires the library "reference_resolver" from the Scholar Tools Github repo')
-    # TODO: Provide link to repo
-    # Eventually pip the repo and specify pip is possible
-
+rr = LazyImport('reference_resolver', 'The method called requires the library "reference_resolver" from the Scholar Tools Github repo')
+# TODO: Provide link to repo
+# Eventually pip the repo and specify pip is possible
 
-try:
-    from library_db import db_session as db
-except ImportError:
-    db = MissingModule('The method called requires the library "ST_library_db" from the Scholar Tools Github repo')
+db = LazyImport('library_db', 'The method called requires the library "ST_library_db" from the Scholar Tools Github repo', 'db_session')
 
-try:
-    import pypub.publishers.pub_objects as pub_objects
-except ImportError:
-    pub_objects = MissingModule('The method called requires the library "pypub" from the Scholar Tools Github repo')
+pub_objects = LazyImport('pypub.publishers.pub_objects', 'The method called requires the library "pypub" from the Scholar Tools Github repo')
 
-try:
-    from pypub.paper_info import PaperInfo
-except ImportError:
-    PaperInfo = MissingModule('The method called requires the library "pypub" from the Scholar Tools Github repo')
+PaperInfo = LazyImport('pypub.paper_info', 'The method called requires the library "pypub" from the Scholar Tools Github repo', 'PaperInfo')
 
-try:
-    from pypub.scrapers import base_objects
-except ImportError:
-    base_objects = MissingModule('The method called requires the library "pypub" from the Scholar Tools Github repo')
+base_objects = LazyImport('pypub.scrapers', 'The method called requires the library "pypub" from the Scholar Tools Github repo', 'base_objects')
 
-try:
-    from scopy import Scopus
-except ImportError:
-    Scopus = MissingModule('The method called requires the library "scopy" from the Scholar Tools Github repo')
+Scopus = LazyImport('scopy', 'The method called requires the library "scopy" from the Scholar Tools Github repo', 'Scopus')
 
-try:
-    from pdfetch import pdf_retrieval
-except ImportError:
-    pdf_retrieval = MissingModule('The method called requires the library "pdfetch" from the Scholar Tools Github repo')
+pdf_retrieval = LazyImport('pdfetch', 'The method called requires the library "pdfetch" from the Scholar Tools Github repo', 'pdf_retrieval')
@@ -0,0 +1,201 @@
+# -*- coding: utf-8 -*-
+"""
+Adaptive page sizes for "get all" (limit=0) requests.
+
+Rather than always asking for the largest page that an endpoint allows,
+the page size (the 'limit' query parameter) is tuned per endpoint and view
+from the size and latency of the pages received so far. Each page is sized
+so that it should take about 'target_latency' seconds and be at most
+'target_bytes' long, within the endpoint's maximum. A view='ids' listing
+quickly grows to the maximum, whereas view='all' pages stay small enough
+that the first documents arrive quickly and the memory used per page is
+predictable.
+
+Estimates are kept by the API (API.pager) so later requests start from
+what has been learned.
+
+General Usage
+-------------
+from mendeley import API
+from mendeley.paging import AdaptivePager
+
+m = API(pager=AdaptivePager(target_latency=1))
+docs = m.documents.get(limit=0,view='all')
+print(m.pager)
+
+#Fixed (maximum) page sizes
+m = API(pager=False)
+"""
+
+#Standard Library
+import threading
+import urllib.parse
+
+#Local Imports
+from . import utils
+
+#Largest 'limit' allowed by each endpoint
+MAX_LIMITS = {'/documents': 500,
+              '/trash': 500,
+              '/files': 500,
+              '/annotations': 200}
+
+DEFAULT_MAX_LIMIT = 500
+
+def get_max_limit(endpoint):
+    """
+    Parameters
+    ----------
+    endpoint : str
+        The path of the endpoint, e.g. '/documents'
+    """
+    return MAX_LIMITS.get(endpoint, DEFAULT_MAX_LIMIT)
+
+def set_url_limit(url, limit):
+    """
+    Returns the url with its 'limit' query parameter set to limit. This is
+    used to resize the pages requested using the 'next' links.
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = [(k, v) for k, v in urllib.parse.parse_qsl(parts.query,
+                                                        keep_blank_values=True)
+             if k != 'limit']
+    query.append(('limit', str(limit)))
+    query = urllib.parse.urlencode(query, quote_via=urllib.parse.quote)
+    return urllib.parse.urlunsplit(parts._replace(query=query))
+
+class _PageEstimate(object):
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.seconds_per_item = None
+        self.bytes_per_item = None
+        self.n_pages = 0
+
+class AdaptivePager(object):
+
+    """
+    Attributes
+    ----------
+    target_latency : float
+        Seconds per page to aim for.
+    target_bytes : int
+        Largest page body to aim for.
+    initial_limit : int
+        Page size used before anything is known about an endpoint and view.
+    min_limit : int
+    max_growth : float
+        Largest factor by which the page size can grow from one page to the
+        next.
+    """
+
+    def __init__(self, target_latency=2.0, target_bytes=4 * 1024 * 1024,
+                 initial_limit=100, min_limit=20, max_growth=2):
+        """
+        Parameters
+        ----------
+        target_latency : float (default 2.0)
+        target_bytes : int (default 4 MB)
+        initial_limit : int (default 100)
+        min_limit : int (default 20)
+        max_growth : float (default 2)
+        """
+        self.target_latency = target_latency
+        self.target_bytes = target_bytes
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_growth = max_growth
+
+        self._lock = threading.Lock()
+        self._estimates = {}
+
+    def get_limit(self, endpoint, view=None):
+        """
+        Returns the page size to request next.
+
+        Parameters
+        ----------
+        endpoint : str
+            e.g. '/documents'
+        view : str (default None)
+        """
+        max_limit = get_max_limit(endpoint)
+        with self._lock:
+            estimate = self._estimates.get((endpoint, view))
+            if estimate is None:
+                return min(self.initial_limit, max_limit)
+            return min(estimate.limit, max_limit)
+
+    def record_page(self, endpoint, view, limit, n_bytes, latency):
+        """
+        Updates the page size from a full page (i.e. one that returned
+        'limit' items).
+
+        Parameters
+        ----------
+        endpoint : str
+        view : str
+        limit : int
+            The page size that was requested.
+        n_bytes : int
+            Size of the response body.
+        latency : float
+            Seconds to receive the page.
+        """
+        if limit <= 0:
+            return
+
+        max_limit = get_max_limit(endpoint)
+        seconds_per_item = latency / limit
+        bytes_per_item = n_bytes / limit
+
+        with self._lock:
+            key = (endpoint, view)
+            estimate = self._estimates.get(key)
+            if estimate is None:
+                estimate = _PageEstimate(limit)
+                self._estimates[key] = estimate
+
+            if estimate.seconds_per_item is None:
+                estimate.seconds_per_item = seconds_per_item
+                estimate.bytes_per_item = bytes_per_item
+            else:
+                estimate.seconds_per_item = 0.5 * estimate.seconds_per_item \
+                    + 0.5 * seconds_per_item
+                estimate.bytes_per_item = 0.5 * estimate.bytes_per_item \
+                    + 0.5 * bytes_per_item
+            estimate.n_pages += 1
+
+            new_limit = max_limit
+            if estimate.seconds_per_item > 0:
+                new_limit = min(new_limit,
+                                self.target_latency / estimate.seconds_per_item)
+            if estimate.bytes_per_item > 0:
+                new_limit = min(new_limit,
+                                self.target_bytes / estimate.bytes_per_item)
+            new_limit = min(new_limit, limit * self.max_growth)
+            estimate.limit = int(max(min(new_limit, max_limit),
+                                     min(self.min_limit, max_limit)))
+
+    def reset(self):
+        with self._lock:
+            self._estimates = {}
+
+    def __repr__(self):
+        pv = ['target_latency', self.target_latency,
+              'target_bytes', self.target_bytes,
+              'initial_limit', self.initial_limit,
+              'min_limit', self.min_limit,
+              'max_growth', self.max_growth]
+        with self._lock:
+            items = sorted(self._estimates.items(), key=lambda x: str(x[0]))
+        if items:
+            pv.extend(['---', '--- page sizes ---'])
+        for (endpoint, view), estimate in items:
+            pv.extend(['%s (%s)' % (endpoint, view),
+                       '%d (%d pages, %s s/item, %d bytes/item)'
+                       % (estimate.limit, estimate.n_pages,
+                          utils.float_or_none_to_string(
+                              estimate.seconds_per_item),
+                          estimate.bytes_per_item or 0)])
+        return utils.property_values_to_string(pv)
@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Retry rules for requests made by mendeley.api.API
+
+Requests that fail because of throttling (429) or a transient server error
+(500, 502, 503, 504) are retried after a delay. The delay is taken from the
+'Retry-After' header when the server provides one, otherwise jittered
+exponential backoff is used.
+
+Which requests are retried depends on the HTTP verb:
+    GET, HEAD, OPTIONS, PUT, PATCH, DELETE - retried
+    POST - only retried on 429 (the server did not process the request) or
+           when the caller marks the request as safe to repeat
+
+General Usage
+-------------
+from mendeley import API
+from mendeley.retry import RetryPolicy
+
+m = API(retry_policy=RetryPolicy(max_retries=8,backoff_max=120))
+
+#No retries
+m = API(retry_policy=RetryPolicy(max_retries=0))
+
+"""
+
+#Standard Library
+import random
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+#Local Imports
+from . import utils
+
+RETRY_STATUS_CODES = frozenset([429, 500, 502, 503, 504])
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'PATCH',
+                                'DELETE'])
+
+class RetryPolicy(object):
+
+    """
+    Attributes
+    ----------
+    max_retries : int
+        Maximum # of retries, i.e. a request is sent at most max_retries + 1
+        times.
+    backoff_base : float
+        Delay in seconds for the first retry. This doubles with each retry.
+    backoff_max : float
+        Upper limit on the delay (in seconds) between attempts. This also
+        limits the value used from a 'Retry-After' header.
+    jitter : bool
+        If true, the delay is drawn uniformly between 0 and the backoff
+        value. This avoids many workers retrying at the same time.
+    status_codes : frozenset
+        Response status codes that are retried.
+    """
+
+    def __init__(self,
+                 max_retries=5,
+                 backoff_base=0.5,
+                 backoff_max=60,
+                 jitter=True,
+                 status_codes=RETRY_STATUS_CODES):
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.status_codes = frozenset(status_codes)
+
+    def can_retry(self, method, attempt, response=None, safe=False):
+        """
+        Parameters
+        ----------
+        method : str
+        attempt : int
+            # of retries that have already been made.
+        response : requests.Response or None
+            None indicates that the request failed to connect.
+        safe : bool
+            Whether a non-idempotent request (POST) may be repeated.
+
+        Returns
+        -------
+        bool
+        """
+
+        if attempt >= self.max_retries:
+            return False
+
+        if response is not None and response.status_code not in self.status_codes:
+            return False
+
+        if method.upper() in IDEMPOTENT_METHODS or safe:
+            return True
+
+        #A POST that was throttled was never processed
+        return response is not None and response.status_code == 429
+
+    def get_delay(self, attempt, response=None):
+        """
+        Returns the time to wait (in seconds) before the next attempt.
+
+        Parameters
+        ----------
+        attempt : int
+            # of retries that have already been made.
+        response : requests.Response or None
+        """
+
+        retry_after = _parse_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        if self.jitter:
+            delay = random.uniform(0, delay)
+        return delay
+
+    def __repr__(self):
+        pv = ['max_retries', self.max_retries,
+              'backoff_base', self.backoff_base,
+              'backoff_max', self.backoff_max,
+              'jitter', self.jitter,
+              'status_codes', sorted(self.status_codes)]
+        return utils.property_values_to_string(pv)
+
+def _parse_retry_after(response):
+    """
+    The header may be given in seconds or as an HTTP date.
+
+    Returns
+    -------
+    float or None
+    """
+
+    if response is None:
+        return None
+
+    value = response.headers.get('Retry-After')
+    if value is None:
+        return None
+
+    value = value.strip()
+    try:
+        return max(float(value), 0)
+    except ValueError:
+        pass
+
+    try:
+        retry_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    now = datetime.now(retry_time.tzinfo)
+    return max((retry_time - now).total_seconds(), 0)
@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Scheduling of requests between interactive and background work.
+
+All requests made by an API go through its RequestScheduler, which can
+limit the # of requests in flight. When the limit is reached, requests wait
+and are started in priority order, so interactive lookups don't queue 
+behind a bulk download. Background requests are also kept from using the 
+last 'interactive_reserve' slots.
+
+By default an API's scheduler has no limit (max_concurrency=None) and only
+counts requests. The concurrency is then set by the caller: the # of 
+threads, AsyncAPI(max_concurrency=...) or the window of an AIMDController 
+(mendeley.concurrency). A limit applies on top of these, so it should be
+at least as large as them for them to take effect.
+
+The priority is set for a block of code (and any threads that the API
+starts on its behalf) using API.priority():
+
+    from mendeley import API
+    from mendeley.scheduler import BACKGROUND
+
+    m = API(thread_safe=True)
+
+    #In a worker thread
+    with m.priority(BACKGROUND):
+        docs = m.documents.get(limit=0)
+
+    #Meanwhile, in the GUI thread (interactive by default)
+    d = m.catalog.get(doi='10.1002/bit.25159')
+
+A scheduler can be shared by multiple API instances (e.g. different users)
+so that they share a single budget:
+
+    s = RequestScheduler(max_concurrency=20)
+    m1 = API(user_name='user1',scheduler=s)
+    m2 = API(user_name='user2',scheduler=s)
+
+Without a limit there is nothing to order, so requests are only served by
+priority when max_concurrency is set.
+"""
+
+#Standard Library
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+#Local Imports
+from . import utils
+from . import errors
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+#Lower values are served first
+PRIORITY_LEVELS = {INTERACTIVE: 0, BACKGROUND: 1}
+
+_priority = contextvars.ContextVar('mendeley_priority', default=INTERACTIVE)
+
+@contextmanager
+def priority(name):
+    """
+    Sets the priority of requests made within the context.
+
+    Parameters
+    ----------
+    name : {INTERACTIVE, BACKGROUND}
+    """
+    if name not in PRIORITY_LEVELS:
+        raise ValueError('Unrecognized priority: %s' % name)
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def get_priority():
+    return _priority.get()
+
+class RequestScheduler(object):
+
+    """
+    Attributes
+    ----------
+    max_concurrency : int or None
+        Maximum # of requests in flight, None for no limit.
+    interactive_reserve : int
+        # of slots that background requests can't use.
+    n_active : int
+    n_active_by_priority : dict
+    n_waited : dict
+        priority => # of requests that had to wait for a slot
+    wait_time : dict
+        priority => total time (seconds) spent waiting for slots
+    """
+
+    def __init__(self, max_concurrency=10, interactive_reserve=1):
+        """
+        Parameters
+        ----------
+        max_concurrency : int or None (default 10)
+        interactive_reserve : int (default 1)
+        """
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError('max_concurrency must be at least 1')
+
+        self.max_concurrency = max_concurrency
+        self.interactive_reserve = interactive_reserve
+
+        self._cond = threading.Condition()
+        self._waiting = []
+        self._counter = itertools.count()
+
+        self.n_active = 0
+        self.n_active_by_priority = {x: 0 for x in PRIORITY_LEVELS}
+        self.n_waited = {x: 0 for x in PRIORITY_LEVELS}
+        self.wait_time = {x: 0 for x in PRIORITY_LEVELS}
+
+    def _get_limit(self, name):
+        if self.max_concurrency is None:
+            return float('inf')
+        elif name == INTERACTIVE:
+            return self.max_concurrency
+        return max(self.max_concurrency - self.interactive_reserve, 1)
+
+    def acquire(self, name=None, timeout=None):
+        """
+        Waits for a slot.
+
+        Parameters
+        ----------
+        name : str (default None)
+            Priority of the request. If None, the priority of the current
+            context is used.
+        timeout : float (default None)
+            Maximum time (in seconds) to wait, e.g. the time remaining
+            until a deadline. None waits indefinitely.
+
+        Returns
+        -------
+        str
+            The priority, to pass to release()
+
+        Raises
+        ------
+        mendeley.errors.DeadlineExceededError
+            If the timeout ran out while waiting.
+        """
+        if name is None:
+            name = _priority.get()
+
+        with self._cond:
+            if not self._waiting and self.n_active < self._get_limit(name):
+                self._start(name)
+                return name
+
+            t0 = time.perf_counter()
+            entry = (PRIORITY_LEVELS[name], next(self._counter))
+            heapq.heappush(self._waiting, entry)
+            end = None if timeout is None else time.monotonic() + timeout
+            while not (self._waiting[0] == entry and
+                       self.n_active < self._get_limit(name)):
+                if end is None:
+                    self._cond.wait()
+                    continue
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(entry)
+                    heapq.heapify(self._waiting)
+                    self.n_waited[name] += 1
+                    self.wait_time[name] += time.perf_counter() - t0
+                    #The next waiter may now be first in line
+                    self._cond.notify_all()
+                    raise errors.DeadlineExceededError(
+                        'Deadline exceeded while waiting for a request slot')
+                self._cond.wait(remaining)
+            heapq.heappop(self._waiting)
+            self._start(name)
+
+            self.n_waited[name] += 1
+            self.wait_time[name] += time.perf_counter() - t0
+
+            #The next waiter may also be able to start
+            self._cond.notify_all()
+
+        return name
+
+    def _start(self, name):
+        self.n_active += 1
+        self.n_active_by_priority[name] += 1
+
+    def release(self, name):
+        with self._cond:
+            self.n_active -= 1
+            self.n_active_by_priority[name] -= 1
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, name=None, timeout=None):
+        """
+        Context manager for acquire() and release()
+        """
+        name = self.acquire(name, timeout)
+        try:
+            yield
+        finally:
+            self.release(name)
+
+    @property
+    def n_waiting(self):
+        return len(self._waiting)
+
+    def __repr__(self):
+        pv = ['max_concurrency', self.max_concurrency,
+              'interactive_reserve', self.interactive_reserve,
+              'n_active', self.n_active,
+              'n_waiting', self.n_waiting,
+              '---', '--- counters ---',
+              'n_active_by_priority', self.n_active_by_priority,
+              'n_waited', self.n_waited,
+              'wait_time', {k: utils.float_or_none_to_string(v)
+                            for k, v in self.wait_time.items()}]
+        return utils.property_values_to_string(pv)
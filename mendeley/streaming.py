@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental decoding of JSON responses.
+
+This is used for return_type='stream' (see mendeley.models.ResponseStream)
+so that the documents of a page are decoded one at a time as the body is
+downloaded, rather than decoding the entire page into a list first.
+
+The elements are decoded with json.JSONDecoder.raw_decode(), which also
+finds where each element ends. The API's json_codec is not used, as the 
+libraries it supports (orjson, ujson) can only decode complete documents.
+
+General Usage
+-------------
+from mendeley import API
+m = API()
+
+for doc in m.documents.get(limit=0,view='all',return_type='stream'):
+    #Only the current document (plus a chunk of the body) is in memory
+    db.add(doc)
+"""
+
+#Standard Library
+import json
+import codecs
+
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+def iter_json_array(chunks, encoding='utf-8'):
+    """
+    Yields the elements of a JSON array as the array is being received.
+
+    Parameters
+    ----------
+    chunks : iterable of bytes
+        e.g. response.iter_content(CHUNK_SIZE)
+    encoding : str (default 'utf-8')
+
+    If the top level value is not an array, it is decoded in full and
+    yielded as a single value.
+    """
+
+    chunks = iter(chunks)
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+
+    buffer = ''
+    pos = 0
+    started = False
+    finished = False
+
+    for chunk in chunks:
+        buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+
+        if not started:
+            stripped = buffer.lstrip(_WHITESPACE)
+            if not stripped:
+                continue
+            if stripped[0] != '[':
+                #Not an array, no streaming
+                for chunk in chunks:
+                    buffer += text_decoder.decode(chunk)
+                buffer += text_decoder.decode(b'', final=True)
+                yield json.loads(buffer)
+                return
+            started = True
+            pos = len(buffer) - len(stripped) + 1
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE + ',':
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == ']':
+                finished = True
+                break
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                #Incomplete value, wait for more data
+                break
+            if end == len(buffer) and not isinstance(value, (dict, list)):
+                #A number or literal may continue in the next chunk
+                break
+            yield value
+            pos = end
+
+        if finished:
+            return
+
+    if not started:
+        raise ValueError('Empty response, expected a JSON array')
+
+    #Data left over after the final chunk
+    buffer = buffer[pos:] + text_decoder.decode(b'', final=True)
+    pos = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE + ',':
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == ']':
+            return
+        if pos == len(buffer):
+            raise ValueError('Incomplete JSON array')
+        value, pos = decoder.raw_decode(buffer, pos)
+        yield value
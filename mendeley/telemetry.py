@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""
+Per-endpoint request metrics, available as API.stats
+
+Metrics are collected for each endpoint, named by the method and the url
+path with ids replaced, e.g. 'GET /documents/{id}'
+
+General Usage
+-------------
+from mendeley import API
+m = API()
+
+#... make some requests
+
+print(m.stats)
+s = m.stats.snapshot()
+s['GET /documents']['latency_mean']
+
+m.stats.reset()
+"""
+
+#Standard Library
+import re
+import threading
+from collections import deque
+from urllib.parse import urlsplit
+
+#Local Imports
+from . import utils
+
+#Upper bounds (in seconds) of the latency histogram bins, the last bin is
+#for anything slower
+LATENCY_BINS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+#Latencies kept per endpoint for estimating percentiles
+N_RECENT = 200
+
+_ID_PATTERN = re.compile(r'^([0-9a-fA-F-]{16,}|\d+)$')
+
+def get_endpoint_name(method, url):
+    """
+    Examples
+    --------
+    get_endpoint_name('GET','https://api.mendeley.com/documents/b2ad49aa-4c99-3b04-85b3-b7e67245d5f2')
+    => 'GET /documents/{id}'
+    """
+    path = urlsplit(url).path.rstrip('/')
+    parts = ['{id}' if _ID_PATTERN.match(x) else x for x in path.split('/')]
+    return '%s %s' % (method, '/'.join(parts))
+
+class EndpointStats(object):
+
+    """
+    Attributes
+    ----------
+    n_requests : int
+    n_errors : int
+        # of requests that didn't return a success status (after retries)
+    n_retries : int
+    n_hedges : int
+        # of calls for which a second (hedged) request was sent
+    status_codes : dict
+        status code => count
+    latency_total : float
+        Seconds, including time spent waiting between retries.
+    latency_histogram : list
+        Counts for the bins in LATENCY_BINS, with an extra bin at the end.
+    bytes_in : int
+        Response body bytes, as received (i.e. compressed if gzipped)
+    bytes_out : int
+        Request body bytes
+    handle_return_total : float
+        Seconds spent converting responses to the returned objects.
+    """
+
+    def __init__(self):
+        self.n_requests = 0
+        self.n_errors = 0
+        self.n_retries = 0
+        self.n_hedges = 0
+        self.status_codes = {}
+        self.latency_total = 0
+        self.latency_histogram = [0] * (len(LATENCY_BINS) + 1)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.handle_return_total = 0
+        self.recent_latencies = deque(maxlen=N_RECENT)
+
+    @property
+    def latency_mean(self):
+        if self.n_requests == 0:
+            return None
+        return self.latency_total / self.n_requests
+
+    def get_latency_percentile(self, percentile):
+        """
+        Estimated from the most recent N_RECENT requests.
+
+        Parameters
+        ----------
+        percentile : float
+            0 - 100
+
+        Returns
+        -------
+        float or None
+        """
+        values = sorted(self.recent_latencies)
+        if len(values) == 0:
+            return None
+        index = int(round((len(values) - 1) * percentile / 100))
+        return values[index]
+
+    def as_dict(self):
+        return {'n_requests': self.n_requests,
+                'n_errors': self.n_errors,
+                'n_retries': self.n_retries,
+                'n_hedges': self.n_hedges,
+                'status_codes': dict(self.status_codes),
+                'latency_total': self.latency_total,
+                'latency_mean': self.latency_mean,
+                'latency_p50': self.get_latency_percentile(50),
+                'latency_p95': self.get_latency_percentile(95),
+                'latency_histogram': list(self.latency_histogram),
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'handle_return_total': self.handle_return_total}
+
+    def __repr__(self):
+        pv = ['n_requests', self.n_requests,
+              'n_errors', self.n_errors,
+              'n_retries', self.n_retries,
+              'n_hedges', self.n_hedges,
+              'status_codes', self.status_codes,
+              'latency_mean', utils.float_or_none_to_string(self.latency_mean),
+              'latency_p95', utils.float_or_none_to_string(
+                  self.get_latency_percentile(95)),
+              'bytes_in', self.bytes_in,
+              'bytes_out', self.bytes_out,
+              'handle_return_total',
+                  utils.float_or_none_to_string(self.handle_return_total)]
+        return utils.property_values_to_string(pv)
+
+class Telemetry(object):
+
+    """
+    Collects EndpointStats for each endpoint. This is available as
+    API.stats
+
+    Attributes
+    ----------
+    endpoints : dict
+        endpoint name => EndpointStats
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+
+    def _get(self, endpoint):
+        #Lock must be held
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = EndpointStats()
+            self.endpoints[endpoint] = stats
+        return stats
+
+    def __getitem__(self, endpoint):
+        return self.endpoints[endpoint]
+
+    def record_request(self, endpoint, status_code, latency, bytes_in=0,
+                       bytes_out=0, n_retries=0):
+        """
+        Parameters
+        ----------
+        endpoint : str
+            See get_endpoint_name()
+        status_code : int or None
+            None if no response was received
+        latency : float
+        bytes_in : int
+        bytes_out : int
+        n_retries : int
+        """
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.n_requests += 1
+            if status_code is None or status_code >= 400:
+                stats.n_errors += 1
+            stats.status_codes[status_code] = \
+                stats.status_codes.get(status_code, 0) + 1
+            stats.n_retries += n_retries
+            stats.latency_total += latency
+            stats.recent_latencies.append(latency)
+            for i, upper in enumerate(LATENCY_BINS):
+                if latency <= upper:
+                    stats.latency_histogram[i] += 1
+                    break
+            else:
+                stats.latency_histogram[-1] += 1
+            stats.bytes_in += bytes_in
+            stats.bytes_out += bytes_out
+
+    def record_hedge(self, endpoint):
+        with self._lock:
+            self._get(endpoint).n_hedges += 1
+
+    def record_handle_return(self, endpoint, elapsed):
+        with self._lock:
+            self._get(endpoint).handle_return_total += elapsed
+
+    def get_latency_percentile(self, endpoint, percentile, min_samples=1):
+        """
+        Returns None if there are fewer than min_samples latencies for the
+        endpoint.
+        """
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None or len(stats.recent_latencies) < min_samples:
+                return None
+            return stats.get_latency_percentile(percentile)
+
+    def snapshot(self):
+        """
+        Returns
+        -------
+        dict
+            endpoint name => dict of metrics
+        """
+        with self._lock:
+            return {k: v.as_dict() for k, v in self.endpoints.items()}
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def __repr__(self):
+        with self._lock:
+            items = sorted(self.endpoints.items(),
+                           key=lambda x: -x[1].latency_total)
+        pv = []
+        for name, stats in items:
+            pv.extend([name, '%d requests, %0.3f s mean, %d errors, '
+                       '%d retries, %d bytes in'
+                       % (stats.n_requests, stats.latency_mean or 0,
+                          stats.n_errors, stats.n_retries, stats.bytes_in)])
+        if not pv:
+            pv = ['endpoints', 'none']
+        return utils.property_values_to_string(pv)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Storage of access tokens that is shared by processes.
+
+Tokens are saved as JSON, written to a temporary file and moved into place
+with os.replace() so that readers never see a partial file. Renewals are
+made while holding an exclusive lock on '<token file>.lock' (fcntl on Unix,
+msvcrt on Windows). A process that gets the lock after another process has
+renewed the token finds the new token on disk and uses it rather than
+renewing again, which would invalidate the other process' refresh token.
+
+See mendeley.auth._Authorization.renew_token(), which holds get_lock() while
+renewing.
+"""
+
+#Standard Library
+import os
+import json
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+class FileLock(object):
+
+    """
+    Exclusive lock held across processes.
+
+    The lock is re-entrant within a process (e.g. saving while renewing)
+    and also serializes threads of the same process.
+
+    Use get_lock() rather than creating instances directly so that there is
+    a single instance per path.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._rlock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def acquire(self):
+        self._rlock.acquire()
+        if self._depth == 0:
+            try:
+                self._file = open(self.path, 'a+')
+                self._lock_file()
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._rlock.release()
+                raise
+        self._depth += 1
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            try:
+                self._unlock_file()
+            finally:
+                self._file.close()
+                self._file = None
+        self._rlock.release()
+
+    def _lock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        else:
+            self._file.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+                    return
+                except OSError:
+                    #LK_LOCK gives up after 10 seconds
+                    pass
+
+    def _unlock_file(self):
+        if fcntl is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        else:
+            self._file.seek(0)
+            msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    def __repr__(self):
+        return 'FileLock: %s' % self.path
+
+def get_lock(file_path):
+    """
+    Returns the FileLock for a token file.
+    """
+    path = os.path.abspath(file_path) + '.lock'
+    with _locks_lock:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = FileLock(path)
+            _locks[path] = lock
+        return lock
+
+def save(file_path, data):
+    """
+    Atomically writes data (a dict) as JSON.
+    """
+    temp_path = '%s.%d.tmp' % (file_path, os.getpid())
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, file_path)
+
+def load(file_path):
+    """
+    Returns the saved dict or None if the file doesn't exist or can't be 
+    read (e.g. a truncated file), in which case the token is obtained again.
+    """
+    try:
+        with open(file_path, 'r') as f:
+            data = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    return data
@@ -0,0 +1,259 @@
+# -*- coding: utf-8 -*-
+"""
+Lightweight tracing of where time is spent, e.g. during a sync.
+
+Spans are written, one per line, to a JSONL file. Each line is an event in
+the Chrome Trace Event Format ("complete" events, ph='X'). The file can be
+converted for use in chrome://tracing or https://ui.perfetto.dev using
+export_chrome_trace().
+
+Tracing is off by default, in which case span() does nothing.
+
+Covered
+-------
+- sync phases (mendeley.client_library.Sync)
+- HTTP requests made by mendeley.api.API (one span per call, including any
+  retries)
+- mendeley.db_tables.DB.add_documents
+
+General Usage
+-------------
+from mendeley import tracing
+from mendeley import client_library
+
+tracing.enable()
+cl = client_library.UserLibrary()
+tracing.disable()
+
+tracing.export_chrome_trace(tracing.get_tracer_path(),'sync_trace.json')
+
+#Custom spans
+with tracing.span('my_step', n_items=10) as s:
+    ...
+    s.set(n_failed=2)
+"""
+
+#Standard Library
+import os
+import json
+import time
+import threading
+import itertools
+from datetime import datetime
+
+#Local Imports
+from . import config
+
+_tracer = None
+
+class Tracer(object):
+
+    """
+    Attributes
+    ----------
+    file_path : str
+    """
+
+    def __init__(self, file_path=None):
+        """
+        Parameters
+        ----------
+        file_path : str (default None)
+            Defaults to a time stamped file in
+            config.get_save_root(['traces'])
+        """
+        if file_path is None:
+            root = config.get_save_root(['traces'], True)
+            name = datetime.now().strftime('trace_%Y%m%d_%H%M%S.jsonl')
+            file_path = os.path.join(root, name)
+
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._file = open(file_path, 'a')
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _get_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = []
+            self._local.stack = stack
+        return stack
+
+    def record(self, name, start, end, category='mendeley', attributes=None,
+               span_id=None, parent_id=None):
+        """
+        Writes a span.
+
+        Parameters
+        ----------
+        name : str
+        start : float
+            time.perf_counter() value
+        end : float
+            time.perf_counter() value
+        category : str
+        attributes : dict
+            Shown as the arguments of the span.
+        """
+        if parent_id is None:
+            stack = self._get_stack()
+            if stack:
+                parent_id = stack[-1]
+        if span_id is None:
+            span_id = next(self._ids)
+
+        args = dict(attributes) if attributes else {}
+        args['span_id'] = span_id
+        if parent_id is not None:
+            args['parent_id'] = parent_id
+
+        event = {'name': name,
+                 'cat': category,
+                 'ph': 'X',
+                 'ts': int(start * 1e6),
+                 'dur': int((end - start) * 1e6),
+                 'pid': self._pid,
+                 'tid': threading.get_ident(),
+                 'args': args}
+        line = json.dumps(event, default=str)
+
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + '\n')
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __repr__(self):
+        return 'Tracer: %s' % self.file_path
+
+class Span(object):
+
+    """
+    Returned by span(). Use set() to add attributes while the span is open.
+    """
+
+    def __init__(self, tracer, name, category, attributes):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.span_id = next(tracer._ids)
+        self.parent_id = None
+        self.start = None
+
+    def set(self, **kwargs):
+        self.attributes.update(kwargs)
+
+    def __enter__(self):
+        stack = self.tracer._get_stack()
+        if stack:
+            self.parent_id = stack[-1]
+        stack.append(self.span_id)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end = time.perf_counter()
+        stack = self.tracer._get_stack()
+        if stack and stack[-1] == self.span_id:
+            stack.pop()
+        if exc_type is not None:
+            self.attributes['error'] = exc_type.__name__
+        self.tracer.record(self.name, self.start, end, self.category,
+                           self.attributes, self.span_id, self.parent_id)
+        return False
+
+class _NullSpan(object):
+
+    def set(self, **kwargs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+def enable(file_path=None):
+    """
+    Starts writing spans to a new Tracer.
+
+    Returns
+    -------
+    Tracer
+    """
+    global _tracer
+    disable()
+    _tracer = Tracer(file_path)
+    return _tracer
+
+def disable():
+    global _tracer
+    tracer = _tracer
+    _tracer = None
+    if tracer is not None:
+        tracer.close()
+
+def is_enabled():
+    return _tracer is not None
+
+def get_tracer_path():
+    """
+    Returns the path of the file being written, or None if not enabled.
+    """
+    tracer = _tracer
+    return None if tracer is None else tracer.file_path
+
+def span(name, category='mendeley', **attributes):
+    """
+    Context manager that records the time spent inside as a span. Spans
+    opened within the context (in the same thread) are nested under it.
+
+    Parameters
+    ----------
+    name : str
+    category : str
+    attributes :
+        Stored with the span.
+    """
+    tracer = _tracer
+    if tracer is None:
+        return _NULL_SPAN
+    return Span(tracer, name, category, attributes)
+
+def record(name, start, end, category='mendeley', **attributes):
+    """
+    Records a span that has already finished. start and end are
+    time.perf_counter() values.
+    """
+    tracer = _tracer
+    if tracer is not None:
+        tracer.record(name, start, end, category, attributes)
+
+def load_trace(file_path):
+    """
+    Returns
+    -------
+    list
+        The events (dicts) of a JSONL trace file.
+    """
+    with open(file_path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def export_chrome_trace(file_path, output_path):
+    """
+    Writes a JSONL trace as a JSON file that can be opened in
+    chrome://tracing or Perfetto.
+    """
+    events = load_trace(file_path)
+    with open(output_path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
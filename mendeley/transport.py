@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+"""
+This module holds the HTTP transport that is used by mendeley.api.API
+
+All requests made by the API (and its endpoint groups) go through a single
+Transport instance which owns the requests.Session and its connection pools.
+
+General Usage
+-------------
+from mendeley import API
+from mendeley.transport import Transport
+
+t = Transport(pool_maxsize=50,per_host_limit=20)
+m = API(transport=t)
+
+#After making some requests
+print(m.transport)
+
+"""
+
+#Standard Library
+import threading
+from urllib.parse import urlsplit
+
+#Third party
+import requests
+from requests.adapters import HTTPAdapter
+
+#Local Imports
+from . import utils
+
+
+class Transport(object):
+
+    """
+    Attributes
+    ----------
+    session : requests.Session
+    pool_connections : int
+        # of hosts for which connection pools are kept.
+    pool_maxsize : int
+        Maximum # of connections kept alive per host.
+    keep_alive : bool
+    gzip : bool
+        Whether compressed responses are requested.
+    per_host_limit : int or None
+        If specified, the maximum # of requests in flight to any one host.
+    n_requests : int
+        # of requests sent through this transport.
+    n_retries : int
+        # of requests that were resent after a failure. See API._send
+    offline : bool
+        True if responses are served without a network connection, in 
+        which case the API doesn't load an access token. See 
+        mendeley.cassette.ReplayTransport
+    """
+
+    offline = False
+
+    def __init__(self,
+                 pool_connections=10,
+                 pool_maxsize=10,
+                 keep_alive=True,
+                 gzip=True,
+                 per_host_limit=None,
+                 session=None):
+        """
+        Parameters
+        ----------
+        pool_connections : int (default 10)
+        pool_maxsize : int (default 10)
+            This should be at least as large as the # of threads making
+            requests, otherwise connections get discarded after use.
+        keep_alive : bool (default True)
+            If False, connections are closed after each request.
+        gzip : bool (default True)
+        per_host_limit : int (default None)
+        session : requests.Session (default None)
+            If not passed in a new session is created.
+        """
+
+        if session is None:
+            session = requests.Session()
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keep_alive = keep_alive
+        self.gzip = gzip
+        self.per_host_limit = per_host_limit
+
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        self._adapters = [adapter]
+
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+
+        if gzip:
+            session.headers['Accept-Encoding'] = 'gzip, deflate'
+        else:
+            session.headers['Accept-Encoding'] = 'identity'
+
+        self.session = session
+
+        self._lock = threading.Lock()
+        self._host_limits = {}
+        self.n_requests = 0
+        self.n_requests_by_host = {}
+        self.n_retries = 0
+        self.n_retries_by_reason = {}
+
+    def _get_host_limit(self, host):
+        with self._lock:
+            sem = self._host_limits.get(host)
+            if sem is None:
+                sem = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_limits[host] = sem
+            return sem
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request using the session.
+
+        Parameters
+        ----------
+        method : str
+            e.g. 'GET', 'POST'
+        url : str
+        kwargs :
+            Passed to requests.Session.request
+
+        Returns
+        -------
+        requests.Response
+        """
+
+        host = urlsplit(url).netloc
+
+        with self._lock:
+            self.n_requests += 1
+            self.n_requests_by_host[host] = self.n_requests_by_host.get(host, 0) + 1
+
+        if self.per_host_limit is None:
+            return self.session.request(method, url, **kwargs)
+        else:
+            with self._get_host_limit(host):
+                return self.session.request(method, url, **kwargs)
+
+    def record_retry(self, url, response=None):
+        """
+        Called when a request is going to be resent.
+
+        Parameters
+        ----------
+        url : str
+        response : requests.Response or None
+            None if the request failed to connect.
+        """
+        if response is None:
+            reason = 'connection_error'
+        else:
+            reason = response.status_code
+
+        with self._lock:
+            self.n_retries += 1
+            self.n_retries_by_reason[reason] = self.n_retries_by_reason.get(reason, 0) + 1
+
+    @property
+    def n_connections_opened(self):
+        """
+        # of connections that have been opened, summed over the pools that
+        are currently held by the session.
+        """
+        return sum(x.num_connections for x in self._iter_pools())
+
+    @property
+    def n_connections_reused(self):
+        """
+        # of requests that were sent on an already open connection.
+        """
+        n_pool_requests = sum(x.num_requests for x in self._iter_pools())
+        return max(n_pool_requests - self.n_connections_opened, 0)
+
+    def _iter_pools(self):
+        for adapter in self._adapters:
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    yield pool
+
+    def stats(self):
+        """
+        Returns the request and connection counters as a dict.
+        """
+        return {'n_requests': self.n_requests,
+                'n_requests_by_host': dict(self.n_requests_by_host),
+                'n_retries': self.n_retries,
+                'n_retries_by_reason': dict(self.n_retries_by_reason),
+                'n_connections_opened': self.n_connections_opened,
+                'n_connections_reused': self.n_connections_reused}
+
+    def close(self):
+        self.session.close()
+
+    def __repr__(self):
+        pv = ['pool_connections', self.pool_connections,
+              'pool_maxsize', self.pool_maxsize,
+              'keep_alive', self.keep_alive,
+              'gzip', self.gzip,
+              'per_host_limit', self.per_host_limit,
+              '---', '--- counters ---',
+              'n_requests', self.n_requests,
+              'n_retries', self.n_retries,
+              'n_connections_opened', self.n_connections_opened,
+              'n_connections_reused', self.n_connections_reused]
+        return utils.property_values_to_string(pv)
@@ -74,9 +74,12 @@ def get_list_class_display(value):
     TODO: Go from a list of objects to:
     [class name] len(#)
     """
+    from .models import LazySequence
+    
     if value is None:
         return 'None'
-    elif isinstance(value, list):
+    elif isinstance(value, (list, LazySequence)):
+        #Only the first item of a LazySequence is built
         # Check for 0 length
         try:
             if len(value) == 0:
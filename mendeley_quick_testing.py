@@ -124,11 +124,17 @@ m.documents.create(ae)
 from mendeley import client_library, API
 api = API()
 c = client_library.UserLibrary(verbose=True)
+#This is a row of the local database (db_tables.Document), which can be
+#modified and committed
 doc = c.get_document({'title': 'magazine article title'})
 doc.city = 'this is the city2'
 doc.commit()
 c.sync()
 
+#Documents returned by the API (models.Document) can't be assigned to, 
+#changes are made with documents.update()
+m_doc = api.documents.update(doc.id, {'city': 'this is the city2'})
+
 
 #Status:
 #X remove id from authors as_dict
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+Compares the time to decode (and encode) a 500 document page with each of
+the installed JSON codecs, see mendeley.api.get_json_codec
+
+Usage
+-----
+python json_codec_benchmark.py
+    Uses a synthetic view='all' page
+
+python json_codec_benchmark.py page.json
+    Uses a recorded page, e.g. saved using:
+
+        from mendeley import API
+        m = API()
+        r = m.documents.get(limit=500,view='all',return_type='response')
+        with open('page.json','wb') as f:
+            f.write(r.content)
+"""
+
+import sys
+sys.path.append('..')
+
+import json
+import time
+import random
+
+from mendeley.api import get_json_codec
+
+def make_page(n_docs=500):
+    words = ['cell', 'neuron', 'signal', 'model', 'analysis', 'protein',
+             'response', 'method', 'data', 'network', 'stimulation']
+
+    def text(n):
+        return ' '.join(random.choice(words) for i in range(n))
+
+    docs = []
+    for i in range(n_docs):
+        docs.append({
+            'id': '%08x-4c99-3b04-85b3-b7e67245d5f2' % i,
+            'title': text(12),
+            'type': 'journal',
+            'profile_id': 'f7aca4cf-3b79-3bd4-bc7b-6a3b2c9b5e6f',
+            'group_id': None,
+            'created': '2015-02-12T11:28:03.000Z',
+            'last_modified': '2019-07-01T09:15:21.123Z',
+            'abstract': text(200),
+            'source': text(4),
+            'year': 2000 + i % 20,
+            'authors': [{'first_name': text(1), 'last_name': text(1)}
+                        for j in range(6)],
+            'identifiers': {'doi': '10.1002/bit.%d' % i, 'pmid': str(i)},
+            'keywords': [text(2) for j in range(5)],
+            'tags': [text(1) for j in range(3)],
+            'notes': text(100),
+            'read': False,
+            'starred': bool(i % 2),
+            'authored': False,
+            'confirmed': True,
+            'hidden': False,
+            'file_attached': True,
+            'volume': str(i % 40),
+            'issue': str(i % 12),
+            'pages': '%d-%d' % (i, i + 10),
+            'websites': ['http://example.com/%d' % i],
+            'accessed': '2019-07-01'})
+    return json.dumps(docs).encode('utf-8')
+
+def time_call(fcn, value, n_repeats):
+    best = None
+    for i in range(n_repeats):
+        t0 = time.perf_counter()
+        fcn(value)
+        elapsed = time.perf_counter() - t0
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], 'rb') as f:
+            body = f.read()
+    else:
+        body = make_page()
+
+    docs = json.loads(body)
+    print('Page: %d documents, %0.1f kB' % (len(docs), len(body) / 1024))
+
+    for name in ('json', 'ujson', 'orjson'):
+        try:
+            codec = get_json_codec(name)
+        except ImportError:
+            print('%-8s not installed' % name)
+            continue
+        decode_time = time_call(codec.loads, body, 20)
+        encode_time = time_call(codec.dumps, docs, 20)
+        print('%-8s decode: %7.2f ms  encode: %7.2f ms'
+              % (name, 1000 * decode_time, 1000 * encode_time))
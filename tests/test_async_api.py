@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+"""
+
+import sys
+import asyncio
+
+sys.path.append('..')
+from mendeley import AsyncAPI
+
+
+def test_async_definitions():
+
+    async def main():
+        async with AsyncAPI(user_name='public', max_concurrency=3) as m:
+            return await asyncio.gather(m.definitions.subject_areas(),
+                                        m.definitions.document_types(),
+                                        m.definitions.doc_id_types())
+
+    subject_areas, document_types, id_types = asyncio.run(main())
+    print('Retrieved definitions concurrently')
+
+
+if __name__ == '__main__':
+    print('Running "AsyncAPI" tests')
+    test_async_definitions()
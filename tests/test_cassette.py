@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import threading
+
+import requests
+from requests.adapters import BaseAdapter
+
+sys.path.append('..')
+from mendeley import API, AsyncAPI
+from mendeley import errors
+from mendeley.cassette import Cassette, RecordingTransport, ReplayTransport
+
+BASE = 'https://api.mendeley.com'
+
+
+def make_docs(start, stop):
+    return [{'id': 'doc%04d' % i, 'title': 'Title %d' % i}
+            for i in range(start, stop)]
+
+
+def make_interaction(url, body, headers=None, elapsed=0.2):
+    h = {'Content-Type': 'application/json', 'Mendeley-Count': '7'}
+    h.update(headers or {})
+    return {'method': 'GET', 'url': url, 'request_body': None,
+            'status_code': 200, 'reason': 'OK', 'headers': h,
+            'body': json.dumps(body), 'body_encoding': 'utf-8',
+            'elapsed': elapsed}
+
+
+def make_cassette(file_path):
+    next_url = BASE + '/documents?view=all&marker=doc0004&limit=4'
+    interactions = [
+        make_interaction(BASE + '/documents?view=all&limit=4', make_docs(0, 4),
+                         {'Link': '<%s>; rel="next"' % next_url}),
+        make_interaction(next_url, make_docs(4, 7))]
+    return Cassette(file_path, 'public', interactions)
+
+
+def test_replay_paging():
+    with tempfile.TemporaryDirectory() as root:
+        c = make_cassette(os.path.join(root, 'docs.json'))
+        c.save()
+
+        t = ReplayTransport(c.file_path)
+        m = API(transport=t)
+        assert m.user_name == 'public'
+        assert m.access_token is None
+
+        #The page size differs from the recording, 'limit' is ignored
+        docs = m.documents.get(limit=0)
+        assert [x.id for x in docs.docs] == ['doc%04d' % i for i in range(7)]
+        assert docs.total_count == '7'
+        assert t.n_replayed == 2
+
+        try:
+            m.documents.get_by_id('missing')
+        except errors.CassetteMissError:
+            pass
+        else:
+            raise AssertionError('expected CassetteMissError')
+
+
+def test_prefetch_keeps_last_context():
+    with tempfile.TemporaryDirectory() as root:
+        c = make_cassette(os.path.join(root, 'docs.json'))
+        m = API(transport=ReplayTransport(c), prefetch_depth=1)
+
+        docs = m.documents.get(limit=4, view='all')
+        context = m.last_context
+        assert [x.id for x in docs] == ['doc%04d' % i for i in range(7)]
+        #The second page was requested by the prefetch thread
+        assert m.transport.n_replayed == 2
+        assert m.last_context is context
+
+
+class ThreadRecordingTransport(ReplayTransport):
+    def __init__(self, cassette):
+        super(ThreadRecordingTransport, self).__init__(cassette)
+        self.threads = []
+
+    def request(self, method, url, **kwargs):
+        self.threads.append(threading.current_thread())
+        return super(ThreadRecordingTransport, self).request(method, url,
+                                                             **kwargs)
+
+
+def test_async_iter_docs():
+    with tempfile.TemporaryDirectory() as root:
+        c = make_cassette(os.path.join(root, 'docs.json'))
+        t = ThreadRecordingTransport(c)
+
+        async def main():
+            async with AsyncAPI(transport=t) as m:
+                docs = await m.documents.get(limit=4, view='all')
+                return [x.id async for x in m.iter_docs(docs)]
+
+        assert asyncio.run(main()) == ['doc%04d' % i for i in range(7)]
+        #Neither page was requested from the event loop
+        assert len(t.threads) == 2
+        assert threading.main_thread() not in t.threads
+
+
+class FakeAdapter(BaseAdapter):
+    def send(self, request, **kwargs):
+        r = requests.Response()
+        r.status_code = 200
+        r.headers['Content-Type'] = 'application/json'
+        r.headers['Link'] = '<%s/next>; rel="next"' % BASE
+        r._content = json.dumps({'url': request.url}).encode('utf-8')
+        r.url = request.url
+        r.request = request
+        return r
+
+    def close(self):
+        pass
+
+
+def test_record_then_replay():
+    with tempfile.TemporaryDirectory() as root:
+        file_path = os.path.join(root, 'rec.json')
+
+        session = requests.Session()
+        with RecordingTransport(file_path, session=session) as t:
+            session.mount('https://', FakeAdapter())
+            r1 = t.request('GET', BASE + '/a', params='x=1')
+            r2 = t.request('POST', BASE + '/b', data='{"y": 2}')
+        assert r1.json()['url'] == BASE + '/a?x=1'
+
+        t = ReplayTransport(file_path, latency_scale=1)
+        r = t.request('GET', BASE + '/a', params='x=1')
+        assert r.json() == r1.json()
+        assert r.links['next']['url'] == BASE + '/next'
+        r = t.request('POST', BASE + '/b', data='{"y": 2}')
+        assert r.status_code == r2.status_code
+
+
+if __name__ == '__main__':
+    test_replay_paging()
+    test_prefetch_keeps_last_context()
+    test_async_iter_docs()
+    test_record_then_replay()
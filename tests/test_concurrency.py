@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append('..')
+from mendeley import errors
+from mendeley.concurrency import SingleFlight, iter_pages
+from mendeley.concurrency import AIMDController, get_current_controller
+
+
+def test_single_flight():
+    sf = SingleFlight()
+    n_run = []
+    lock = threading.Lock()
+
+    def fetch():
+        with lock:
+            n_run.append(1)
+        time.sleep(0.2)
+        return 'result'
+
+    with ThreadPoolExecutor(5) as ex:
+        results = list(ex.map(lambda i: sf.do('key', fetch), range(5)))
+
+    assert results == ['result'] * 5
+    assert len(n_run) == 1
+    assert sf.n_shared == 4
+    assert sf.n_in_flight == 0
+
+
+def test_single_flight_timeout():
+    sf = SingleFlight()
+    started = threading.Event()
+
+    def fetch():
+        started.set()
+        time.sleep(0.5)
+        return 'result'
+
+    with ThreadPoolExecutor(1) as ex:
+        leader = ex.submit(sf.do, 'key', fetch)
+        started.wait()
+        t0 = time.perf_counter()
+        try:
+            sf.do('key', fetch, timeout=0.05)
+        except errors.DeadlineExceededError:
+            pass
+        else:
+            raise AssertionError('expected DeadlineExceededError')
+        assert time.perf_counter() - t0 < 0.3
+        assert leader.result() == 'result'
+
+
+def test_single_flight_error():
+    sf = SingleFlight()
+
+    def fail():
+        raise ValueError('failed')
+
+    try:
+        sf.do('key', fail)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('expected ValueError')
+
+    assert sf.do('key', lambda: 1) == 1
+
+
+class FakePage(object):
+    def __init__(self, page_id, n_pages, fetched):
+        self.page_id = page_id
+        self.n_pages = n_pages
+        self.fetched = fetched
+
+    def next_page(self):
+        if self.page_id + 1 == self.n_pages:
+            return None
+        self.fetched.append(self.page_id + 1)
+        return FakePage(self.page_id + 1, self.n_pages, self.fetched)
+
+
+def test_iter_pages():
+    for depth in (0, 1, 3):
+        fetched = []
+        pages = iter_pages(FakePage(0, 5, fetched), depth)
+        assert [x.page_id for x in pages] == [0, 1, 2, 3, 4]
+        assert fetched == [1, 2, 3, 4]
+
+    #Stopping early doesn't fetch everything
+    fetched = []
+    pages = iter_pages(FakePage(0, 100, fetched), 2)
+    next(pages)
+    next(pages)
+    pages.close()
+    time.sleep(0.3)
+    assert len(fetched) <= 5
+
+
+def test_aimd_window():
+    c = AIMDController(initial_window=4, max_window=8, cooldown=0)
+
+    for i in range(100):
+        c.record_response(200, 0.1)
+    assert c.window == 8
+
+    c.record_response(429, 0.1)
+    assert c.window == 4
+    c.record_response(503, 0.1)
+    assert c.window == 2
+
+    #Latency spike
+    c.record_response(200, 10)
+    assert c.window == 1
+    c.record_response(None, 0.1)
+    assert c.window == c.min_window
+
+    #Only one decrease per cooldown
+    c = AIMDController(initial_window=8, cooldown=60)
+    c.record_response(429, 0.1)
+    c.record_response(429, 0.1)
+    assert c.window == 4
+    assert c.n_decreases == 1
+
+
+def test_aimd_map():
+    c = AIMDController(initial_window=2, max_window=4)
+    lock = threading.Lock()
+    active = [0]
+    max_active = [0]
+
+    def fcn(x):
+        assert get_current_controller() is c
+        with lock:
+            active[0] += 1
+            max_active[0] = max(max_active[0], active[0])
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+        if x == 3:
+            raise ValueError('bad item')
+        return x * 2
+
+    results = c.map(fcn, range(10), return_exceptions=True)
+    assert results[:3] == [0, 2, 4]
+    assert isinstance(results[3], ValueError)
+    assert max_active[0] <= 2
+    assert get_current_controller() is None
+
+    try:
+        c.map(fcn, range(5))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('expected ValueError')
+
+
+if __name__ == '__main__':
+    test_single_flight()
+    test_single_flight_timeout()
+    test_single_flight_error()
+    test_iter_pages()
+    test_aimd_window()
+    test_aimd_map()
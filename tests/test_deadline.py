@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+import json
+import time
+import threading
+import contextvars
+
+import requests
+
+sys.path.append('..')
+from mendeley import API
+from mendeley import errors
+from mendeley.api import deadline, get_time_remaining
+from mendeley.transport import Transport
+
+
+class SlowTransport(Transport):
+    offline = True
+
+    def request(self, method, url, **kwargs):
+        time.sleep(0.5)
+        r = requests.Response()
+        r.status_code = 200
+        r.headers['Content-Type'] = 'application/json'
+        r._content = json.dumps({'id': 'abc'}).encode('utf-8')
+        r.url = url
+        r.request = requests.Request(method, url).prepare()
+        return r
+
+
+def test_deadline():
+    assert get_time_remaining() is None
+
+    with deadline(10):
+        assert 9 < get_time_remaining() <= 10
+
+        #Nested deadlines can only shorten the time
+        with deadline(100):
+            assert get_time_remaining() <= 10
+        with deadline(1):
+            assert get_time_remaining() <= 1
+
+        #Propagated to threads run in a copy of the context
+        result = []
+        context = contextvars.copy_context()
+        t = threading.Thread(target=context.run,
+                             args=(lambda: result.append(get_time_remaining()),))
+        t.start()
+        t.join()
+        assert result[0] is not None and result[0] <= 10
+
+    assert get_time_remaining() is None
+
+
+def test_deadline_of_shared_request():
+    #The second call joins the first (see API.coalesce) but keeps to its
+    #own, shorter, deadline
+    m = API(user_name='public', transport=SlowTransport(), thread_safe=True)
+    leader = threading.Thread(
+        target=lambda: m.documents.get_by_id('abc', return_type='json'))
+    leader.start()
+    time.sleep(0.05)
+
+    t0 = time.perf_counter()
+    try:
+        with deadline(0.1):
+            m.documents.get_by_id('abc', return_type='json')
+    except errors.DeadlineExceededError:
+        pass
+    else:
+        raise AssertionError('expected DeadlineExceededError')
+    assert time.perf_counter() - t0 < 0.3
+    assert m._single_flight.n_shared == 1
+    leader.join()
+
+
+if __name__ == '__main__':
+    test_deadline()
+    test_deadline_of_shared_request()
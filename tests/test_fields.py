@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+
+sys.path.append('..')
+from mendeley import models
+from mendeley.api import get_view_for_fields
+from mendeley.api import document_fcns, DOCUMENT_VIEW_ORDER
+from mendeley.api import catalog_fcns, CATALOG_VIEW_ORDER
+
+
+def doc_view(fields):
+    return get_view_for_fields(fields, document_fcns, DOCUMENT_VIEW_ORDER)
+
+
+def catalog_view(fields):
+    return get_view_for_fields(fields, catalog_fcns, CATALOG_VIEW_ORDER)
+
+
+def test_document_views():
+    assert doc_view(['id']) == 'core'
+    assert doc_view(['id', 'title', 'authors', 'last_modified']) == 'core'
+    assert doc_view('title') == 'core'
+    assert doc_view(['id', 'tags']) == 'tags'
+    assert doc_view(['starred', 'read']) == 'client'
+    assert doc_view(['pages', 'volume']) == 'bib'
+    assert doc_view(['patent_owner']) == 'patent'
+
+    #Fields from different views need the full view
+    assert doc_view(['starred', 'pages']) == 'all'
+    assert doc_view(['notes']) == 'all'
+
+
+def test_catalog_views():
+    assert catalog_view(['title', 'year']) is None
+    assert catalog_view(['volume']) == 'bib'
+    assert catalog_view(['reader_count']) == 'stats'
+    assert catalog_view(['volume', 'reader_count']) == 'all'
+
+
+def test_identifier_fields():
+    #Read from 'identifiers', which the core view returns
+    assert doc_view(['doi']) == 'core'
+    assert doc_view(['id', 'doi', 'pmid', 'arxiv']) == 'core'
+    assert doc_view(['doi', 'starred']) == 'client'
+
+    doc = models.Document({'id': 'abc', 'identifiers': {'doi': '10.1/x'}},
+                          None)
+    assert doc.doi == '10.1/x'
+    assert models.Document({'id': 'abc'}, None).doi is None
+
+
+def test_unknown_field():
+    try:
+        doc_view(['id', 'titel'])
+    except ValueError as e:
+        assert 'titel' in str(e)
+    else:
+        raise AssertionError('expected ValueError')
+
+
+if __name__ == '__main__':
+    test_document_views()
+    test_catalog_views()
+    test_identifier_fields()
+    test_unknown_field()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+import tempfile
+
+import requests
+
+sys.path.append('..')
+from mendeley.http_cache import ResponseCache
+
+
+def make_response(body, headers=None):
+    r = requests.Response()
+    r.status_code = 200
+    r.url = 'https://api.mendeley.com/catalog'
+    r._content = body
+    if headers is not None:
+        r.headers.update(headers)
+    return r
+
+
+def test_store_and_get():
+    cache = ResponseCache(root_path=tempfile.mkdtemp(), ttl=60)
+    key = cache.get_key('https://api.mendeley.com/catalog', 'doi=10.1/x',
+                        {'Accept': 'application/json'})
+
+    assert cache.get(key) is None
+
+    cache.store(key, make_response(b'[1,2]', {'ETag': '"a"',
+                                              'Content-Encoding': 'gzip'}))
+    entry = cache.get(key)
+    assert cache.is_fresh(entry)
+    assert entry.get_validation_headers() == {'If-None-Match': '"a"'}
+
+    r = entry.to_response()
+    assert r.json() == [1, 2]
+    assert 'Content-Encoding' not in r.headers
+
+
+def test_key():
+    url = 'https://api.mendeley.com/catalog'
+    k1 = ResponseCache.get_key(url, 'doi=10.1/x')
+    assert k1 == ResponseCache.get_key(url, 'doi=10.1/x', {'Content-Type': 'x'})
+    assert k1 != ResponseCache.get_key(url, 'doi=10.1/x', {'Accept': 'x'})
+    assert k1 != ResponseCache.get_key(url, 'doi=10.1/y')
+    assert k1 != ResponseCache.get_key(url, 'doi=10.1/x', user_name='public')
+
+
+def test_eviction():
+    cache = ResponseCache(root_path=tempfile.mkdtemp(), max_size=1000)
+    for i in range(5):
+        cache.store('k%d' % i, make_response(b'x' * 300))
+
+    assert cache.size <= 1000
+    assert cache.get('k4') is not None
+    assert cache.get('k0') is None
+
+
+if __name__ == '__main__':
+    test_store_and_get()
+    test_key()
+    test_eviction()
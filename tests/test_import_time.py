@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Import time budget. Each check runs in a new interpreter so that modules
+already imported by other tests don't hide the cost.
+
+These tests don't make any requests.
+"""
+
+import os
+import sys
+import json
+import subprocess
+
+#Seconds, generous so that slow machines pass. A regression (e.g. pandas 
+#being imported again) is caught by the module checks.
+IMPORT_BUDGET = 0.1
+API_IMPORT_BUDGET = 1.0
+
+HEAVY_MODULES = ('pandas', 'sqlalchemy', 'numpy')
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_SCRIPT = """
+import sys, time, json
+t0 = time.perf_counter()
+%s
+elapsed = time.perf_counter() - t0
+print(json.dumps({'elapsed': elapsed, 'modules': sorted(sys.modules)}))
+"""
+
+def time_import(statement):
+    out = subprocess.check_output([sys.executable, '-c', _SCRIPT % statement],
+                                  cwd=ROOT)
+    return json.loads(out.decode('utf-8').strip().splitlines()[-1])
+
+
+def test_import_mendeley():
+    result = time_import('import mendeley')
+    loaded = set(result['modules'])
+    assert 'requests' not in loaded
+    assert 'mendeley.client_library' not in loaded
+    assert not loaded.intersection(HEAVY_MODULES)
+    assert result['elapsed'] < IMPORT_BUDGET, result['elapsed']
+
+
+def test_import_api():
+    result = time_import('from mendeley import API')
+    loaded = set(result['modules'])
+    assert 'mendeley.api' in loaded
+    assert 'mendeley.client_library' not in loaded
+    assert not loaded.intersection(HEAVY_MODULES)
+    assert result['elapsed'] < API_IMPORT_BUDGET, result['elapsed']
+
+
+def test_optional_imports_are_lazy():
+    #Fails (CalledProcessError) if the library database code was loaded
+    time_import('import mendeley.db_interface\n'
+                'from mendeley import optional\n'
+                'assert optional.db._value is None')
+
+
+def test_lazy_import_isinstance():
+    sys.path.append(ROOT)
+    from collections import OrderedDict
+    from mendeley.optional import LazyImport
+
+    proxy = LazyImport('collections', 'missing', 'OrderedDict')
+    assert isinstance(OrderedDict(), proxy)
+    assert not isinstance({}, proxy)
+    assert issubclass(OrderedDict, proxy)
+
+    missing = LazyImport('not_a_real_module', 'missing', 'Missing')
+    assert not isinstance({}, missing)
+
+
+if __name__ == '__main__':
+    test_import_mendeley()
+    test_import_api()
+    test_optional_imports_are_lazy()
+    test_lazy_import_isinstance()
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+
+import pytest
+
+sys.path.append('..')
+from mendeley import models
+from mendeley.api import RequestContext
+
+
+DOC_JSON = {'id': 'abc',
+            'title': 'A title',
+            'year': 2001,
+            'authors': [{'first_name': 'Jim', 'last_name': 'Hokanson'}],
+            'identifiers': {'doi': '10.1000/xyz'},
+            'starred': True}
+
+
+def test_document_fields():
+    doc = models.ClientDocument(DOC_JSON, None)
+    assert doc.title == 'A title'
+    assert doc.starred is True
+    #In fields() but not in the JSON
+    assert doc.read is None
+    assert doc.authors[0].last_name == 'Hokanson'
+    assert doc.identifiers.doi == '10.1000/xyz'
+    assert doc.doc_id == 'abc'
+    assert doc.doc_location.endswith('/documents/abc')
+
+    with pytest.raises(AttributeError):
+        doc.yeear
+
+    #Not a field of the base class
+    with pytest.raises(AttributeError):
+        models.Document(DOC_JSON, None).starred
+
+    with pytest.raises(KeyError):
+        models.Document({'title': 'no id'}, None)
+
+
+def test_slots():
+    for cls in (models.Document, models.BibDocument, models.ClientDocument,
+                models.File, models.Annotation, models.Profile):
+        obj = cls({'id': 'abc'}, None)
+        assert not hasattr(obj, '__dict__')
+        assert obj.id == 'abc'
+        assert 'id' in type(obj)._field_set
+
+
+def test_list_json():
+    profile = models.Profile([{'first_name': 'Jim'}], None)
+    assert profile.first_name == 'Jim'
+    assert models.Profile([], None).first_name is None
+
+
+def get_doc_set(json):
+    context = RequestContext(None, 'GET', 'https://api.mendeley.com/documents',
+                             None, None, None, 'object', None)
+    params = {'fcn': models.Document, 'view': None, 'verbose': False,
+              'page_id': 0, 'context': context}
+    return models.DocumentSet(json, None, params)
+
+
+def test_converted_values_are_cached():
+    doc = models.Document(dict(DOC_JSON), None)
+    authors = doc.authors
+    assert doc.authors is authors
+    assert doc.identifiers is doc.identifiers
+
+    #Replacing the json clears the converted values
+    doc.json = dict(DOC_JSON, authors=[{'last_name': 'Smith'}])
+    assert doc.authors is not authors
+    assert doc.authors[0].last_name == 'Smith'
+
+
+def test_materialize():
+    doc_set = get_doc_set([dict(DOC_JSON, id=str(i)) for i in range(5)])
+    assert doc_set.materialize(['authors', 'identifiers']) is doc_set
+    for doc in doc_set.docs:
+        assert set(doc._converted) == {'authors', 'identifiers'}
+
+    with pytest.raises(ValueError):
+        doc_set.materialize('yeear')
+
+
+def test_lazy_docs():
+    doc_set = get_doc_set([dict(DOC_JSON, id=str(i)) for i in range(10)])
+    docs = doc_set.docs
+    assert len(docs) == 10
+    assert docs.n_built == 0
+
+    assert docs[2].id == '2'
+    assert docs[-1].id == '9'
+    assert [x.id for x in docs[4:7]] == ['4', '5', '6']
+    assert docs.n_built == 5
+    #Built objects are kept
+    assert docs[2] is docs[2]
+
+    with pytest.raises(IndexError):
+        docs[10]
+
+    doc_set.drop_json()
+    assert doc_set.json is None
+    assert [x.id for x in docs] == [str(i) for i in range(10)]
+    assert docs.n_built == 10
+
+    docs.extend(models.LazySequence([{'id': 'x'}], models.Document, None))
+    assert docs.n_built == 10
+    assert docs[10].id == 'x'
+
+
+def test_to_columns():
+    json = [dict(DOC_JSON, id='0', created='2015-02-12T11:28:03.000Z'),
+            {'id': '1', 'year': None, 'identifiers': {'pmid': '123'}}]
+    doc_set = get_doc_set(json)
+
+    columns = doc_set.to_columns(['id', 'year', 'doi', 'pmid', 'created',
+                                  'authors'])
+    assert list(columns['id']) == ['0', '1']
+    assert columns['year'].dtype == float
+    assert columns['year'][0] == 2001
+    assert list(columns['doi']) == ['10.1000/xyz', None]
+    assert list(columns['pmid']) == [None, '123']
+    assert str(columns['created'].dtype) == 'datetime64[ms]'
+    assert str(columns['created'][0]) == '2015-02-12T11:28:03.000'
+    assert str(columns['created'][1]) == 'NaT'
+    assert columns['authors'].shape == (2,)
+    #No documents are built
+    assert doc_set.docs.n_built == 0
+
+    with pytest.raises(ValueError):
+        doc_set.to_columns(['yeear'])
+
+    df = doc_set.to_dataframe(['id', 'created'])
+    assert list(df.columns) == ['id', 'created']
+    assert len(df) == 2
+
+
+def test_lazy_docs_concatenation():
+    #e.g. Sync.remove_old_ids() adds the trash and deleted ids
+    from mendeley.client_library import Sync
+    import pandas as pd
+
+    trash = models.LazySequence([{'id': '1'}], models.get_ids_only, None)
+    deleted = models.LazySequence([{'id': '3'}], models.get_ids_only, None)
+    assert trash + deleted == ['1', '3']
+    assert ['0'] + trash == ['0', '1']
+    assert trash + ['2'] == ['1', '2']
+
+    sync = Sync.__new__(Sync)
+    sync.trash_ids = trash
+    sync.deleted_ids = deleted
+    sync.docs = pd.DataFrame({'title': ['a', 'b', 'c', 'd']},
+                             index=['0', '1', '2', '3'])
+    sync.remove_old_ids()
+    assert list(sync.docs.index) == ['0', '2']
+    assert sync.n_docs_removed == 2
+
+
+if __name__ == '__main__':
+    test_document_fields()
+    test_slots()
+    test_list_json()
+    test_converted_values_are_cached()
+    test_materialize()
+    test_lazy_docs()
+    test_to_columns()
+    test_lazy_docs_concatenation()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.append('..')
+from mendeley.paging import AdaptivePager, set_url_limit, get_max_limit
+
+
+def test_set_url_limit():
+    url = 'https://api.mendeley.com/documents?marker=abc%3D&limit=500&view=all'
+    new_url = set_url_limit(url, 120)
+    query = parse_qs(urlsplit(new_url).query)
+    assert query == {'marker': ['abc='], 'limit': ['120'], 'view': ['all']}
+
+    query = parse_qs(urlsplit(set_url_limit('http://x/files', 20)).query)
+    assert query == {'limit': ['20']}
+
+
+def test_fast_small_pages_grow_to_max():
+    pager = AdaptivePager(initial_limit=100)
+    assert pager.get_limit('/documents', 'ids') == 100
+
+    for i in range(5):
+        limit = pager.get_limit('/documents', 'ids')
+        pager.record_page('/documents', 'ids', limit, 50 * limit, 0.1)
+    assert pager.get_limit('/documents', 'ids') == get_max_limit('/documents')
+
+    #Annotations have a lower maximum
+    assert pager.get_limit('/annotations') == 100
+    pager.record_page('/annotations', None, 100, 1000, 0.01)
+    pager.record_page('/annotations', None, 200, 2000, 0.01)
+    assert pager.get_limit('/annotations') == 200
+
+
+def test_slow_large_pages_shrink():
+    pager = AdaptivePager(target_latency=1, target_bytes=10 ** 6,
+                          initial_limit=100)
+
+    #0.05 seconds per document
+    pager.record_page('/documents', 'all', 100, 100 * 1000, 5)
+    assert pager.get_limit('/documents', 'all') == 20
+
+    #Views are tuned separately
+    assert pager.get_limit('/documents', 'ids') == 100
+
+    #Large documents, 20 kB each => 50 per page
+    pager = AdaptivePager(target_latency=100, target_bytes=10 ** 6,
+                          initial_limit=100)
+    pager.record_page('/documents', 'all', 100, 100 * 20000, 0.5)
+    assert pager.get_limit('/documents', 'all') == 50
+
+    pager.reset()
+    assert pager.get_limit('/documents', 'all') == 100
+
+
+if __name__ == '__main__':
+    test_set_url_limit()
+    test_fast_small_pages_grow_to_max()
+    test_slow_large_pages_shrink()
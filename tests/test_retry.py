@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+
+import requests
+
+sys.path.append('..')
+from mendeley import API
+from mendeley.retry import RetryPolicy
+from mendeley.transport import Transport
+
+
+class FakeResponse(object):
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers if headers is not None else {}
+
+
+class ClosableResponse(requests.Response):
+    def __init__(self, status_code):
+        super(ClosableResponse, self).__init__()
+        self.status_code = status_code
+        self.headers['Content-Type'] = 'application/json'
+        self._content = b'{"id": "abc"}'
+        self.is_closed = False
+
+    def close(self):
+        self.is_closed = True
+
+
+class FlakyTransport(Transport):
+    """
+    Offline transport that fails the first request with a 503.
+    """
+    offline = True
+
+    def __init__(self):
+        super(FlakyTransport, self).__init__()
+        self.responses = []
+
+    def request(self, method, url, **kwargs):
+        r = ClosableResponse(503 if not self.responses else 200)
+        r.url = url
+        r.request = requests.Request(method, url).prepare()
+        self.responses.append(r)
+        return r
+
+
+def test_retry_rules():
+    policy = RetryPolicy(max_retries=2)
+
+    assert policy.can_retry('GET', 0, FakeResponse(503))
+    assert policy.can_retry('PATCH', 1, FakeResponse(429))
+    assert not policy.can_retry('GET', 2, FakeResponse(503))
+    assert not policy.can_retry('GET', 0, FakeResponse(404))
+
+    #POST only when throttled or marked as safe
+    assert policy.can_retry('POST', 0, FakeResponse(429))
+    assert not policy.can_retry('POST', 0, FakeResponse(503))
+    assert policy.can_retry('POST', 0, FakeResponse(503), safe=True)
+    assert not policy.can_retry('POST', 0, None)
+    assert policy.can_retry('GET', 0, None)
+
+
+def test_retry_delay():
+    policy = RetryPolicy(backoff_base=1, backoff_max=10, jitter=False)
+
+    assert policy.get_delay(0) == 1
+    assert policy.get_delay(2) == 4
+    assert policy.get_delay(10) == 10
+    assert policy.get_delay(0, FakeResponse(429, {'Retry-After': '3'})) == 3
+    assert policy.get_delay(0, FakeResponse(429, {'Retry-After': '300'})) == 10
+
+    policy.jitter = True
+    for i in range(20):
+        assert 0 <= policy.get_delay(3) <= 8
+
+
+def test_retried_response_is_closed():
+    #For stream=True, an unclosed response keeps its pooled connection
+    t = FlakyTransport()
+    m = API(user_name='public', transport=t,
+            retry_policy=RetryPolicy(backoff_base=0.01, jitter=False))
+    m.documents.get_by_id('abc', return_type='json')
+
+    assert [r.status_code for r in t.responses] == [503, 200]
+    assert t.responses[0].is_closed
+    assert not t.responses[1].is_closed
+
+
+if __name__ == '__main__':
+    print('Running "Retry" tests')
+    test_retry_rules()
+    test_retry_delay()
+    test_retried_response_is_closed()
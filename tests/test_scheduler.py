@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+import json
+import time
+import asyncio
+import threading
+
+import pytest
+import requests
+
+sys.path.append('..')
+from mendeley import API, AsyncAPI
+from mendeley import errors
+from mendeley.transport import Transport
+from mendeley.scheduler import RequestScheduler, priority, get_priority
+from mendeley.scheduler import INTERACTIVE, BACKGROUND
+
+
+class SlowTransport(Transport):
+    """
+    Offline transport that records the # of requests in flight.
+    """
+    offline = True
+
+    def __init__(self, delay):
+        super(SlowTransport, self).__init__()
+        self.delay = delay
+        self.n_active = 0
+        self.max_active = 0
+        self._active_lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._active_lock:
+            self.n_active += 1
+            self.max_active = max(self.max_active, self.n_active)
+        time.sleep(self.delay)
+        with self._active_lock:
+            self.n_active -= 1
+
+        r = requests.Response()
+        r.status_code = 200
+        r.headers['Content-Type'] = 'application/json'
+        r._content = json.dumps({'id': url.rsplit('/', 1)[-1]}).encode('utf-8')
+        r.url = url
+        r.request = requests.Request(method, url).prepare()
+        return r
+
+
+def test_priority_context():
+    assert get_priority() == INTERACTIVE
+    with priority(BACKGROUND):
+        assert get_priority() == BACKGROUND
+    assert get_priority() == INTERACTIVE
+
+
+def test_interactive_first():
+    s = RequestScheduler(max_concurrency=2, interactive_reserve=1)
+    order = []
+
+    def run(name, label):
+        with s.slot(name):
+            order.append(label)
+            time.sleep(0.05)
+
+    #Occupies the only background slot
+    first = threading.Thread(target=run, args=(BACKGROUND, 'b0'))
+    first.start()
+    time.sleep(0.01)
+
+    threads = [threading.Thread(target=run, args=(BACKGROUND, 'b%d' % i))
+               for i in range(1, 4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.01)
+
+    #Uses the reserved slot without waiting
+    t0 = time.perf_counter()
+    run(INTERACTIVE, 'i')
+    assert time.perf_counter() - t0 < 0.1
+
+    for t in [first] + threads:
+        t.join()
+
+    assert order[:2] == ['b0', 'i']
+    assert s.n_active == 0
+    assert s.n_waited[BACKGROUND] == 3
+
+
+def test_no_limit():
+    s = RequestScheduler(max_concurrency=None)
+    names = [s.acquire(BACKGROUND) for i in range(50)]
+    assert s.n_active == 50
+    for name in names:
+        s.release(name)
+    assert s.n_waited[BACKGROUND] == 0
+
+
+def test_api_concurrency_above_pool_size():
+    #The default scheduler doesn't cap requests at pool_maxsize (10)
+    t = SlowTransport(0.2)
+    m = API(user_name='public', transport=t, thread_safe=True)
+    assert m.scheduler.max_concurrency is None
+
+    async def main():
+        am = AsyncAPI(m, max_concurrency=20)
+        try:
+            return await asyncio.gather(*[
+                am.documents.get_by_id('doc%d' % i, return_type='json')
+                for i in range(20)])
+        finally:
+            await am.aclose()
+
+    results = asyncio.run(main())
+    assert len(results) == 20
+    assert t.max_active > 10, t.max_active
+
+
+def test_deadline_while_waiting_for_slot():
+    s = RequestScheduler(max_concurrency=1)
+    m = API(user_name='public', transport=SlowTransport(0), scheduler=s)
+
+    #e.g. a long download in another thread
+    name = s.acquire()
+    try:
+        t0 = time.perf_counter()
+        with pytest.raises(errors.DeadlineExceededError):
+            with m.deadline(0.2):
+                m.documents.get_by_id('doc0', return_type='json')
+        assert time.perf_counter() - t0 < 0.5
+        assert s.n_waiting == 0
+    finally:
+        s.release(name)
+
+    #The slot is free for later requests
+    m.documents.get_by_id('doc1', return_type='json')
+    assert s.n_active == 0
+
+
+if __name__ == '__main__':
+    test_priority_context()
+    test_interactive_first()
+    test_no_limit()
+    test_api_concurrency_above_pool_size()
+    test_deadline_while_waiting_for_slot()
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+import json
+
+import pytest
+
+sys.path.append('..')
+from mendeley import API
+from mendeley.cassette import Cassette, ReplayTransport
+from mendeley.streaming import iter_json_array
+
+
+def split(data, chunk_size):
+    return [data[i:i + chunk_size] for i in range(0, len(data), chunk_size)]
+
+
+def test_iter_json_array():
+    values = [{'id': i, 'title': u'café ' * i} for i in range(20)]
+    values.extend([1, 23, 456, None, 'abc'])
+    data = json.dumps(values).encode('utf-8')
+
+    #Includes splits within multi-byte characters and numbers
+    for chunk_size in (1, 2, 7, 64, len(data)):
+        assert list(iter_json_array(split(data, chunk_size))) == values
+
+
+def test_iter_json_array_other():
+    assert list(iter_json_array([b'[', b']'])) == []
+    assert list(iter_json_array([b' {"a"', b': 1}'])) == [{'a': 1}]
+
+    try:
+        list(iter_json_array([b'[{"a": 1}, {"b"']))
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('expected ValueError')
+
+
+def test_stream_requires_list():
+    #Raised before any request is made, the cassette is empty
+    m = API(user_name='public', transport=ReplayTransport(Cassette('x.json')))
+    with pytest.raises(ValueError, match='paged list'):
+        m.documents.get_by_id('abc', return_type='stream')
+
+
+if __name__ == '__main__':
+    test_iter_json_array()
+    test_iter_json_array_other()
+    test_stream_requires_list()
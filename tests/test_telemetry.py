@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+
+sys.path.append('..')
+from mendeley.telemetry import Telemetry, get_endpoint_name
+
+
+def test_endpoint_name():
+    url = 'https://api.mendeley.com/documents/b2ad49aa-4c99-3b04-85b3-b7e67245d5f2'
+    assert get_endpoint_name('GET', url) == 'GET /documents/{id}'
+    assert get_endpoint_name('GET', 'https://api.mendeley.com/catalog/') == 'GET /catalog'
+
+
+def test_telemetry():
+    t = Telemetry()
+    t.record_request('GET /documents', 200, 0.01, bytes_in=100)
+    t.record_request('GET /documents', 200, 0.3, bytes_in=50, n_retries=2)
+    t.record_request('GET /documents', 503, 20)
+    t.record_handle_return('GET /documents', 0.5)
+
+    s = t.snapshot()['GET /documents']
+    assert s['n_requests'] == 3
+    assert s['n_errors'] == 1
+    assert s['n_retries'] == 2
+    assert s['status_codes'] == {200: 2, 503: 1}
+    assert s['bytes_in'] == 150
+    assert s['latency_histogram'][0] == 1
+    assert s['latency_histogram'][-1] == 1
+    assert s['latency_p50'] == 0.3
+    assert s['handle_return_total'] == 0.5
+
+    t.reset()
+    assert t.snapshot() == {}
+
+
+if __name__ == '__main__':
+    test_endpoint_name()
+    test_telemetry()
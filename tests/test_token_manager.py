@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import sys
+import time
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import pytz
+
+sys.path.append('..')
+from mendeley import auth
+from mendeley.auth import TokenManager, _Authorization
+
+
+class FakeAuthorization(object):
+    RENEW_TIME = _Authorization.RENEW_TIME
+
+    def __init__(self, seconds_left, renew_time=0.05):
+        self.user_name = 'fake'
+        self.n_renewals = 0
+        self.renew_time = renew_time
+        self._set(seconds_left)
+
+    def _set(self, seconds_left):
+        self.access_token = 'token%d' % self.n_renewals
+        self.expires = datetime.datetime.now(pytz.utc) + \
+            datetime.timedelta(seconds=seconds_left)
+
+    def renew_token(self):
+        time.sleep(self.renew_time)
+        self.n_renewals += 1
+        self._set(3600)
+
+
+class FakeRequest(object):
+    def __init__(self):
+        self.headers = {}
+
+
+class SuspendedClock(object):
+    """
+    Stands in for the time module after the computer was asleep: the wall
+    clock has moved on but time.monotonic() hasn't.
+    """
+    def __init__(self, seconds_asleep):
+        self.seconds_asleep = seconds_asleep
+
+    def time(self):
+        return time.time() + self.seconds_asleep
+
+    def monotonic(self):
+        return time.monotonic()
+
+
+def test_no_renewal_needed():
+    a = FakeAuthorization(3600)
+    m = TokenManager(a, background=False)
+    r = m(FakeRequest())
+    assert r.headers['Authorization'] == 'bearer token0'
+    assert a.n_renewals == 0
+    assert m.user_name == 'fake'
+
+
+def test_single_renewal_for_concurrent_requests():
+    #Expires within RENEW_TIME, so the first requests must renew
+    a = FakeAuthorization(30)
+    m = TokenManager(a, background=False)
+
+    with ThreadPoolExecutor(max_workers=10) as ex:
+        requests = list(ex.map(lambda i: m(FakeRequest()), range(20)))
+
+    assert a.n_renewals == 1
+    assert all(r.headers['Authorization'] == 'bearer token1'
+               for r in requests)
+
+
+def test_background_renewal():
+    #Within the background margin but not yet RENEW_TIME
+    a = FakeAuthorization(120, renew_time=0)
+    m = TokenManager(a, background=True)
+    deadline = time.monotonic() + 2
+    while a.n_renewals == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert a.n_renewals == 1
+
+    #Requests don't renew again
+    r = m(FakeRequest())
+    assert r.headers['Authorization'] == 'bearer token1'
+    time.sleep(0.05)
+    assert a.n_renewals == 1
+
+
+def test_renewal_after_suspend():
+    a = FakeAuthorization(600)
+    m = TokenManager(a, background=False)
+    assert m(FakeRequest()).headers['Authorization'] == 'bearer token0'
+
+    #Asleep for 20 minutes, past the expiration of the token
+    auth.time = SuspendedClock(1200)
+    try:
+        r = m(FakeRequest())
+    finally:
+        auth.time = time
+
+    assert a.n_renewals == 1
+    assert r.headers['Authorization'] == 'bearer token1'
+
+
+if __name__ == '__main__':
+    test_no_renewal_needed()
+    test_single_renewal_for_concurrent_requests()
+    test_background_renewal()
+    test_renewal_after_suspend()
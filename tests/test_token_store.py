@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import os
+import sys
+import time
+import pickle
+import datetime
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+import pytz
+
+sys.path.append('..')
+from mendeley import config
+from mendeley import auth
+from mendeley import token_store
+from mendeley.auth import _Authorization
+
+
+class FakeAuthorization(_Authorization):
+
+    def __init__(self, seconds_left=30):
+        self.user_name = 'fake'
+        self.access_token = 'token0'
+        self.token_type = 'bearer'
+        self.expires = datetime.datetime.now(pytz.utc) + \
+            datetime.timedelta(seconds=seconds_left)
+
+    def _renew_token(self):
+        root = self.get_save_base_path()
+        with open(os.path.join(root, 'renewals.txt'), 'a') as f:
+            f.write('%d\n' % os.getpid())
+        time.sleep(0.2)
+        self.access_token = 'renewed%d' % os.getpid()
+        self.expires = datetime.datetime.now(pytz.utc) + \
+            datetime.timedelta(hours=1)
+        self.save()
+
+
+def renew_in_process(root):
+    config.default_save_path = root
+    a = FakeAuthorization.load_from_disk('fake')
+    a.renew_token()
+    return a.access_token
+
+
+def setup_function(function):
+    global _default_save_path
+    _default_save_path = config.default_save_path
+
+
+def teardown_function(function):
+    config.default_save_path = _default_save_path
+
+
+def test_save_load():
+    with tempfile.TemporaryDirectory() as root:
+        config.default_save_path = root
+        a = FakeAuthorization()
+        a.save()
+        b = FakeAuthorization.load_from_disk('fake')
+        assert b.access_token == a.access_token
+        assert b.expires == a.expires
+
+        #Older pickled tokens are converted
+        os.remove(a.get_token_path('fake'))
+        with open(a.get_file_path('fake'), 'wb') as f:
+            pickle.dump(a, f)
+        b = FakeAuthorization.load_from_disk('fake')
+        assert b.expires == a.expires
+        assert os.path.isfile(a.get_token_path('fake'))
+
+
+def test_corrupt_token_file():
+    with tempfile.TemporaryDirectory() as root:
+        config.default_save_path = root
+        a = FakeAuthorization()
+        a.save()
+        path = a.get_token_path('fake')
+        with open(path, 'r') as f:
+            text = f.read()
+
+        #e.g. a disk that filled up
+        with open(path, 'w') as f:
+            f.write(text[:len(text) // 2])
+        assert token_store.load(path) is None
+        assert FakeAuthorization.load_from_disk('fake') is None
+
+        with open(path, 'w') as f:
+            f.write('[]')
+        assert token_store.load(path) is None
+
+        #Renewing replaces the corrupt file
+        a.renew_token()
+        assert token_store.load(path)['access_token'] == a.access_token
+
+
+def test_retrieve_with_corrupt_token_file():
+    def create_initial_token(self):
+        return {'access_token': 'new', 'token_type': 'bearer',
+                'expires_in': 3600}
+
+    with tempfile.TemporaryDirectory() as root:
+        config.default_save_path = root
+        path = auth._PublicAuthorization.get_token_path('public', True)
+        with open(path, 'w') as f:
+            f.write('{"access_token": "old", "tok')
+
+        old_create = auth._PublicAuthorization.create_initial_token
+        auth._PublicAuthorization.create_initial_token = create_initial_token
+        try:
+            a = auth.retrieve_public_authorization()
+        finally:
+            auth._PublicAuthorization.create_initial_token = old_create
+
+        assert a.access_token == 'new'
+        assert token_store.load(path)['access_token'] == 'new'
+
+
+def test_single_renewal_across_processes():
+    with tempfile.TemporaryDirectory() as root:
+        config.default_save_path = root
+        FakeAuthorization().save()
+
+        with ProcessPoolExecutor(max_workers=4) as ex:
+            tokens = list(ex.map(renew_in_process, [root] * 4))
+
+        path = FakeAuthorization.get_save_base_path()
+        with open(os.path.join(path, 'renewals.txt')) as f:
+            n_renewals = len(f.read().split())
+        assert n_renewals == 1
+        assert len(set(tokens)) == 1
+        assert tokens[0].startswith('renewed')
+
+
+def test_lock_is_reentrant():
+    with tempfile.TemporaryDirectory() as root:
+        lock = token_store.get_lock(os.path.join(root, 'x.json'))
+        assert lock is token_store.get_lock(os.path.join(root, 'x.json'))
+        with lock:
+            with lock:
+                pass
+        with lock:
+            pass
+
+
+if __name__ == '__main__':
+    test_save_load()
+    test_corrupt_token_file()
+    test_retrieve_with_corrupt_token_file()
+    test_single_renewal_across_processes()
+    test_lock_is_reentrant()
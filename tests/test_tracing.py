@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+These tests don't make any requests.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.append('..')
+from mendeley import tracing
+
+
+def test_spans():
+    file_path = os.path.join(tempfile.mkdtemp(), 'trace.jsonl')
+    tracing.enable(file_path)
+    try:
+        with tracing.span('outer', n_items=2) as s:
+            with tracing.span('inner'):
+                pass
+            s.set(n_failed=1)
+    finally:
+        tracing.disable()
+
+    #Not recorded
+    with tracing.span('disabled'):
+        pass
+
+    inner, outer = tracing.load_trace(file_path)
+    assert inner['name'] == 'inner'
+    assert outer['args']['n_items'] == 2
+    assert outer['args']['n_failed'] == 1
+    assert inner['args']['parent_id'] == outer['args']['span_id']
+    assert outer['ph'] == 'X'
+    assert outer['ts'] <= inner['ts']
+    assert outer['dur'] >= inner['dur']
+
+
+if __name__ == '__main__':
+    test_spans()